@@ -1,14 +1,38 @@
 import streamlit as st
 import pandas as pd
-import requests
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.cluster import KMeans
-from datetime import datetime, timedelta
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-import re
+import numpy as np
+import functools
+import logging
+import os
+import sqlite3
+import time
+import bmkg
+import cache
+import model_cuaca
+import gaya_cuaca
+from gaya_cuaca import get_dominant_colors, get_weather_emoji
+import riwayat
+import wilayah
 
 st.set_page_config(page_title="Prediksi Cuaca", layout="wide")
+logger = logging.getLogger(__name__)
+# Waktu eksekusi per bagian dicatat di level INFO (APP_LOG_LEVEL=INFO untuk melihatnya)
+logging.basicConfig(level=os.environ.get("APP_LOG_LEVEL", "WARNING"))
+_mulai_skrip = time.perf_counter()
+
+
+def diukur(nama):
+    """Dekorator: mencatat lama eksekusi satu bagian halaman (termasuk rerun fragment)."""
+    def dekorator(fn):
+        @functools.wraps(fn)
+        def bungkus(*args, **kwargs):
+            mulai = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                logger.info("bagian %s: %.1f ms", nama, (time.perf_counter() - mulai) * 1e3)
+        return bungkus
+    return dekorator
 
 def default_theme():
     default_css = """
@@ -74,295 +98,306 @@ def default_theme():
 
 default_theme()
 
-def filter_24_hours(df):
-    """Memfilter DataFrame untuk menampilkan data 24 jam dari sekarang."""
-    if df.empty:
-        return df
-    
-    # Dapatkan waktu saat ini sesuai timezone dari data (jika ada)
-    now = pd.Timestamp.now(tz=df['local'].dt.tz)
-    next_24h = now + timedelta(hours=24)
-    
-    # Filter data dalam rentang waktu 24 jam ke depan
-    df_filtered = df[
-        (df['local'] >= now) & 
-        (df['local'] <= next_24h)
-    ].copy()
-    
-    return df_filtered
+@st.cache_resource(max_entries=64)
+def grafik_prakiraan(kode_wilayah_desa, versi, mulai, akhir, _df):
+    """
+    Spesifikasi Vega-Lite grafik suhu dan kelembaban (digambar di browser).
+    Dibangun dan diserialisasi sekali per (desa, versi prakiraan, awal dan akhir jendela);
+    rerun lain hanya mengirim ulang dict yang sama.
+    """
+    import altair as alt
+
+    data = _df[['local', 'suhu', 'kelembaban']]
+    base = alt.Chart(data).encode(
+        x=alt.X('local:T', title='Waktu', axis=alt.Axis(format='%H:%M', labelAngle=-45)),
+        tooltip=[
+            alt.Tooltip('local:T', title='Waktu', format='%d %b %H:%M'),
+            alt.Tooltip('suhu:Q', title='Suhu (°C)'),
+            alt.Tooltip('kelembaban:Q', title='Kelembaban (%)'),
+        ],
+    )
+    suhu = base.mark_line(color='#d62728', point=alt.OverlayMarkDef(color='#d62728', shape='circle'), strokeWidth=2).encode(
+        y=alt.Y('suhu:Q', title='Suhu (°C)', scale=alt.Scale(zero=False),
+                axis=alt.Axis(titleColor='#d62728', labelColor='#d62728')),
+    )
+    kelembaban = base.mark_line(color='#1f77b4', strokeDash=[6, 4], point=alt.OverlayMarkDef(color='#1f77b4', shape='square'), strokeWidth=2).encode(
+        y=alt.Y('kelembaban:Q', title='Kelembaban (%)', scale=alt.Scale(zero=False),
+                axis=alt.Axis(titleColor='#1f77b4', labelColor='#1f77b4', orient='right')),
+    )
+    # Zoom/geser sumbu waktu di browser, tanpa rerun
+    geser = alt.selection_interval(bind='scales', encodings=['x'])
+    return (
+        alt.layer(suhu.add_params(geser), kelembaban)
+        .resolve_scale(y='independent')
+        .properties(title='Perkiraan Suhu dan Kelembaban', height=400)
+        .to_dict()
+    )
+
+@st.cache_resource(max_entries=64)
+def peta_prediksi(kunci_model, jam, _grid):
+    """
+    Spesifikasi Vega-Lite peta prediksi suhu x kelembaban dari grid prediction_grid.
+    Dibangun sekali per (model, jam); geseran slider berikutnya hanya mengirim
+    ulang dict yang sama.
+    """
+    import altair as alt
+
+    suhu_grid, kelembaban_grid = np.meshgrid(model_cuaca.SUHU_GRID, model_cuaca.KELEMBABAN_GRID, indexing="ij")
+    df_grid = pd.DataFrame({
+        "suhu": suhu_grid.ravel(),
+        "kelembaban": kelembaban_grid.ravel(),
+        "cuaca": _grid.ravel(),
+    })
+    return alt.Chart(df_grid).mark_rect().encode(
+        x=alt.X("kelembaban:O", title="Kelembaban (%)", axis=alt.Axis(values=list(range(20, 101, 10)))),
+        y=alt.Y("suhu:O", title="Suhu (°C)", sort="descending"),
+        color=alt.Color("cuaca:N", title="Cuaca"),
+        tooltip=["suhu", "kelembaban", "cuaca"],
+    ).to_dict()
+
+def reset_hasil_cuaca():
+    """
+    Menghapus hasil yang ditampilkan. Sesi hanya menyimpan kunci (kode desa,
+    versi prakiraan, kunci model); frame dan model ada di cache bersama.
+    """
+    st.session_state.adm4_cuaca = None
+    st.session_state.versi_cuaca = None
+    st.session_state.error_cuaca = None
+    st.session_state.model_kunci = None
+    st.session_state.model_future = None
 
 def reset_selections_on_prov_change():
     """Reset pilihan di bawah provinsi jika provinsi berubah."""
     st.session_state.kab_id = None
     st.session_state.kec_id = None
     st.session_state.desa_id = None
-    st.session_state.df_cuaca = None
-    st.session_state.model = None
+    reset_hasil_cuaca()
 
 def reset_selections_on_kab_change():
     """Reset pilihan di bawah kab/kota jika kab/kota berubah."""
     st.session_state.kec_id = None
     st.session_state.desa_id = None
-    st.session_state.df_cuaca = None
-    st.session_state.model = None
+    reset_hasil_cuaca()
     
 def reset_selections_on_kec_change():
     """Reset pilihan di bawah kecamatan jika kecamatan berubah."""
     st.session_state.desa_id = None
-    st.session_state.df_cuaca = None
-    st.session_state.model = None
+    reset_hasil_cuaca()
 
-# ========== Load daftar wilayah dari base.csv ==========
-@st.cache_data
+# ========== Load daftar wilayah dari snapshot lokal ==========
+@st.cache_resource
 def load_data_wilayah():
     """
-    Memuat dan memproses data wilayah dari GitHub sekali saja.
-    Menghitung level administrasi dan membersihkan nama untuk tampilan.
+    Memuat data wilayah dari snapshot lokal (lihat `python wilayah.py build`).
+    Level administrasi dan nama bersih sudah dihitung saat snapshot dibangun.
+    Jika snapshot belum ada, base.csv diunduh dari GitHub sekali dan snapshot
+    dibangun otomatis (WILAYAH_REMOTE_FALLBACK=0 untuk mematikannya).
+    Frame ini hanya dibaca, jadi tidak disalin per panggilan seperti cache_data;
+    kolomnya tetap menunjuk ke file snapshot yang di-memory-map sehingga
+    halamannya dibagi semua replika lewat page cache OS.
     """
-    url = "https://raw.githubusercontent.com/kodewilayah/permendagri-72-2019/main/dist/base.csv"
-    df = pd.read_csv(url, header=None, names=["id", "nama"], dtype=str)
-    
-    # 0: Provinsi, 1: Kab/Kota, 2: Kecamatan, 3: Kelurahan/Desa
-    df['level'] = df['id'].str.count(r'\.')
-    
-    def clean_name(name):
-        return re.sub(r'^(KAB\. |KOTA |KEC\. |DESA |KEL\. )', '', name).title()
-        
-    df['nama_bersih'] = df['nama'].apply(lambda x: clean_name(x.split(',')[0]))
-    df = df.set_index('id')
-    return df
+    bangun_otomatis = os.environ.get("WILAYAH_REMOTE_FALLBACK", "1") != "0"
+    return wilayah.load_data_wilayah(bangun_otomatis=bangun_otomatis)
+
+@st.cache_resource
+def load_indeks_wilayah():
+    """
+    Membangun indeks induk -> anak sekali saja dan dibagi ke semua sesi,
+    sehingga selectbox tidak perlu memindai seluruh tabel wilayah.
+    """
+    return wilayah.build_children_index(load_data_wilayah())
 
-df_wilayah = load_data_wilayah()
+@st.cache_resource
+def load_indeks_cari():
+    """Indeks trigram nama desa untuk kotak pencarian, dibangun sekali per proses."""
+    return wilayah.build_search_index(load_data_wilayah())
+
+def pilih_hasil_cari():
+    """Mengisi keempat pilihan wilayah langsung dari desa yang dipilih di hasil pencarian."""
+    kode_desa = st.session_state.hasil_cari
+    if not kode_desa:
+        return
+    st.session_state.prov_id = kode_desa[:2]
+    st.session_state.kab_id = kode_desa[:5]
+    st.session_state.kec_id = kode_desa[:8]
+    st.session_state.desa_id = kode_desa
+    reset_hasil_cuaca()
+    st.session_state.kueri_wilayah = ""
+    st.session_state.hasil_cari = None
 
 
 # ========== Ambil data cuaca dari BMKG ==========
-@st.cache_data
+@st.cache_resource
+def get_cache_bersama(namespace):
+    """
+    Lapisan cache di disk (SQLite) yang dibagi semua replika aplikasi di host
+    ini, atau None jika SHARED_CACHE_PATH dikosongkan.
+    """
+    if not cache.SHARED_CACHE_PATH:
+        return None
+    if namespace == "prakiraan":
+        return cache.SharedCache(cache.SHARED_CACHE_PATH, namespace, maxsize=bmkg.PRAKIRAAN_CACHE_SIZE * 4,
+                                 umur_simpan=bmkg.PRAKIRAAN_TTL + bmkg.PRAKIRAAN_STALE_TTL, lease_ttl=60)
+    # Pelatihan bisa lebih lama dari satu request BMKG
+    return cache.SharedCache(cache.SHARED_CACHE_PATH, namespace, lease_ttl=600)
+
+@st.cache_resource
+def get_forecast_store():
+    """Riwayat prakiraan di disk, dipakai bersama oleh semua sesi."""
+    return riwayat.ForecastStore()
+
+@st.cache_resource
+def get_forecast_cache():
+    """Cache prakiraan per kode desa dengan TTL, dibagi ke semua sesi."""
+    store = get_forecast_store()
+
+    def ambil_dan_simpan(kode_wilayah_desa):
+        hasil = bmkg.get_bmkg_data(kode_wilayah_desa)
+        if isinstance(hasil, pd.DataFrame):
+            try:
+                store.append(hasil, adm4=kode_wilayah_desa)
+            except sqlite3.Error as e:
+                # Gagal menyimpan riwayat tidak boleh menggagalkan tampilan prakiraan
+                logger.warning("Gagal menyimpan riwayat prakiraan %s: %s", kode_wilayah_desa, e)
+        return hasil
+
+    # Miss bersamaan untuk desa yang sama di beberapa replika hanya memanggil BMKG sekali
+    return bmkg.create_forecast_cache(loader=ambil_dan_simpan, backend=get_cache_bersama("prakiraan"))
+
 def get_bmkg_data(kode_wilayah_desa):
     """Mengambil data prakiraan cuaca dari API BMKG menggunakan kode DESA/KELURAHAN."""
-    kode_api = kode_wilayah_desa
-    url = f"https://api.bmkg.go.id/publik/prakiraan-cuaca?adm4={kode_api}"
-    
-    try:
-        resp = requests.get(url, timeout=10)
-        resp.raise_for_status()
-    except requests.exceptions.RequestException as e:
-        # Mengembalikan error agar bisa ditampilkan di UI
-        return f"Error: Gagal menghubungi server BMKG atau data tidak ditemukan. Pesan: {e}"
-
-    j = resp.json()
-    data_list = j.get("data", [])
-    if not data_list:
-        return "Error: Tidak ada data cuaca yang dikembalikan oleh BMKG untuk wilayah ini."
-
-    cuaca_nested = data_list[0].get("cuaca", [])
-    records = []
-    for grup in cuaca_nested:
-        for entry in grup:
-            records.append({
-                "utc": entry.get("utc_datetime"),
-                "local": entry.get("local_datetime"),
-                "suhu": entry.get("t"),
-                "kelembaban": entry.get("hu"),
-                "cuaca": entry.get("weather_desc"),
-            })
-    
-    df = pd.DataFrame(records)
-    if not df.empty:
-        df['local'] = pd.to_datetime(df['local'], errors='coerce')
-        df['utc'] = pd.to_datetime(df['utc'], errors='coerce')
-        df = df.sort_values('local').reset_index(drop=True)
-    return df
+    return get_forecast_cache().get(kode_wilayah_desa)
 
+def perlu_ambil_bmkg(kode_wilayah_desa, prakiraan=None):
+    """False jika prakiraan desa masih segar di cache, sehingga get_bmkg_data tidak memanggil BMKG."""
+    if prakiraan is None:
+        prakiraan = get_forecast_cache()
+    entry = prakiraan.peek(kode_wilayah_desa)
+    return entry is None or entry[0] >= prakiraan.ttl
 
-# ========== Train ML Model ==========
 @st.cache_resource
-def train_model(df):
-    df_model = df[["suhu", "kelembaban", "cuaca"]].dropna()
-    if df_model.empty:
-        return None
-    X = df_model[["suhu", "kelembaban"]]
-    y = df_model["cuaca"]
-    model = RandomForestClassifier(n_estimators=100, random_state=42)
-    model.fit(X, y)
-    return model
+def get_bulk_cache():
+    """
+    Hasil ambil massal (frame long-format, errors) per kode kecamatan/kab, dibagi
+    ke semua sesi. Halaman membacanya dengan peek: entri kedaluwarsa tetap
+    ditampilkan sambil dimuat ulang di latar belakang dari cache prakiraan per
+    desa, dan entri yang sudah terbuang harus diambil ulang lewat tombol.
+    """
+    # Diambil di thread skrip; muat ulang latar tidak memanggil API Streamlit
+    indeks = load_indeks_wilayah()
+    prakiraan = get_forecast_cache()
 
+    def ambil_massal(kode_massal):
+        return bmkg.get_bulk_bmkg_data(wilayah.get_desa(indeks, kode_massal), fetch=prakiraan.get,
+                                       perlu_dibatasi=lambda kode: perlu_ambil_bmkg(kode, prakiraan))
 
-# ========== Weather Icon Mapping ==========
-def get_weather_emoji(cuaca_desc):
-    """Memetakan deskripsi cuaca ke emoji."""
-    if not isinstance(cuaca_desc, str): return "❓"
-    cuaca_lower = cuaca_desc.lower()
-    if "cerah berawan" in cuaca_lower: return "🌤️"
-    if "cerah" in cuaca_lower: return "☀️"
-    if "berawan" in cuaca_lower: return "☁️"
-    if "hujan lebat" in cuaca_lower: return "🌧️"
-    if "hujan petir" in cuaca_lower or "badai" in cuaca_lower or "petir" in cuaca_lower: return "⛈️"
-    if "hujan ringan" in cuaca_lower: return "🌦️"
-    if "hujan" in cuaca_lower: return "🌧️"
-    if "kabut" in cuaca_lower or "asap" in cuaca_lower or "udara kabur" in cuaca_lower: return "🌫️"
-    return "🌏"
-
-# ========== Weather Color Mapping ==========
-def get_gradient_color(cuaca_desc):
-    if not isinstance(cuaca_desc, str):
-        return "background: linear-gradient(to bottom, #eeeeee, #cccccc);"
-
-    cuaca_lower = cuaca_desc.lower()
-
-    if "cerah berawan" in cuaca_lower:
-        return "background: linear-gradient(to bottom, #d0ecff, #90caf9);"
-    elif "cerah" in cuaca_lower:
-        return "background: linear-gradient(to bottom, #fff176, #fbc02d);"
-    elif "berawan" in cuaca_lower and "cerah" not in cuaca_lower:
-        return "background: linear-gradient(to bottom, #e0e0e0, #9e9e9e);"
-    elif "kabut" in cuaca_lower or "asap" in cuaca_lower or "udara kabur" in cuaca_lower:
-        return "background: linear-gradient(to bottom, #d7ccc8, #a1887f);"
-    elif "hujan lebat" in cuaca_lower:
-        return "background: linear-gradient(to bottom, #a9a9a9, #404040);"
-
-    # ⛈️ Hujan Petir / Badai
-    elif "badai" in cuaca_lower or "petir" in cuaca_lower or "hujan petir" in cuaca_lower:
-        return "background: linear-gradient(to bottom, #888888, #2c3e50);"
-
-    # 🌦️ Hujan Ringan
-    elif "hujan ringan" in cuaca_lower:
-        return "background: linear-gradient(to bottom, #d0d0d0, #888888);"
-
-    # 🌧️ Hujan (umum)
-    elif "hujan" in cuaca_lower:
-        return "background: linear-gradient(to bottom, #cfd8dc, #78909c);" 
-
-    # Mendung eksplisit
-    elif "mendung" in cuaca_lower:
-        return "background: linear-gradient(to bottom, #b0b0b0, #707070);" 
-    return "background: linear-gradient(to bottom, #e7f4ff, #cceeff);" 
-
-# ========== Timeline Text Mapping ==========    
-def get_text_styles(cuaca_desc):
-    cuaca_lower = cuaca_desc.lower() if cuaca_desc else ""
-
-    if "cerah" in cuaca_lower and "berawan" not in cuaca_lower:
-        return {
-            "cuaca": "color: #f57f17;",   
-            "kelembaban": "color: #4e342e;",  
-            "suhu": "color: #bf360c;",    
-            "tanggal": "color: #6d4c41;", 
-            "jam": "color: #ff8f00;"   
-        }
+    return cache.TTLCache(ambil_massal, ttl=bmkg.PRAKIRAAN_TTL, stale_ttl=bmkg.PRAKIRAAN_STALE_TTL, maxsize=8)
 
-    elif "cerah berawan" in cuaca_lower:
-        return {
-            "cuaca": "color: #01579b;",         
-            "kelembaban": "color: #0277bd;",    
-            "suhu": "color: #0288d1;",          
-            "tanggal": "color: #0288d1;",       
-            "jam": "color: #039be5;"  
-        }
 
-    elif "berawan" in cuaca_lower and "cerah" not in cuaca_lower:
-        return {
-            "cuaca": "color: #eeeeee;",         
-            "kelembaban": "color: #cce7ff;",    
-            "suhu": "color: #ffcdd2;",          
-            "tanggal": "color: #e0f7fa;",
-            "jam": "color: #b3e5fc;" 
-        }
-
-    elif "kabut" in cuaca_lower or "asap" in cuaca_lower or "udara kabur" in cuaca_lower:
-        return {
-            "cuaca":      "color: #3E2723;", 
-            "kelembaban": "color: #00695C;", 
-            "suhu":       "color: #E65100;",
-            "tanggal":    "color: #795548;", 
-            "jam":        "color: #A1887F;" 
-        }
+# ========== Train ML Model ==========
 
-    elif "hujan lebat" in cuaca_lower:
-        return {
-            "cuaca": "color: #e0f2f1;",         
-            "kelembaban": "color: #b2dfdb;",    
-            "suhu": "color: #ef9a9a;",          
-            "tanggal": "color: #f5f5f5;",
-            "jam": "color: #b2ebf2;"
-        }
+@st.cache_resource
+def get_model_registry():
+    """Registry model (LRU memori + joblib di disk), dibagi ke semua sesi dan replika."""
+    return model_cuaca.ModelRegistry(backend=get_cache_bersama("model"))
 
-    elif "badai" in cuaca_lower or "petir" in cuaca_lower or "hujan petir" in cuaca_lower:
-        return {
-            "cuaca": "color: #bbdefb;",         
-            "kelembaban": "color: #ffcc80;",    
-            "suhu": "color: #ef9a9a;",          
-            "tanggal": "color: #e0e0e0;",
-            "jam": "color: #fff176;"
-        }
+def train_model(df, kode_wilayah_desa, registry):
+    """
+    Melatih model untuk data satu desa, atau memakai model yang sudah ada untuk
+    data yang sama. Jika desa ini pernah punya model dari prakiraan sebelumnya,
+    forest lama ditumbuhkan (warm_start) alih-alih dilatih dari nol.
+    Mengembalikan kunci model di registry (yang disimpan sesi, bukan modelnya),
+    atau "" jika data tidak cukup untuk melatih model.
+    Aman dijalankan di thread latar (tidak memanggil API Streamlit).
+    """
+    key = model_cuaca.fingerprint(kode_wilayah_desa, df)
+    model = registry.get_or_train(key, lambda: model_cuaca.update_model(registry.latest(kode_wilayah_desa), df))
+    return key if model is not None else ""
 
-    elif "hujan ringan" in cuaca_lower:
-        return {
-            "cuaca": "color: #455a64;",         
-            "kelembaban": "color: #bbdefb;",    
-            "suhu": "color: #ef9a9a;",          
-            "tanggal": "color: #eceff1;",
-            "jam": "color: #666;" 
-        }
+@st.cache_resource
+def load_global_model():
+    """
+    Model global opsional (dilatih offline dengan `python model_cuaca.py train-global`),
+    dimuat sekali per proses. None jika belum ada; aplikasi lalu melatih model per desa.
+    """
+    return model_cuaca.load_global_model()
 
-    elif "hujan" in cuaca_lower:
-        return {
-            "cuaca": "color: #546e7a;",         
-            "kelembaban": "color: #78909c;",    
-            "suhu": "color: #ff8a80;",          
-            "tanggal": "color: #eceff1;",
-            "jam": "color: #b0bec5;"  
-        }
+@st.cache_resource(max_entries=256)
+def get_model_global(kode_wilayah_desa, zona):
+    """
+    Model global untuk satu desa, satu objek per desa untuk semua sesi, sehingga
+    grid prediksi (di-cache per objek model) tidak dihitung ulang setiap rerun.
+    `zona` (zona waktu desa) dipakai untuk jam default saat prediksi.
+    """
+    return model_cuaca.ModelGlobal(load_global_model(), kode_wilayah_desa, zona=zona)
 
-    elif "mendung" in cuaca_lower:
-        return {
-            "cuaca": "color: #757575;",
-            "kelembaban": "color: #9e9e9e;",
-            "suhu": "color: #e57373;",
-            "tanggal": "color: #cfd8dc;",
-            "jam": "color: #bdbdbd;"
-        }
-    
-    return {
-        "cuaca": "color: #37474f;",             
-        "kelembaban": "color: #90a4ae;",        
-        "suhu": "color: #ef9a9a;",              
-        "tanggal": "color: #eceff1;",
-        "jam": "color: #cfd8dc;"
-    }
-
-def hex_to_rgb(hex_color):
-    """Konversi warna hex (#RRGGBB) ke tuple RGB."""
-    hex_color = hex_color.lstrip('#')
-    return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
-
-def get_dominant_colors(df_display, num_colors=3):
+@st.cache_resource
+def get_pemanas():
     """
-    Menganalisis warna dari kartu-kartu yang ditampilkan dan menemukan N warna dominan.
+    Pemanas cache latar (satu per proses): prakiraan desa yang paling sering
+    diminta dimuat ulang sebelum TTL habis, dalam batas request per menit ke
+    BMKG, dan modelnya langsung dilatih. None jika BMKG_WARM_TOP_N=0.
     """
-    all_colors_hex = []
-    # Kumpulkan semua warna dari gradien kartu
-    for _, row in df_display.iterrows():
-        grad_css = get_gradient_color(row['cuaca'])
-        # Ekstrak warna hex dari string CSS
-        hex_codes = re.findall(r'#(?:[0-9a-fA-F]{6})', grad_css)
-        all_colors_hex.extend(hex_codes)
-    
-    if not all_colors_hex:
-        return ["#6dd5ed", "#2193b0", "#B0BEC5"] # Fallback default
+    if bmkg.PEMANAS_TOP_N <= 0:
+        return None
+    # Diambil di thread skrip; thread pemanas tidak memanggil API Streamlit
+    registry = get_model_registry()
+    pakai_global = load_global_model() is not None
+
+    def latih(kode_wilayah_desa, df):
+        if not pakai_global:
+            train_model(df, kode_wilayah_desa, registry)
+
+    # Bucket menampung kuota satu putaran agar tick tidak dibatasi satu request saja;
+    # setiap muat ulang juga memakai kuota BMKG bersama proses
+    limiter = bmkg.RateLimiter(bmkg.PEMANAS_RATE_PER_MIN,
+                               burst=max(1, int(bmkg.PEMANAS_RATE_PER_MIN * bmkg.PEMANAS_INTERVAL / 60)),
+                               induk=bmkg.get_rate_limiter())
+    pemanas = cache.CacheWarmer(get_forecast_cache(), top_n=bmkg.PEMANAS_TOP_N, lead=bmkg.PEMANAS_LEAD,
+                                limiter=limiter, on_refresh=latih)
+    return pemanas.start(bmkg.PEMANAS_INTERVAL)
+
+@st.fragment(run_every=1)
+def tunggu_model():
+    """Memeriksa pelatihan latar belakang setiap detik dan memuat ulang halaman saat selesai."""
+    future = st.session_state.get("model_future")
+    if future is None:
+        return
+    if not future.done():
+        st.info("⏳ Model sedang dilatih di latar belakang...")
+        return
+    st.session_state.model_future = None
+    try:
+        st.session_state.model_kunci = future.result()
+    except Exception as e:
+        # "" menandai pelatihan gagal: tidak diulang sampai data diambil lagi
+        st.session_state.model_kunci = ""
+        st.error(f"Gagal melatih model: {e}")
+        return
+    if st.session_state.model_kunci == "":
+        st.warning("Data prakiraan tidak cukup untuk melatih model.")
+        return
+    st.rerun()
+
+def get_model(df_cuaca, kode_wilayah_desa):
+    """
+    Model untuk sesi ini dari cache bersama: model global bila ada, jika tidak
+    model desa dari registry menurut kunci di sesi. Jika model desa belum ada
+    (atau sudah terbuang dari registry), pelatihan latar dimulai dan None dikembalikan.
+    """
+    if load_global_model() is not None:
+        # Model global sudah dilatih untuk semua desa: cukup inferensi
+        return get_model_global(kode_wilayah_desa, df_cuaca.attrs.get("timezone", "Asia/Jakarta"))
+    kunci = st.session_state.model_kunci
+    if kunci == "":
+        return None
+    model = get_model_registry().get(kunci) if kunci else None
+    if model is None and st.session_state.model_future is None:
+        # Latih di latar belakang; tunggu_model() memeriksa sampai selesai
+        st.session_state.model_future = model_cuaca.submit(
+            train_model, df_cuaca, kode_wilayah_desa, get_model_registry())
+    return model
 
-    # Konversi hex ke RGB untuk clustering
-    all_colors_rgb = [hex_to_rgb(c) for c in all_colors_hex]
-    
-    # Gunakan KMeans untuk menemukan N cluster warna
-    kmeans = KMeans(n_clusters=num_colors, random_state=42, n_init='auto')
-    kmeans.fit(all_colors_rgb)
-    
-    # Pusat cluster adalah warna dominan (dalam RGB)
-    dominant_rgb = kmeans.cluster_centers_.astype(int)
-    
-    # Konversi kembali ke hex untuk digunakan di CSS
-    dominant_hex = [f"#{r:02x}{g:02x}{b:02x}" for r, g, b in dominant_rgb]
-    return dominant_hex
 
 def get_page_background_style(colors):
     """Membuat CSS untuk latar belakang gradien animasi dari 3 warna."""
@@ -393,8 +428,205 @@ def get_page_background_style(colors):
     </style>
     """
 
+# ========== Bagian Halaman ==========
+# Tiap bagian adalah fragment: widget di dalamnya hanya menjalankan ulang
+# bagian itu sendiri, bukan seluruh skrip.
+@st.fragment
+@diukur("kartu")
+def bagian_kartu(df_cuaca):
+    # Tampilan kartu cuaca: seluruh grid dikirim dalam satu st.markdown
+    tampil_semua = st.toggle(f"Tampilkan seluruh prakiraan ({len(df_cuaca)} kartu)", value=False)
+    df_display = df_cuaca if tampil_semua else df_cuaca.head(8)
+
+    # 1. Dapatkan 3 warna dominan dari kartu yang akan ditampilkan
+    dominant_colors = get_dominant_colors(df_display, num_colors=3)
+    
+    # 2. CSS untuk latar belakang halaman
+    page_bg_css = get_page_background_style(dominant_colors)
+    st.markdown(page_bg_css, unsafe_allow_html=True)
+
+    st.markdown(gaya_cuaca.render_kartu(df_display, kolom_per_baris=4), unsafe_allow_html=True)
+
+@st.fragment
+@diukur("grafik")
+def bagian_grafik(df_cuaca, kode_wilayah_desa):
+    rentang_jam = st.radio("Rentang grafik", [6, 24, 72], index=1, horizontal=True,
+                           format_func=lambda jam: f"{jam} jam")
+    st.subheader(f"📊 Grafik Perkiraan {rentang_jam} Jam ke Depan")
+
+    # Irisan [sekarang, sekarang + rentang] menurut waktu UTC, tanpa salinan
+    df_jendela = bmkg.jendela(df_cuaca, jam=rentang_jam)
+
+    if len(df_jendela) > 1:
+        grafik = grafik_prakiraan(
+            kode_wilayah_desa, df_cuaca.attrs.get("analysis_date", ""), df_jendela.index[0], df_jendela.index[-1],
+            df_jendela)
+        st.vega_lite_chart(grafik, use_container_width=True)
+    else:
+        st.warning(f"Data tidak cukup untuk membuat grafik {rentang_jam} jam.")
+
+@st.fragment
+@diukur("prediksi")
+def bagian_prediksi(model, zona):
+    st.subheader("🧠 Prediksi Cuaca Manual")
+    st.markdown("Masukkan nilai suhu dan kelembaban untuk prediksi cuaca:")
+    
+    input_suhu = st.slider("Suhu (°C)", 10, 40, 28)
+    input_kelembaban = st.slider("Kelembaban (%)", 20, 100, 70)
+    # Model global juga memakai jam lokal sebagai fitur
+    pakai_global = isinstance(model, model_cuaca.ModelGlobal)
+    if pakai_global:
+        # Jam sekarang di zona waktu wilayah (WIB/WITA/WIT), bukan zona server
+        input_jam = st.slider("Jam", 0, 23, pd.Timestamp.now(tz=zona).hour)
+
+    # Seluruh grid slider diprediksi sekali per model; tiap geseran slider cukup lookup tabel
+    grid_prediksi = model_cuaca.prediction_grid(model, input_jam if pakai_global else None)
+
+    if st.button("🔍 Prediksi", use_container_width=True):
+        hasil = model_cuaca.lookup_grid(grid_prediksi, input_suhu, input_kelembaban)
+        emoji = get_weather_emoji(hasil)
+        
+        st.markdown(f"""
+        <div style="border: 2px solid #27ae60; border-radius: 10px; padding: 20px; text-align: center; background-color: #d5f4e6; margin: 10px 0;">
+            <h2 style="margin: 0; color: #27ae60;">{emoji}</h2>
+            <h4 style="margin: 10px 0; color: #27ae60;">Prediksi Cuaca:</h4>
+            <h3 style="margin: 0; color: #2c3e50;">{hasil}</h3>
+        </div>
+        """, unsafe_allow_html=True)
+
+    with st.expander("🗺️ Peta Prediksi Suhu x Kelembaban"):
+        # Isi expander ikut dijalankan pada setiap geseran slider, jadi spesifikasinya di-cache per model
+        if pakai_global:
+            kunci_model = f"global_{model.kode_wilayah_desa}_{model.bundle.get('dilatih', '')}"
+        else:
+            kunci_model = st.session_state.model_kunci
+        peta = peta_prediksi(kunci_model, input_jam if pakai_global else None, grid_prediksi)
+        st.vega_lite_chart(peta, use_container_width=True)
+
+@st.fragment
+@diukur("statistik")
+def bagian_statistik(df_cuaca):
+    # Info tambahan
+    st.subheader("📈 Statistik Data")
+    df_stats = df_cuaca[['suhu', 'kelembaban']].describe()
+    
+    html_table = df_stats.to_html(classes="custom-blur-table", border=0)
+
+    # Inject CSS
+    st.markdown("""
+        <style>
+        .custom-blur-table {
+            width: 100%;
+            border-collapse: collapse;
+            background: rgba(255, 255, 255, 0.2);
+            backdrop-filter: blur(10px);
+            -webkit-backdrop-filter: blur(10px);
+            border-radius: 12px;
+            overflow: hidden;
+            font-size: 14px;
+            color: black;
+        }
+
+        .custom-blur-table th {
+            background-color: rgb(108, 155, 207, 0.3);
+            color: white;
+            padding: 10px;
+        }
+
+        .custom-blur-table td {
+            padding: 8px;
+            border: 1px solid rgba(255, 255, 255, 0.4);
+            text-align: center;
+        }
+        </style>
+    """, unsafe_allow_html=True)
+
+    # Tampilkan HTML-nya
+    st.markdown(html_table, unsafe_allow_html=True)
+    # st.dataframe(df_stats)
+
+    if 'cuaca' in df_cuaca.columns:
+        cuaca_counts = df_cuaca['cuaca'].value_counts()
+        st.markdown(f"""
+            <style>
+            .st-emotion-cache-1d8vwwt.e1lln2w84, #Jenis-Cuaca{{
+                background: rgba(255, 255, 255, 0.15);
+                backdrop-filter: blur(10px);
+                border: 1px solid rgba(255, 255, 255, 0.2);
+            }}
+            </style>
+            """, unsafe_allow_html=True)
+        
+        with st.container(border=True):
+            st.subheader("🌤️ Jenis Cuaca")
+            for cuaca, count in cuaca_counts.head(5).items():
+                emoji = get_weather_emoji(cuaca)
+                st.write(f"{emoji} **{cuaca}:** {count} kali")
+
+
+# Pilihan rentang waktu perbandingan -> frekuensi bucket untuk bmkg.ringkas_wilayah
+RENTANG_PERBANDINGAN = {"Seluruh periode": None, "Per hari": "1D", "Per 6 jam": "6h"}
+KOLOM_PERBANDINGAN = {
+    "suhu_min": "Suhu min (°C)",
+    "suhu_max": "Suhu maks (°C)",
+    "kelembaban_max": "Kelembaban maks (%)",
+    "cuaca_dominan": "Cuaca dominan",
+}
+# Di atas jumlah baris ini peta panas tidak lagi terbaca; tabel tetap bisa dipakai
+MAKS_BARIS_PETA = 400
+
+@st.fragment
+@diukur("perbandingan")
+def bagian_perbandingan(df_bulk, kode_massal):
+    """Perbandingan suhu, kelembaban, dan cuaca dominan antar-desa (atau antar-kecamatan) hasil ambil massal."""
+    if df_bulk.empty:
+        st.info("Belum ada prakiraan yang bisa dibandingkan.")
+        return
+    kol_a, kol_b, kol_c = st.columns(3)
+    # Kabupaten/kota bisa berisi ribuan desa: boleh diringkas per kecamatan
+    per_kecamatan = len(kode_massal) == 5 and kol_a.radio(
+        "Kelompokkan per", ["Desa/Kelurahan", "Kecamatan"], horizontal=True, key="banding_level") == "Kecamatan"
+    rentang = kol_b.selectbox("Rentang waktu", list(RENTANG_PERBANDINGAN), key="banding_rentang")
+    tampilan = kol_c.radio("Tampilan", ["Tabel", "Peta panas"], horizontal=True, key="banding_tampilan")
+
+    ringkasan = bmkg.ringkas_wilayah(df_bulk, panjang_kode=8 if per_kecamatan else None,
+                                     bucket=RENTANG_PERBANDINGAN[rentang]).reset_index()
+    kode_wilayah = ringkasan['wilayah'].astype(str)
+    ringkasan.insert(1, 'nama', df_wilayah['nama_bersih'].reindex(kode_wilayah).to_numpy())
+
+    if tampilan == "Tabel":
+        # st.dataframe bisa diurutkan per kolom langsung di browser
+        st.dataframe(ringkasan.rename(columns={"wilayah": "Kode", "nama": "Nama", "waktu": "Waktu",
+                                               "jumlah": "Jumlah data", **KOLOM_PERBANDINGAN}),
+                     use_container_width=True, hide_index=True)
+        return
+
+    if ringkasan['wilayah'].nunique() > MAKS_BARIS_PETA:
+        st.info(f"Lebih dari {MAKS_BARIS_PETA} wilayah; kelompokkan per kecamatan atau gunakan tampilan tabel.")
+        return
+    import altair as alt
+
+    metrik = st.selectbox("Nilai", list(KOLOM_PERBANDINGAN), format_func=KOLOM_PERBANDINGAN.get, key="banding_metrik")
+    warna = (alt.Color(f"{metrik}:N", title=KOLOM_PERBANDINGAN[metrik]) if metrik == "cuaca_dominan" else
+             alt.Color(f"{metrik}:Q", title=KOLOM_PERBANDINGAN[metrik],
+                       scale=alt.Scale(scheme="blues" if metrik == "kelembaban_max" else "redyellowblue",
+                                       reverse=metrik != "kelembaban_max")))
+    data = ringkasan.assign(
+        label=ringkasan['nama'].fillna(kode_wilayah) + " (" + kode_wilayah + ")",
+        periode=ringkasan['waktu'].dt.strftime("%Y-%m-%d %H:%M") if "waktu" in ringkasan else rentang,
+    ).drop(columns="waktu", errors="ignore")
+    peta = alt.Chart(data).mark_rect().encode(
+        x=alt.X("periode:O", title="Waktu lokal"),
+        y=alt.Y("label:N", title=None, sort=alt.EncodingSortField(field=metrik, op="max", order="descending")),
+        color=warna,
+        tooltip=["wilayah", "nama", "periode"] + list(KOLOM_PERBANDINGAN),
+    ).properties(height=max(200, 14 * ringkasan['wilayah'].nunique()))
+    st.altair_chart(peta, use_container_width=True)
+
+
 # ========== Streamlit App ==========
 st.title("⛅ Prediksi Cuaca Detail per Wilayah")
+logger.info("tampilan awal: %.1f ms", (time.perf_counter() - _mulai_skrip) * 1e3)
 
 # Inisialisasi session state untuk semua level
 if 'prov_id' not in st.session_state:
@@ -405,52 +637,118 @@ if 'kec_id' not in st.session_state:
     st.session_state.kec_id = None
 if 'desa_id' not in st.session_state:
     st.session_state.desa_id = None
-if 'df_cuaca' not in st.session_state:
-    st.session_state.df_cuaca = None
+if 'adm4_cuaca' not in st.session_state:
+    reset_hasil_cuaca()
+if 'bulk_kode' not in st.session_state:
+    st.session_state.bulk_kode = None
+
+# Data wilayah baru dimuat setelah tema dan judul terkirim ke browser,
+# sehingga kerangka halaman sudah tampil selama snapshot dibaca
+with st.spinner("Memuat data wilayah..."):
+    try:
+        df_wilayah = load_data_wilayah()
+    except (OSError, ValueError) as e:
+        # OSError termasuk gagal mengunduh base.csv (URLError)
+        st.error(f"Data wilayah tidak tersedia ({e}). Jalankan `python wilayah.py build` "
+                 "atau periksa koneksi ke GitHub untuk mengunduh base.csv.")
+        st.stop()
+    indeks_wilayah = load_indeks_wilayah()
 
 # --- SIDEBAR UNTUK KONTROL ---
 with st.sidebar:
     st.header("📍 Pilih Lokasi Detail")
+    # Pencarian langsung ke desa/kelurahan tanpa melewati empat pilihan bertingkat
+    kueri = st.text_input("🔎 Cari Desa/Kelurahan", key="kueri_wilayah", placeholder="mis. Menteng Jakarta Pusat")
+    if kueri:
+        # Indeks pencarian baru dibangun saat kotak pencarian pertama kali dipakai
+        indeks_cari = load_indeks_cari()
+        hasil_cari = indeks_cari.cari(kueri, k=10)
+        if hasil_cari:
+            st.selectbox("Hasil pencarian", options=hasil_cari, format_func=indeks_cari.label_dari, key="hasil_cari",
+                         on_change=pilih_hasil_cari, index=None, placeholder=f"{len(hasil_cari)} wilayah cocok, pilih salah satu...")
+        else:
+            st.caption("Tidak ada desa/kelurahan yang cocok.")
+
     # Pilihan Provinsi
-    df_prov = df_wilayah[df_wilayah['level'] == 0]
-    st.selectbox("Provinsi", options=df_prov.index, format_func=lambda id: df_prov.loc[id, 'nama_bersih'], key="prov_id",on_change=reset_selections_on_kec_change, index=None, placeholder="Pilih Provinsi...")
+    prov_ids = wilayah.get_children(indeks_wilayah)
+    st.selectbox("Provinsi", options=prov_ids, format_func=lambda id: df_wilayah.at[id, 'nama_bersih'], key="prov_id", on_change=reset_selections_on_prov_change, index=None, placeholder="Pilih Provinsi...")
 
     # Pilihan Kabupaten/Kota
     if st.session_state.prov_id:
-        df_kab = df_wilayah[(df_wilayah['level'] == 1) & (df_wilayah.index.str.startswith(st.session_state.prov_id + '.'))]
-        st.selectbox("Kabupaten/Kota", options=df_kab.index, format_func=lambda id: df_kab.loc[id, 'nama_bersih'], key="kab_id",on_change=reset_selections_on_kec_change, index=None, placeholder="Pilih Kabupaten/Kota...")
+        kab_ids = wilayah.get_children(indeks_wilayah, st.session_state.prov_id)
+        st.selectbox("Kabupaten/Kota", options=kab_ids, format_func=lambda id: df_wilayah.at[id, 'nama_bersih'], key="kab_id", on_change=reset_selections_on_kab_change, index=None, placeholder="Pilih Kabupaten/Kota...")
 
     # Pilihan Kecamatan
     if st.session_state.kab_id:
-        df_kec = df_wilayah[(df_wilayah['level'] == 2) & (df_wilayah.index.str.startswith(st.session_state.kab_id + '.'))]
-        st.selectbox("Kecamatan", options=df_kec.index, format_func=lambda id: df_kec.loc[id, 'nama_bersih'], key="kec_id", on_change=reset_selections_on_kec_change, index=None, placeholder="Pilih Kecamatan...")
+        kec_ids = wilayah.get_children(indeks_wilayah, st.session_state.kab_id)
+        st.selectbox("Kecamatan", options=kec_ids, format_func=lambda id: df_wilayah.at[id, 'nama_bersih'], key="kec_id", on_change=reset_selections_on_kec_change, index=None, placeholder="Pilih Kecamatan...")
 
     # --- PERUBAHAN KUNCI: Pilihan Desa/Kelurahan ---
     if st.session_state.kec_id:
-        df_desa = df_wilayah[(df_wilayah['level'] == 3) & (df_wilayah.index.str.startswith(st.session_state.kec_id + '.'))]
-        st.selectbox("Desa/Kelurahan", options=df_desa.index, format_func=lambda id: df_desa.loc[id, 'nama_bersih'], key="desa_id", index=None, placeholder="Pilih Desa/Kelurahan...")
+        desa_ids = wilayah.get_children(indeks_wilayah, st.session_state.kec_id)
+        st.selectbox("Desa/Kelurahan", options=desa_ids, format_func=lambda id: df_wilayah.at[id, 'nama_bersih'], key="desa_id", on_change=reset_hasil_cuaca, index=None, placeholder="Pilih Desa/Kelurahan...")
 
     # Tombol ambil data aktif jika desa/kelurahan sudah dipilih
     if st.session_state.desa_id:
         if st.button("🌦️ Ambil Data Cuaca", use_container_width=True, type="primary"):
             desa_nama = df_wilayah.loc[st.session_state.desa_id, 'nama_bersih']
             with st.spinner(f"Mengambil data untuk {desa_nama}..."):
-                # Ambil data cuaca
+                # Ambil data cuaca; frame tetap di cache bersama, sesi hanya menyimpan kuncinya
                 hasil_data = get_bmkg_data(st.session_state.desa_id)
-                st.session_state.df_cuaca = hasil_data
-                # Jika data berhasil didapat (bukan string error), latih model
-                if isinstance(hasil_data, pd.DataFrame) and not hasil_data.empty:
-                    st.session_state.model = train_model(hasil_data)
+                if get_pemanas() is not None:
+                    get_pemanas().catat(st.session_state.desa_id)
+                reset_hasil_cuaca()
+                if isinstance(hasil_data, pd.DataFrame):
+                    st.session_state.adm4_cuaca = st.session_state.desa_id
+                    st.session_state.versi_cuaca = model_cuaca.fingerprint(st.session_state.desa_id, hasil_data)
                 else:
-                    # Jika gagal, pastikan model lama dihapus
-                    st.session_state.model = None
+                    st.session_state.error_cuaca = hasil_data
     else:
         st.info("Pilih wilayah hingga level Desa/Kelurahan untuk mengambil data.")
 
+    # Ambil massal untuk seluruh desa di kecamatan (atau kabupaten/kota) terpilih
+    kode_massal = st.session_state.kec_id or st.session_state.kab_id
+    if kode_massal:
+        label_massal = "Kecamatan" if st.session_state.kec_id else "Kabupaten/Kota"
+        desa_massal = wilayah.get_desa(indeks_wilayah, kode_massal)
+        if st.button(f"📦 Ambil Semua Desa di {label_massal} ({len(desa_massal)})", use_container_width=True):
+            progress = st.progress(0.0, text="Mengambil data massal...")
+
+            def update_progress(kode, hasil, selesai, total):
+                progress.progress(selesai / total, text=f"{selesai}/{total} desa selesai")
+
+            get_bulk_cache().put(kode_massal, bmkg.get_bulk_bmkg_data(
+                desa_massal, fetch=get_bmkg_data, on_result=update_progress, perlu_dibatasi=perlu_ambil_bmkg))
+            st.session_state.bulk_kode = kode_massal
+            progress.empty()
+
+    with st.expander("Statistik cache prakiraan"):
+        st.json(get_forecast_cache().stats())
+        if get_cache_bersama("prakiraan") is not None:
+            st.caption("Cache bersama (semua replika)")
+            st.json(get_cache_bersama("prakiraan").stats())
+        if get_pemanas() is not None:
+            st.caption("Pemanas cache (desa terpopuler)")
+            st.json(get_pemanas().stats())
+
 
 # --- KONTEN UTAMA ---
-# Cek hasil dari session state
-hasil_cuaca = st.session_state.df_cuaca
+# Sesi hanya menyimpan kode desa; frame diambil dari cache prakiraan bersama
+# (dimuat ulang otomatis bila kedaluwarsa atau sudah terbuang dari cache)
+if st.session_state.error_cuaca:
+    hasil_cuaca = st.session_state.error_cuaca
+elif st.session_state.adm4_cuaca:
+    hasil_cuaca = get_bmkg_data(st.session_state.adm4_cuaca)
+    # Versi = fingerprint frame (waktu terbit + isi). Jika cache sudah memuat prakiraan
+    # baru, model sesi dilatih ulang untuk frame ini (warm_start dari model sebelumnya)
+    if isinstance(hasil_cuaca, pd.DataFrame):
+        versi = model_cuaca.fingerprint(st.session_state.adm4_cuaca, hasil_cuaca)
+        if versi != st.session_state.versi_cuaca:
+            st.session_state.versi_cuaca = versi
+            st.session_state.model_kunci = None
+            st.session_state.model_future = None
+else:
+    hasil_cuaca = None
 col1, col2 = st.columns([2, 1])
 
 with col1:
@@ -460,220 +758,55 @@ with col1:
         st.error(hasil_cuaca)
     elif not hasil_cuaca.empty:
         df_cuaca = hasil_cuaca
-        nama_lokasi = f"{df_wilayah.loc[st.session_state.desa_id, 'nama_bersih']}, Kec. {df_wilayah.loc[st.session_state.kec_id, 'nama_bersih']}, Kab. {df_wilayah.loc[st.session_state.kab_id, 'nama_bersih']}, Prov. {df_wilayah.loc[st.session_state.prov_id, 'nama_bersih']}"
+        # Nama dari kode desa yang datanya ditampilkan, bukan dari pilihan sidebar saat ini
+        kode_desa = st.session_state.adm4_cuaca
+        nama_lokasi = f"{df_wilayah.loc[kode_desa, 'nama_bersih']}, Kec. {df_wilayah.loc[kode_desa[:8], 'nama_bersih']}, Kab. {df_wilayah.loc[kode_desa[:5], 'nama_bersih']}, Prov. {df_wilayah.loc[kode_desa[:2], 'nama_bersih']}"
         st.subheader(f"Perkiraan Cuaca untuk: {nama_lokasi}")
 
-        # Tampilan kartu cuaca (sama seperti sebelumnya)
-        cols_per_row = 4
-        df_display = df_cuaca.head(8)
-
-        # 1. Dapatkan 3 warna dominan dari 8 kartu yang akan ditampilkan
-        dominant_colors = get_dominant_colors(df_display, num_colors=3)
-        
-        # 2. CSS untuk latar belakang halaman
-        page_bg_css = get_page_background_style(dominant_colors)
-        st.markdown(page_bg_css, unsafe_allow_html=True)
-
-        for i in range(0, len(df_display), cols_per_row):
-            cols = st.columns(cols_per_row)
-            chunk = df_display.iloc[i:i+cols_per_row]
-            st.markdown("""
-                <style>
-                    .card-cuaca {
-                        border: 1px solid #ddd;
-                        border-radius: 10px;
-                        padding: 15px;
-                        text-align: center;
-                        background-color: #f8f9fa;
-                        margin: 5px;
-                        transition: transform 0.3s ease-in-out, box-shadow 0.3s ease-in-out, background-color 0.3s ease-in-out;
-                        cursor: pointer;
-                    }
-
-                    .card-cuaca:hover {
-                        transform: scale(1.05);
-                        box-shadow: 0 8px 16px rgba(0, 0, 0, 0.2);
-                        filter: brightness(1.05);
-                    }
-                </style>
-            """, unsafe_allow_html=True)
-            for idx, col in enumerate(cols):
-                if idx < len(chunk):
-                    row = chunk.iloc[idx]
-                    jam = row['local'].strftime('%H:%M')
-                    tanggal = row['local'].strftime('%d %b %Y')
-                    suhu = f"{row['suhu']}°C"
-                    kelembaban = f"{row['kelembaban']}%"
-                    cuaca = row['cuaca']
-                    emoji = get_weather_emoji(cuaca)
-                    with col:
-                        style_background = get_gradient_color(cuaca)
-                        text_style = get_text_styles(cuaca)
-                        st.markdown(f"""
-                        
-                        <div class="card-cuaca" style="
-                                border: 1px solid #ddd;
-                                border-radius: 10px;
-                                padding: 15px;
-                                text-align: center;
-                                background-color: #f8f9fa;
-                                {style_background}
-                                margin: 5px;
-                                transition: 0.3s ease-in-out;
-                                transition: transform 0.3s ease-in-out, box-shadow 0.3s ease-in-out;
-                            ">
-                            <div style="display: inline-flex; justify-content: center; align-items: center; background: rgba(255,255,255,0.6); border-radius: 50%; aspect-ratio: 1 / 1; width: 3rem;">
-                                <span style="font-size: 2rem;">{emoji}</span>
-                            </div>
-                            <p style="font-weight: bold; font-weight: bold; color: #666;{text_style['jam']}">{jam}</p>
-                            <p style="margin: 2px 0; font-size: 12px; color: #888;{text_style['tanggal']}">{tanggal}</p>
-                            <p style="font-weight: bold; color: #e74c3c; margin-top: 5px;{text_style['suhu']}">{suhu}</p>
-                            <p style="margin: 2px 0; font-size: 12px; color: #3498db;{text_style['kelembaban']}">{kelembaban}</p>
-                            <p style="font-size: 0.8em; color: #555; height: 30px;{text_style['cuaca']}">{cuaca}</p>
-                        </div>
-                        """, unsafe_allow_html=True)
-
-        # Grafik Suhu
-        st.subheader("📊 Grafik Perkiraan 24 Jam ke Depan")
-
-        # Filter data untuk 24 jam
-        df_24h = filter_24_hours(df_cuaca)
-
-        if len(df_24h) > 1:
-            fig, ax1 = plt.subplots(figsize=(12, 6))
-            
-            # Plot suhu pada sumbu Y pertama (kiri)
-            color = 'tab:red'
-            ax1.set_xlabel('Waktu (24 Jam ke Depan)')
-            ax1.set_ylabel('Suhu (°C)', color=color)
-            ax1.plot(df_24h['local'], df_24h['suhu'], color=color, marker='o', linewidth=2, label='Suhu')
-            ax1.tick_params(axis='y', labelcolor=color)
-            ax1.grid(True, which='major', linestyle='--', linewidth='0.5', color='grey')
-            
-            # Format sumbu X untuk menampilkan jam dengan interval 3 jam
-            ax1.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M'))
-            ax1.xaxis.set_major_locator(mdates.HourLocator(interval=3))
-            plt.setp(ax1.xaxis.get_majorticklabels(), rotation=45, ha="right")
-            
-            # Membuat sumbu Y kedua yang berbagi sumbu X yang sama (twinx)
-            ax2 = ax1.twinx()
-            color = 'tab:blue'
-            ax2.set_ylabel('Kelembaban (%)', color=color)
-            ax2.plot(df_24h['local'], df_24h['kelembaban'], color=color, marker='s', linestyle='--', linewidth=2, label='Kelembaban')
-            ax2.tick_params(axis='y', labelcolor=color)
-            
-            # Judul dan layout
-            plt.title('Perkiraan Suhu dan Kelembaban', fontsize=16, fontweight='bold')
-            fig.tight_layout()  # Menyesuaikan layout agar tidak ada yang terpotong
-            
-            # Menambahkan legenda gabungan dari kedua sumbu
-            lines1, labels1 = ax1.get_legend_handles_labels()
-            lines2, labels2 = ax2.get_legend_handles_labels()
-            ax1.legend(lines1 + lines2, labels1 + labels2, loc='upper left')
-            
-            st.pyplot(fig)
-            plt.close(fig)  # Tutup figure untuk menghemat memori
-        else:
-            st.warning("Data tidak cukup untuk membuat grafik 24 jam.")
+        bagian_kartu(df_cuaca)
+        bagian_grafik(df_cuaca, st.session_state.adm4_cuaca)
     else:
         st.warning("Tidak ada data cuaca yang dapat ditampilkan untuk wilayah ini.")
 
 with col2:
-    # Kondisi sekarang memeriksa 'df_cuaca' dan 'model'
-    if ("df_cuaca" in st.session_state and 
-        isinstance(st.session_state.df_cuaca, pd.DataFrame) and 
-        not st.session_state.df_cuaca.empty):
-        
-        df_cuaca = st.session_state.df_cuaca
-
-        # Bagian Prediksi Manual sekarang akan muncul jika model ada
-        if "model" in st.session_state and st.session_state.model:
-            st.subheader("🧠 Prediksi Cuaca Manual")
-            st.markdown("Masukkan nilai suhu dan kelembaban untuk prediksi cuaca:")
-            
-            input_suhu = st.slider("Suhu (°C)", 10, 40, 28)
-            input_kelembaban = st.slider("Kelembaban (%)", 20, 100, 70)
-
-            if st.button("🔍 Prediksi", use_container_width=True):
-                df_input = pd.DataFrame([{"suhu": input_suhu, "kelembaban": input_kelembaban}])
-                
-                # Gunakan model dari session state
-                model = st.session_state.model
-                hasil = model.predict(df_input)[0]
-                emoji = get_weather_emoji(hasil)
-                
-                st.markdown(f"""
-                <div style="border: 2px solid #27ae60; border-radius: 10px; padding: 20px; text-align: center; background-color: #d5f4e6; margin: 10px 0;">
-                    <h2 style="margin: 0; color: #27ae60;">{emoji}</h2>
-                    <h4 style="margin: 10px 0; color: #27ae60;">Prediksi Cuaca:</h4>
-                    <h3 style="margin: 0; color: #2c3e50;">{hasil}</h3>
-                </div>
-                """, unsafe_allow_html=True)
-        
-        # Info tambahan
-        st.subheader("📈 Statistik Data")
-        df_stats = df_cuaca[['suhu', 'kelembaban']].describe()
-        
-        html_table = df_stats.to_html(classes="custom-blur-table", border=0)
-
-        # Inject CSS
-        st.markdown("""
-            <style>
-            .custom-blur-table {
-                width: 100%;
-                border-collapse: collapse;
-                background: rgba(255, 255, 255, 0.2);
-                backdrop-filter: blur(10px);
-                -webkit-backdrop-filter: blur(10px);
-                border-radius: 12px;
-                overflow: hidden;
-                font-size: 14px;
-                color: black;
-            }
-
-            .custom-blur-table th {
-                background-color: rgb(108, 155, 207, 0.3);
-                color: white;
-                padding: 10px;
-            }
-
-            .custom-blur-table td {
-                padding: 8px;
-                border: 1px solid rgba(255, 255, 255, 0.4);
-                text-align: center;
-            }
-            </style>
-        """, unsafe_allow_html=True)
+    # Kondisi sekarang memeriksa data cuaca dan model
+    if isinstance(hasil_cuaca, pd.DataFrame) and not hasil_cuaca.empty:
+        df_cuaca = hasil_cuaca
 
-        # Tampilkan HTML-nya
-        st.markdown(html_table, unsafe_allow_html=True)
-        # st.dataframe(df_stats)
-    
-        if 'cuaca' in df_cuaca.columns:
-            cuaca_counts = df_cuaca['cuaca'].value_counts()
-            if 'cuaca' in df_cuaca.columns and not df_cuaca['cuaca'].isnull().all():
-                cuaca_dominan = df_cuaca['cuaca'].value_counts().idxmax()
-                style_background_page = get_page_background_style(cuaca_dominan)
-                st.markdown(style_background_page, unsafe_allow_html=True)\
-            
-            st.markdown(f"""
-                <style>
-                .st-emotion-cache-1d8vwwt.e1lln2w84, #Jenis-Cuaca{{
-                    background: rgba(255, 255, 255, 0.15);
-                    backdrop-filter: blur(10px);
-                    border: 1px solid rgba(255, 255, 255, 0.2);
-                }}
-                </style>
-                """, unsafe_allow_html=True)
-            
-            with st.container(border=True):
-                st.subheader("🌤️ Jenis Cuaca")
-                for cuaca, count in cuaca_counts.head(5).items():
-                    emoji = get_weather_emoji(cuaca)
-                    st.write(f"{emoji} **{cuaca}:** {count} kali")
+        # Bagian Prediksi Manual muncul jika model ada (model dari cache bersama)
+        model = get_model(df_cuaca, st.session_state.adm4_cuaca)
+        if st.session_state.model_future is not None:
+            tunggu_model()
+        if model is not None:
+            bagian_prediksi(model, df_cuaca.attrs.get("timezone", "Asia/Jakarta"))
+        
+        bagian_statistik(df_cuaca)
 
     # Jika belum ada data, tampilkan placeholder
     else:
         st.subheader("🧠 Info Tambahan")
         st.info("Prediksi manual dan statistik data akan muncul di sini setelah data cuaca berhasil diambil.")
-    
+
+# --- PRAKIRAAN MASSAL ---
+# Hanya peek: memuat ulang seluruh desa di thread skrip akan memblokir halaman
+# bermenit-menit tanpa progress bar
+bulk_entry = get_bulk_cache().peek(st.session_state.bulk_kode) if st.session_state.bulk_kode else None
+if st.session_state.bulk_kode and (bulk_entry is None or bulk_entry[0] >= get_bulk_cache().ttl + get_bulk_cache().stale_ttl):
+    # Terbuang oleh ambil massal sesi lain atau sudah terlalu tua
+    st.session_state.bulk_kode = None
+    st.info("Hasil ambil massal sudah tidak tersedia. Tekan tombol 📦 Ambil Semua Desa untuk mengambilnya lagi.")
+elif st.session_state.bulk_kode:
+    if bulk_entry[0] >= get_bulk_cache().ttl:
+        get_bulk_cache().refresh_async(st.session_state.bulk_kode)
+    df_bulk, bulk_errors = bulk_entry[1]
+    st.subheader(f"📦 Prakiraan Massal ({df_bulk['adm4'].nunique()} desa)")
+    if bulk_errors:
+        st.warning(f"{len(bulk_errors)} desa gagal diambil dari BMKG.")
+    tab_banding, tab_mentah = st.tabs(["📊 Perbandingan wilayah", "🗂️ Data mentah"])
+    with tab_banding:
+        bagian_perbandingan(df_bulk, st.session_state.bulk_kode)
+    with tab_mentah:
+        df_bulk_tampil = df_bulk.assign(desa=df_wilayah.loc[df_bulk['adm4'], 'nama_bersih'].to_numpy())
+        st.dataframe(df_bulk_tampil[['adm4', 'desa', 'local', 'suhu', 'kelembaban', 'cuaca']], use_container_width=True, hide_index=True)
+
+logger.info("skrip penuh: %.1f ms", (time.perf_counter() - _mulai_skrip) * 1e3)
@@ -0,0 +1,90 @@
+"""
+Ringkasan perbandingan banyak wilayah: bmkg.ringkas_wilayah vs loop per desa.
+
+Membuat frame long-format sintetis (seperti keluaran get_bulk_bmkg_data)
+untuk ribuan desa, lalu membandingkan:
+
+- loop: per desa, describe() + value_counts() seperti panel statistik satu desa;
+- ringkas_wilayah per desa (seluruh periode), per desa per hari, dan per
+  kecamatan per 6 jam.
+
+Hasil loop dan ringkas_wilayah per desa harus sama (suhu min/maks,
+kelembaban maks, dan jumlah kemunculan cuaca dominan).
+
+Jalankan dari root repo:
+    python -m benchmarks.bench_banding [--desa 5000] [--hari 3] [--loop 500]
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+import bmkg
+from benchmarks.data_sintetis import CUACA_BMKG
+
+
+def buat_frame_bulk(n_desa, hari, rng):
+    kode = np.array([f"32.{1 + i // 4000:02d}.{1 + i // 20 % 200:02d}.{1001 + i % 20}" for i in range(n_desa)])
+    utc = pd.date_range(pd.Timestamp.now().floor("D"), periods=hari * 8, freq="3h").to_numpy()
+    n = n_desa * len(utc)
+    cuaca = [desc for _, desc, _ in CUACA_BMKG]
+    return pd.DataFrame({
+        "adm4": pd.Categorical(np.repeat(kode, len(utc))),
+        "utc": np.tile(utc, n_desa),
+        "local": np.tile(utc + np.timedelta64(7, "h"), n_desa),
+        "suhu": rng.integers(20, 35, n).astype("int16"),
+        "kelembaban": rng.integers(50, 100, n).astype("int16"),
+        "cuaca": pd.Categorical.from_codes(rng.integers(0, len(cuaca), n), categories=cuaca),
+    })
+
+
+def _ukur(fn, ulang=3):
+    terbaik = float("inf")
+    for _ in range(ulang):
+        mulai = time.perf_counter()
+        hasil = fn()
+        terbaik = min(terbaik, time.perf_counter() - mulai)
+    return terbaik, hasil
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--desa", type=int, default=5000)
+    parser.add_argument("--hari", type=int, default=3)
+    parser.add_argument("--loop", type=int, default=500, help="jumlah desa untuk loop (diekstrapolasi ke --desa)")
+    args = parser.parse_args()
+
+    df = buat_frame_bulk(args.desa, args.hari, np.random.default_rng(0))
+    print(f"{args.desa} desa x {args.hari * 8} baris = {len(df)} baris")
+
+    sampel = df[df['adm4'].isin(df['adm4'].cat.categories[:args.loop])]
+
+    def loop():
+        hasil = {}
+        for kode, bagian in sampel.groupby('adm4', observed=True):
+            statistik = bagian[['suhu', 'kelembaban']].describe()
+            jumlah = bagian['cuaca'].value_counts()
+            hasil[kode] = (statistik.at['min', 'suhu'], statistik.at['max', 'suhu'],
+                           statistik.at['max', 'kelembaban'], jumlah.iloc[0])
+        return hasil
+
+    t_loop, hasil_loop = _ukur(loop, ulang=1)
+    print(f"loop per desa            : {t_loop * 1e3 / args.loop * args.desa:8.1f} ms (ekstrapolasi dari {args.loop} desa)")
+
+    for label, kwargs in (("per desa", {}), ("per desa per hari", {"bucket": "1D"}),
+                          ("per kec per 6 jam", {"panjang_kode": 8, "bucket": "6h"})):
+        kwargs = {"bucket": None, **kwargs}
+        t, hasil = _ukur(lambda: bmkg.ringkas_wilayah(df, **kwargs))
+        print(f"ringkas {label:<17}: {t * 1e3:8.1f} ms  ({len(hasil)} baris)")
+        if label == "per desa":
+            jumlah = df.groupby(['adm4', 'cuaca'], observed=True).size()
+            for kode, (s_min, s_max, k_max, n_dominan) in hasil_loop.items():
+                baris = hasil.loc[kode]
+                assert (baris.suhu_min, baris.suhu_max, baris.kelembaban_max) == (s_min, s_max, k_max), kode
+                assert jumlah[(kode, baris.cuaca_dominan)] == n_dominan, kode
+
+
+if __name__ == "__main__":
+    main()
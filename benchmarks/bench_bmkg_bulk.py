@@ -0,0 +1,40 @@
+"""
+Throughput ambil massal prakiraan terhadap server BMKG tiruan.
+
+Membandingkan pengambilan berurutan dengan thread pool berbagai ukuran,
+serta efek batas laju (--rate, request per menit).
+
+Jalankan dari root repo:
+    python -m benchmarks.bench_bmkg_bulk [--n 200] [--latensi 0.05] [--rate 0]
+"""
+
+import argparse
+import time
+
+import bmkg
+from benchmarks.stub_bmkg import StubBMKG
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=200, help="jumlah desa")
+    parser.add_argument("--latensi", type=float, default=0.05, help="latensi server per request (detik)")
+    parser.add_argument("--rate", type=float, default=0, help="batas request per menit (0 = tanpa batas)")
+    parser.add_argument("--workers", default="1,4,8,16", help="daftar ukuran pool")
+    parser.add_argument("--rekaman", help="direktori berisi <adm4>.json hasil rekaman")
+    args = parser.parse_args()
+
+    kode_list = [f"31.71.{kec:02d}.{1000 + d}" for kec in range(1, 11) for d in range(args.n // 10)]
+    with StubBMKG(rekaman=args.rekaman, latensi=args.latensi) as stub:
+        bmkg.BMKG_API_URL = stub.url
+        print(f"{len(kode_list)} desa, latensi server {args.latensi * 1e3:.0f} ms, batas laju {args.rate or '-'} /menit")
+        for workers in [int(w) for w in args.workers.split(",")]:
+            mulai = time.perf_counter()
+            df, errors = bmkg.get_bulk_bmkg_data(kode_list, max_workers=workers, rate_per_min=args.rate)
+            durasi = time.perf_counter() - mulai
+            assert df['adm4'].nunique() == len(kode_list) and not errors
+            print(f"workers {workers:>3}: {durasi:6.2f} s  {len(kode_list) / durasi:7.1f} desa/s  {len(df)} baris")
+
+
+if __name__ == "__main__":
+    main()
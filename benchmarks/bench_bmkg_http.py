@@ -0,0 +1,71 @@
+"""
+Latensi jalur dingin get_bmkg_data: `requests.get` polos vs session bersama.
+
+Server tiruan (benchmarks.stub_bmkg) menambahkan latensi pada setiap koneksi
+baru untuk meniru biaya handshake TCP/TLS ke api.bmkg.go.id, dan bisa
+menyuntikkan error 503 berkala untuk menguji retry.
+
+Jalankan dari root repo:
+    python -m benchmarks.bench_bmkg_http [--n 50] [--rekaman path/rekaman]
+"""
+
+import argparse
+import statistics
+import time
+
+import requests
+
+import bmkg
+from benchmarks.stub_bmkg import StubBMKG
+
+
+def _ambil_polos(url, kode):
+    resp = requests.get(url, params={"adm4": kode}, timeout=10)
+    resp.raise_for_status()
+    return bmkg.parse_prakiraan(resp.json())
+
+
+def _ukur(fungsi, kode_list):
+    latensi = []
+    gagal = 0
+    for kode in kode_list:
+        mulai = time.perf_counter()
+        try:
+            hasil = fungsi(kode)
+            gagal += isinstance(hasil, str)
+        except requests.exceptions.RequestException:
+            gagal += 1
+        latensi.append(time.perf_counter() - mulai)
+    return latensi, gagal
+
+
+def _ringkas(nama, latensi, gagal):
+    p95 = sorted(latensi)[int(len(latensi) * 0.95) - 1]
+    print(f"{nama:<16} median {statistics.median(latensi) * 1e3:7.1f} ms  p95 {p95 * 1e3:7.1f} ms  gagal {gagal}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=50, help="jumlah request berurutan")
+    parser.add_argument("--rekaman", help="direktori berisi <adm4>.json hasil rekaman")
+    parser.add_argument("--latensi-koneksi", type=float, default=0.05, help="detik per koneksi baru")
+    parser.add_argument("--gagal-setiap", type=int, default=10, help="setiap request ke-N dibalas 503 (0 = tidak)")
+    args = parser.parse_args()
+
+    kode_list = [f"31.71.03.{1000 + i}" for i in range(args.n)]
+    with StubBMKG(rekaman=args.rekaman, latensi_koneksi=args.latensi_koneksi, gagal_setiap=args.gagal_setiap) as stub:
+        latensi, gagal = _ukur(lambda kode: _ambil_polos(stub.url, kode), kode_list)
+        koneksi_polos = stub.jumlah_koneksi
+        _ringkas("requests.get", latensi, gagal)
+
+        bmkg.BMKG_API_URL = stub.url
+        session = bmkg.create_session()
+        stub.jumlah_koneksi = 0
+        latensi, gagal = _ukur(lambda kode: bmkg.get_bmkg_data(kode, session=session), kode_list)
+        _ringkas("session bersama", latensi, gagal)
+
+    print(f"koneksi dibuka: polos {koneksi_polos}, session {stub.jumlah_koneksi}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Cache bersama antarproses: jumlah request ke BMKG dan jumlah pelatihan model.
+
+Menjalankan beberapa proses (mensimulasikan replika Streamlit) yang
+masing-masing punya beberapa thread. Semua thread di semua proses meminta
+prakiraan untuk daftar desa yang sama dalam urutan acak, lalu melatih model
+untuk desa-desa itu lewat ModelRegistry di direktori yang sama.
+
+- lokal: tiap proses hanya punya TTLCache in-memory sendiri.
+- bersama: TTLCache dan ModelRegistry memakai cache.SharedCache di satu
+  file SQLite, sehingga miss bersamaan untuk desa yang sama di semua proses
+  hanya memanggil BMKG (dan melatih model) sekali.
+
+Jalankan dari root repo:
+    python -m benchmarks.bench_cache_bersama [--proses 4] [--thread 4] [--desa 20]
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.stub_bmkg import StubBMKG
+
+
+def anak(args):
+    import bmkg
+    import cache
+    import model_cuaca
+
+    bersama = args.mode == "bersama"
+    backend = cache.SharedCache(args.db, "prakiraan") if bersama else None
+    prakiraan = bmkg.create_forecast_cache(backend=backend)
+    registry = model_cuaca.ModelRegistry(args.model_dir, backend=cache.SharedCache(args.db, "model") if bersama else None)
+    kode_list = [f"31.71.{i // 10 + 1:02d}.{1001 + i % 10}" for i in range(args.desa)]
+    latih = []
+    kunci_latih = threading.Lock()
+
+    def latih_model(df):
+        with kunci_latih:
+            latih.append(1)
+        return model_cuaca.train_model(df, n_jobs=1, n_estimators=10)
+
+    def pekerja(seed):
+        urutan = random.Random(seed).sample(kode_list, len(kode_list))
+        for kode in urutan:
+            df = prakiraan.get(kode)
+            registry.get_or_train(model_cuaca.fingerprint(kode, df), lambda: latih_model(df))
+
+    # Semua proses mulai bersamaan agar miss-nya benar-benar serentak
+    time.sleep(max(0.0, args.mulai - time.time()))
+    t0 = time.perf_counter()
+    threads = [threading.Thread(target=pekerja, args=(args.seed * 100 + i,)) for i in range(args.thread)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    print(json.dumps({"durasi": time.perf_counter() - t0, "latih": len(latih)}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--proses", type=int, default=4)
+    parser.add_argument("--thread", type=int, default=4, help="thread (sesi) per proses")
+    parser.add_argument("--desa", type=int, default=20)
+    parser.add_argument("--latensi", type=float, default=0.1, help="latensi server per request (detik)")
+    parser.add_argument("--mode", choices=["lokal", "bersama"], help=argparse.SUPPRESS)
+    parser.add_argument("--db", help=argparse.SUPPRESS)
+    parser.add_argument("--model-dir", help=argparse.SUPPRESS)
+    parser.add_argument("--mulai", type=float, help=argparse.SUPPRESS)
+    parser.add_argument("--seed", type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        anak(args)
+        return
+
+    print(f"{args.proses} proses x {args.thread} thread, {args.desa} desa, latensi server {args.latensi * 1e3:.0f} ms")
+    for mode in ("lokal", "bersama"):
+        with tempfile.TemporaryDirectory() as tmp, StubBMKG(latensi=args.latensi) as stub:
+            env = dict(os.environ, BMKG_API_URL=stub.url, PYTHONWARNINGS="ignore")
+            mulai = time.time() + 3.0
+            procs = [subprocess.Popen(
+                [sys.executable, "-W", "ignore", "-m", "benchmarks.bench_cache_bersama", "--mode", mode,
+                 "--db", os.path.join(tmp, "cache.sqlite"), "--model-dir", os.path.join(tmp, "model"),
+                 "--mulai", str(mulai), "--seed", str(p), "--thread", str(args.thread), "--desa", str(args.desa)],
+                env=env, stdout=subprocess.PIPE, text=True) for p in range(args.proses)]
+            hasil = []
+            for p in procs:
+                keluaran, _ = p.communicate()
+                assert p.returncode == 0, f"proses anak gagal ({mode})"
+                hasil.append(json.loads(keluaran.strip().splitlines()[-1]))
+            latih = sum(h["latih"] for h in hasil)
+            durasi = max(h["durasi"] for h in hasil)
+            print(f"{mode:<7}: {stub.jumlah_request:4d} request BMKG, {latih:4d} pelatihan model, "
+                  f"{durasi:5.2f} s (proses terlama)")
+            if mode == "bersama":
+                assert stub.jumlah_request == args.desa, stub.jumlah_request
+                assert latih == args.desa, latih
+
+
+if __name__ == "__main__":
+    main()
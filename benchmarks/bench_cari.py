@@ -0,0 +1,79 @@
+"""
+Latensi pencarian desa: scan str.contains atas nama_bersih vs IndeksNama (trigram).
+
+Kueri diambil dari desa acak pada tabel penuh: nama desa persis, nama desa
+dengan satu huruf salah ketik, "desa kecamatan", dan awalan dua huruf.
+Untuk setiap jenis dilaporkan latensi p50/p95, recall@10 (desa asal ada di
+10 hasil teratas) dan nama@10 (ada hasil bernama sama dengan desa asal;
+nama desa sering berulang sehingga kueri nama saja tidak bisa menunjuk satu
+desa). Untuk awalan: semua hasil berawalan kueri.
+
+Jalankan dari root repo:
+    python -m benchmarks.bench_cari [--kueri 300] [--base-csv path/base.csv]
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+import wilayah
+from benchmarks.data_sintetis import buat_base_csv_df, muat_base_csv_df
+
+
+def _salah_ketik(teks, rng):
+    i = rng.randrange(1, len(teks))
+    return teks[:i] + rng.choice("aiueokrt") + teks[i + 1:]
+
+
+def _ukur(fn, kueri):
+    waktu, hasil = [], []
+    for q in kueri:
+        mulai = time.perf_counter()
+        hasil.append(fn(q))
+        waktu.append((time.perf_counter() - mulai) * 1e3)
+    return np.percentile(waktu, 50), np.percentile(waktu, 95), hasil
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--kueri", type=int, default=300, help="jumlah kueri per jenis")
+    parser.add_argument("--base-csv", help="base.csv asli; default data sintetis ~90 ribu baris")
+    args = parser.parse_args()
+
+    mentah = muat_base_csv_df(args.base_csv) if args.base_csv else buat_base_csv_df()
+    df = wilayah.proses_tabel_wilayah(mentah)
+    mulai = time.perf_counter()
+    indeks = wilayah.build_search_index(df)
+    print(f"bangun indeks: {(time.perf_counter() - mulai) * 1e3:.0f} ms untuk {len(indeks)} desa, "
+          f"{len(indeks._tri)} trigram, {indeks._baris.nbytes / 2**20:.1f} MB posting")
+
+    rng = random.Random(0)
+    sampel = rng.sample(range(len(indeks)), args.kueri)
+    target = [indeks.kode[i] for i in sampel]
+    nama = [df.at[kode, 'nama_bersih'] for kode in target]
+    jenis = {
+        "nama persis": nama,
+        "salah ketik": [_salah_ketik(n, rng) if len(n) > 3 else n for n in nama],
+        "desa + kec": [f"{n} {df.at[kode[:8], 'nama_bersih']}" for n, kode in zip(nama, target)],
+    }
+
+    desa = df[df['level'] == 3]['nama_bersih']
+    for label, kueri in jenis.items():
+        p50, p95, hasil = _ukur(indeks.cari, kueri)
+        recall = np.mean([kode in h for kode, h in zip(target, hasil)])
+        cocok = np.mean([any(df.at[k, 'nama_bersih'] == n for k in h) for n, h in zip(nama, hasil)])
+        print(f"{label:<12}: trigram p50 {p50:6.2f} ms, p95 {p95:6.2f} ms, recall@10 {recall:.2f}, nama@10 {cocok:.2f}")
+    s50, s95, _ = _ukur(lambda q: desa[desa.str.contains(q, case=False, regex=False)].index[:10], jenis["nama persis"])
+    print(f"{'nama persis':<12}: scan    p50 {s50:6.2f} ms, p95 {s95:6.2f} ms (str.contains atas {len(desa)} desa)")
+
+    awalan = [n[:2] for n in nama]
+    p50, p95, hasil = _ukur(indeks.cari, awalan)
+    benar = np.mean([all(df.at[k, 'nama_bersih'].lower().startswith(q.lower()) for k in h) and len(h) > 0
+                     for q, h in zip(awalan, hasil)])
+    print(f"{'awalan 2 hrf':<12}: prefix  p50 {p50:6.2f} ms, p95 {p95:6.2f} ms, hasil berawalan kueri {benar:.2f}")
+
+
+if __name__ == "__main__":
+    main()
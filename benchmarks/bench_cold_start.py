@@ -0,0 +1,122 @@
+"""
+Cold start aplikasi: waktu impor modul dan waktu sampai tampilan awal.
+
+Setiap pengulangan berjalan di interpreter baru agar tidak ada modul yang
+sudah dimuat. Di proses anak:
+
+- impor: mengimpor semua modul yang diimpor app3.py di tingkat atas (dibaca
+  dari sumbernya, jadi ikut berubah bila daftar impornya berubah);
+- tampilan awal: dari awal skrip sampai judul halaman terkirim (log
+  "tampilan awal" di level INFO), sebelum data wilayah dimuat;
+- run pertama: seluruh run pertama halaman kosong, termasuk memuat snapshot
+  wilayah sintetis.
+
+Setelah run pertama, scikit-learn, joblib, dan altair tidak boleh ikut
+termuat karena halaman belum menampilkan prakiraan.
+
+Jalankan dari root repo:
+    python -m benchmarks.bench_cold_start [--ulang 5] [--n-prov 38]
+"""
+
+import argparse
+import ast
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app3.py")
+MODUL_BERAT = ("sklearn", "joblib", "altair")
+
+
+def _impor_atas(path):
+    """Nama modul yang diimpor di tingkat atas file (bukan di dalam fungsi)."""
+    with open(path, encoding="utf-8") as f:
+        pohon = ast.parse(f.read())
+    nama = []
+    for node in pohon.body:
+        if isinstance(node, ast.Import):
+            nama.extend(a.name for a in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0:
+            nama.append(node.module)
+    return nama
+
+
+class _Catat(logging.Handler):
+    def __init__(self):
+        super().__init__(logging.INFO)
+        self.pesan = {}
+
+    def emit(self, record):
+        teks = record.getMessage()
+        for kunci in ("tampilan awal", "skrip penuh"):
+            if teks.startswith(kunci + ":"):
+                self.pesan.setdefault(kunci, float(teks.split(":")[1].split()[0]))
+
+
+def anak():
+    mulai = time.perf_counter()
+    for nama in _impor_atas(APP):
+        __import__(nama)
+    impor = time.perf_counter() - mulai
+
+    from streamlit.testing.v1 import AppTest
+
+    catat = _Catat()
+    logging.getLogger().addHandler(catat)
+    logging.getLogger().setLevel(logging.INFO)
+    at = AppTest.from_file(APP, default_timeout=120)
+    mulai = time.perf_counter()
+    at.run()
+    run_pertama = time.perf_counter() - mulai
+    assert not at.exception, at.exception
+    assert at.title and at.selectbox, "halaman tidak lengkap"
+    termuat = [m for m in MODUL_BERAT if m in sys.modules]
+    assert not termuat, f"modul berat termuat saat cold start: {termuat}"
+    print(json.dumps({"impor": impor * 1e3, "tampilan_awal": catat.pesan["tampilan awal"],
+                      "run_pertama": run_pertama * 1e3}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ulang", type=int, default=5)
+    parser.add_argument("--n-prov", type=int, default=38, help="jumlah provinsi snapshot sintetis")
+    parser.add_argument("--anak", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.anak:
+        anak()
+        return
+
+    import wilayah
+    from benchmarks.data_sintetis import buat_base_csv_df
+
+    with tempfile.TemporaryDirectory() as tmp:
+        base_csv = os.path.join(tmp, "base.csv")
+        buat_base_csv_df(n_prov=args.n_prov).to_csv(base_csv, header=False, index=False)
+        snapshot = os.path.join(tmp, "wilayah.feather")
+        meta = wilayah.build_snapshot(base_csv, snapshot)
+        env = dict(os.environ, WILAYAH_SNAPSHOT=snapshot, RIWAYAT_PATH=os.path.join(tmp, "riwayat.sqlite"),
+                   MODEL_DIR=os.path.join(tmp, "model"), GLOBAL_MODEL_PATH=os.path.join(tmp, "global.joblib"),
+                   SHARED_CACHE_PATH=os.path.join(tmp, "cache_bersama.sqlite"), APP_LOG_LEVEL="INFO")
+
+        hasil = []
+        for _ in range(args.ulang):
+            keluaran = subprocess.run([sys.executable, "-W", "ignore", "-m", "benchmarks.bench_cold_start", "--anak"],
+                                      env=env, check=True, capture_output=True, text=True).stdout
+            hasil.append(json.loads(keluaran.strip().splitlines()[-1]))
+
+    print(f"snapshot sintetis {meta['jumlah']} wilayah, {args.ulang} proses baru (median / maks)")
+    for kunci, label in (("impor", "impor modul"), ("tampilan_awal", "tampilan awal"), ("run_pertama", "run pertama")):
+        nilai = [h[kunci] for h in hasil]
+        print(f"{label:<14}: {statistics.median(nilai):7.0f} / {max(nilai):7.0f} ms")
+    cold = [h["impor"] + h["tampilan_awal"] for h in hasil]
+    print(f"{'impor + awal':<14}: {statistics.median(cold):7.0f} / {max(cold):7.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
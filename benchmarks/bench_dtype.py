@@ -0,0 +1,58 @@
+"""
+Ukuran frame (byte, memory_usage deep) sebelum dan sesudah dtype ringkas.
+
+- wilayah: id/nama/nama_bersih sebagai str objek Python + level int64
+  vs string pyarrow + level int8 (proses_tabel_wilayah / load_snapshot).
+- prakiraan 1 desa: parser lama (int64, cuaca objek) vs parse_prakiraan
+  (int16, cuaca kategorikal, indeks waktu).
+- prakiraan massal: gabungan frame lama dengan adm4 str vs
+  get_bulk_bmkg_data (adm4 dan cuaca kategorikal).
+
+Jalankan dari root repo:
+    python -m benchmarks.bench_dtype [--desa 2000]
+"""
+
+import argparse
+
+import pandas as pd
+
+import bmkg
+import wilayah
+from benchmarks.bench_parse import parse_prakiraan_lama
+from benchmarks.data_sintetis import buat_base_csv_df, buat_payload_bmkg
+
+
+def _byte(df):
+    return int(df.memory_usage(deep=True).sum())
+
+
+def _cetak(nama, lama, baru):
+    a, b = _byte(lama), _byte(baru)
+    print(f"{nama:<26}: {a / 1024:9.1f} kB -> {b / 1024:9.1f} kB ({a / b:4.1f}x)  "
+          f"{dict(baru.dtypes.astype(str))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--desa", type=int, default=2000, help="jumlah desa pada frame massal")
+    args = parser.parse_args()
+
+    mentah = buat_base_csv_df()
+    baru = wilayah.proses_tabel_wilayah(mentah)
+    lama = baru.reset_index().astype({"id": object, "nama": object, "nama_bersih": object, "level": "int64"})
+    _cetak(f"wilayah ({len(baru)})", lama.set_index("id"), baru)
+
+    payload = {kode: buat_payload_bmkg(kode) for kode in
+               [f"31.71.{i // 100 + 1:02d}.{1000 + i % 100}" for i in range(args.desa)]}
+    kode = next(iter(payload))
+    lama = parse_prakiraan_lama(payload[kode])
+    _cetak(f"prakiraan 1 desa ({len(lama)})", lama.astype({"cuaca": object}), bmkg.parse_prakiraan(payload[kode]))
+
+    lama = pd.concat([parse_prakiraan_lama(p).assign(adm4=k) for k, p in payload.items()], ignore_index=True)
+    baru, _ = bmkg.get_bulk_bmkg_data(list(payload), fetch=lambda k: bmkg.parse_prakiraan(payload[k]),
+                                      max_workers=1, rate_per_min=0)
+    _cetak(f"massal {args.desa} desa ({len(baru)})", lama.astype({"cuaca": object, "adm4": object}), baru)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+Timing gaya cuaca: rantai if lama vs klasifikasi + tabel lookup.
+
+Implementasi lama dipertahankan di sini sebagai acuan; paritasnya atas
+seluruh DESKRIPSI_BMKG diuji di tests/test_gaya_cuaca.py.
+
+Jalankan dari root repo:
+    python -m benchmarks.bench_gaya
+"""
+
+import time
+
+import bmkg
+import gaya_cuaca
+from benchmarks.data_sintetis import CUACA_BMKG, buat_payload_bmkg
+
+DESKRIPSI_BMKG = [desc for _, desc, _ in CUACA_BMKG] + [
+    "Petir", "Hujan Sangat Lebat", "Hujan Es", "Badai Petir", "Kabut Asap", "Mendung", "Berawan Tebal",
+]
+KASUS_TEPI = ["", None, float("nan"), "Tidak Diketahui"]
+
+
+# Implementasi lama dari app3.py, dipertahankan sebagai acuan
+# ========== Weather Icon Mapping ==========
+def get_weather_emoji_lama(cuaca_desc):
+    """Memetakan deskripsi cuaca ke emoji."""
+    if not isinstance(cuaca_desc, str): return "❓"
+    cuaca_lower = cuaca_desc.lower()
+    if "cerah berawan" in cuaca_lower: return "🌤️"
+    if "cerah" in cuaca_lower: return "☀️"
+    if "berawan" in cuaca_lower: return "☁️"
+    if "hujan lebat" in cuaca_lower: return "🌧️"
+    if "hujan petir" in cuaca_lower or "badai" in cuaca_lower or "petir" in cuaca_lower: return "⛈️"
+    if "hujan ringan" in cuaca_lower: return "🌦️"
+    if "hujan" in cuaca_lower: return "🌧️"
+    if "kabut" in cuaca_lower or "asap" in cuaca_lower or "udara kabur" in cuaca_lower: return "🌫️"
+    return "🌏"
+
+
+# ========== Weather Color Mapping ==========
+def get_gradient_color_lama(cuaca_desc):
+    if not isinstance(cuaca_desc, str):
+        return "background: linear-gradient(to bottom, #eeeeee, #cccccc);"
+
+    cuaca_lower = cuaca_desc.lower()
+
+    if "cerah berawan" in cuaca_lower:
+        return "background: linear-gradient(to bottom, #d0ecff, #90caf9);"
+    elif "cerah" in cuaca_lower:
+        return "background: linear-gradient(to bottom, #fff176, #fbc02d);"
+    elif "berawan" in cuaca_lower and "cerah" not in cuaca_lower:
+        return "background: linear-gradient(to bottom, #e0e0e0, #9e9e9e);"
+    elif "kabut" in cuaca_lower or "asap" in cuaca_lower or "udara kabur" in cuaca_lower:
+        return "background: linear-gradient(to bottom, #d7ccc8, #a1887f);"
+    elif "hujan lebat" in cuaca_lower:
+        return "background: linear-gradient(to bottom, #a9a9a9, #404040);"
+
+    # ⛈️ Hujan Petir / Badai
+    elif "badai" in cuaca_lower or "petir" in cuaca_lower or "hujan petir" in cuaca_lower:
+        return "background: linear-gradient(to bottom, #888888, #2c3e50);"
+
+    # 🌦️ Hujan Ringan
+    elif "hujan ringan" in cuaca_lower:
+        return "background: linear-gradient(to bottom, #d0d0d0, #888888);"
+
+    # 🌧️ Hujan (umum)
+    elif "hujan" in cuaca_lower:
+        return "background: linear-gradient(to bottom, #cfd8dc, #78909c);"
+
+    # Mendung eksplisit
+    elif "mendung" in cuaca_lower:
+        return "background: linear-gradient(to bottom, #b0b0b0, #707070);"
+    return "background: linear-gradient(to bottom, #e7f4ff, #cceeff);"
+
+
+# ========== Timeline Text Mapping ==========
+def get_text_styles_lama(cuaca_desc):
+    cuaca_lower = cuaca_desc.lower() if cuaca_desc else ""
+
+    if "cerah" in cuaca_lower and "berawan" not in cuaca_lower:
+        return {
+            "cuaca": "color: #f57f17;",
+            "kelembaban": "color: #4e342e;",
+            "suhu": "color: #bf360c;",
+            "tanggal": "color: #6d4c41;",
+            "jam": "color: #ff8f00;"
+        }
+
+    elif "cerah berawan" in cuaca_lower:
+        return {
+            "cuaca": "color: #01579b;",
+            "kelembaban": "color: #0277bd;",
+            "suhu": "color: #0288d1;",
+            "tanggal": "color: #0288d1;",
+            "jam": "color: #039be5;"
+        }
+
+    elif "berawan" in cuaca_lower and "cerah" not in cuaca_lower:
+        return {
+            "cuaca": "color: #eeeeee;",
+            "kelembaban": "color: #cce7ff;",
+            "suhu": "color: #ffcdd2;",
+            "tanggal": "color: #e0f7fa;",
+            "jam": "color: #b3e5fc;"
+        }
+
+    elif "kabut" in cuaca_lower or "asap" in cuaca_lower or "udara kabur" in cuaca_lower:
+        return {
+            "cuaca":      "color: #3E2723;",
+            "kelembaban": "color: #00695C;",
+            "suhu":       "color: #E65100;",
+            "tanggal":    "color: #795548;",
+            "jam":        "color: #A1887F;"
+        }
+
+    elif "hujan lebat" in cuaca_lower:
+        return {
+            "cuaca": "color: #e0f2f1;",
+            "kelembaban": "color: #b2dfdb;",
+            "suhu": "color: #ef9a9a;",
+            "tanggal": "color: #f5f5f5;",
+            "jam": "color: #b2ebf2;"
+        }
+
+    elif "badai" in cuaca_lower or "petir" in cuaca_lower or "hujan petir" in cuaca_lower:
+        return {
+            "cuaca": "color: #bbdefb;",
+            "kelembaban": "color: #ffcc80;",
+            "suhu": "color: #ef9a9a;",
+            "tanggal": "color: #e0e0e0;",
+            "jam": "color: #fff176;"
+        }
+
+    elif "hujan ringan" in cuaca_lower:
+        return {
+            "cuaca": "color: #455a64;",
+            "kelembaban": "color: #bbdefb;",
+            "suhu": "color: #ef9a9a;",
+            "tanggal": "color: #eceff1;",
+            "jam": "color: #666;"
+        }
+
+    elif "hujan" in cuaca_lower:
+        return {
+            "cuaca": "color: #546e7a;",
+            "kelembaban": "color: #78909c;",
+            "suhu": "color: #ff8a80;",
+            "tanggal": "color: #eceff1;",
+            "jam": "color: #b0bec5;"
+        }
+
+    elif "mendung" in cuaca_lower:
+        return {
+            "cuaca": "color: #757575;",
+            "kelembaban": "color: #9e9e9e;",
+            "suhu": "color: #e57373;",
+            "tanggal": "color: #cfd8dc;",
+            "jam": "color: #bdbdbd;"
+        }
+
+    return {
+        "cuaca": "color: #37474f;",
+        "kelembaban": "color: #90a4ae;",
+        "suhu": "color: #ef9a9a;",
+        "tanggal": "color: #eceff1;",
+        "jam": "color: #cfd8dc;"
+    }
+
+
+def _ukur(fungsi, data, ulang=200):
+    mulai = time.perf_counter()
+    for _ in range(ulang):
+        for x in data:
+            fungsi(x)
+    return (time.perf_counter() - mulai) / ulang / len(data)
+
+
+def main():
+    # Satu kartu: emoji + gradien + warna teks, untuk kolom cuaca prakiraan 3 hari
+    kolom = bmkg.parse_prakiraan(buat_payload_bmkg(hari=3))["cuaca"].tolist()
+
+    def kartu_lama(desc):
+        return get_weather_emoji_lama(desc), get_gradient_color_lama(desc), get_text_styles_lama(desc)
+
+    def kartu_baru(desc):
+        kategori = gaya_cuaca.klasifikasi_cuaca(desc)
+        return gaya_cuaca.EMOJI[kategori], gaya_cuaca.GRADIEN_CSS[kategori], gaya_cuaca.GAYA_TEKS[kategori]
+
+    t_lama = _ukur(kartu_lama, kolom)
+    t_baru = _ukur(kartu_baru, kolom)
+    print(f"rantai if     : {t_lama * 1e6:6.2f} us/kartu")
+    print(f"tabel lookup  : {t_baru * 1e6:6.2f} us/kartu ({t_lama / t_baru:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
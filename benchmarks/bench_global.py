@@ -0,0 +1,61 @@
+"""
+Latensi pemilihan desa "dingin": latih model per desa vs satu predict model global.
+
+Riwayat sintetis diisi ke ForecastStore sementara, model global dilatih
+offline sekali, lalu dibandingkan dengan train_model pada 24 baris satu desa.
+
+Jalankan dari root repo:
+    python -m benchmarks.bench_global [--desa 500] [--hari 14]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+import bmkg
+import model_cuaca
+from benchmarks.data_sintetis import buat_payload_bmkg
+from riwayat import ForecastStore
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--desa", type=int, default=500)
+    parser.add_argument("--hari", type=int, default=14)
+    parser.add_argument("--ulang", type=int, default=5)
+    args = parser.parse_args()
+
+    kode = [f"{31 + i % 5}.{71 + i % 3:02d}.{i // 100 + 1:02d}.{1000 + i % 100}" for i in range(args.desa)]
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ForecastStore(os.path.join(tmp, "riwayat.sqlite"))
+        for k in kode:
+            store.append(bmkg.parse_prakiraan(buat_payload_bmkg(k, mulai="2025-01-01", hari=args.hari)), adm4=k)
+
+        mulai = time.perf_counter()
+        bundle = model_cuaca.train_global_model(store)
+        print(f"latih global offline: {bundle['jumlah_baris']} baris dalam {time.perf_counter() - mulai:.1f} s")
+        store.close()
+
+    df_desa = bmkg.parse_prakiraan(buat_payload_bmkg(kode[0]))
+    df_input = pd.DataFrame([{"suhu": 28, "kelembaban": 70, "jam": 14}])
+
+    mulai = time.perf_counter()
+    for _ in range(args.ulang):
+        model = model_cuaca.train_model(df_desa)
+        model.predict(df_input[model_cuaca.FITUR])
+    t_lokal = (time.perf_counter() - mulai) / args.ulang
+
+    mulai = time.perf_counter()
+    for _ in range(args.ulang):
+        model_cuaca.ModelGlobal(bundle, kode[0]).predict(df_input)
+    t_global = (time.perf_counter() - mulai) / args.ulang
+
+    print(f"per desa (fit + predict): {t_lokal * 1e3:8.1f} ms")
+    print(f"model global (predict)  : {t_global * 1e3:8.1f} ms ({t_lokal / t_global:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Jendela waktu prakiraan: dua mask boolean + copy vs bmkg.jendela.
+
+Satu desa (searchsorted, irisan tanpa salinan) dan frame long-format banyak
+desa dari tiga zona waktu (WIB/WITA/WIT, satu mask numpy) dipotong untuk
+rentang 6, 24, dan 72 jam. Hasil harus identik dengan mask atas kolom utc
+sebelum waktu diukur.
+
+Jalankan dari root repo:
+    python -m benchmarks.bench_jendela [--desa 5000] [--hari 3]
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+import bmkg
+from benchmarks.data_sintetis import buat_payload_bmkg
+
+
+def jendela_mask(df, jam, mulai):
+    """Cara lama filter_24_hours (mask ganda + copy), tetapi atas utc agar zona waktu benar."""
+    mulai = mulai.tz_convert("UTC").tz_localize(None)
+    akhir = mulai + pd.Timedelta(hours=jam)
+    return df[(df['utc'] >= mulai) & (df['utc'] <= akhir)].copy()
+
+
+def _ukur(fn, ulang, *args):
+    mulai = time.perf_counter()
+    for _ in range(ulang):
+        hasil = fn(*args)
+    return (time.perf_counter() - mulai) / ulang * 1e3, hasil
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--desa", type=int, default=5000)
+    parser.add_argument("--hari", type=int, default=3)
+    parser.add_argument("--ulang", type=int, default=20)
+    args = parser.parse_args()
+
+    awal = pd.Timestamp("2026-10-17")
+    satu = {}
+    for i, (offset, prov) in enumerate([(7, "31"), (8, "51"), (9, "94")]):
+        kode = f"{prov}.71.01.1001"
+        satu[kode] = bmkg.parse_prakiraan(buat_payload_bmkg(kode, mulai=awal, hari=args.hari, utc_offset=offset))
+    # Frame long-format: salin pola tiap zona ke banyak desa
+    frames = []
+    for i in range(args.desa):
+        kode, df = list(satu.items())[i % 3]
+        frames.append(df.assign(adm4=f"{kode[:8]}{i // 100:02d}.{1000 + i % 100}"))
+    long = pd.concat(frames, ignore_index=True).sort_values(["adm4", "utc"], ignore_index=True)
+    sekarang = pd.Timestamp("2026-10-17 10:30", tz="Asia/Makassar")
+    print(f"{len(long)} baris, {long['adm4'].nunique()} desa; sekarang = {sekarang}")
+
+    df = satu["51.71.01.1001"]
+    for jam in (6, 24, 72):
+        t_mask, lama = _ukur(jendela_mask, args.ulang * 50, df, jam, sekarang)
+        t_baru, baru = _ukur(bmkg.jendela, args.ulang * 50, df, jam, sekarang)
+        assert baru.equals(lama) and np.shares_memory(baru['suhu'].to_numpy(), df['suhu'].to_numpy())
+        print(f"1 desa   {jam:>2} jam: mask {t_mask * 1e3:6.1f} us, searchsorted {t_baru * 1e3:6.1f} us "
+              f"({t_mask / t_baru:.1f}x, {len(baru)} baris, tanpa salinan)")
+
+    for jam in (6, 24, 72):
+        t_mask, lama = _ukur(jendela_mask, args.ulang, long, jam, sekarang)
+        t_baru, baru = _ukur(bmkg.jendela, args.ulang, long, jam, sekarang)
+        pd.testing.assert_frame_equal(baru, lama)
+        print(f"{args.desa} desa {jam:>2} jam: mask {t_mask:6.2f} ms, jendela {t_baru:6.2f} ms "
+              f"({t_mask / t_baru:.1f}x, {len(baru)} baris)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Timing pembersihan nama wilayah: `apply` per baris vs vektor.
+
+Implementasi lama dan nama kasus tepi dipertahankan di sini sebagai acuan;
+paritasnya diuji di tests/test_wilayah.py.
+
+Jalankan dari root repo:
+    python -m benchmarks.bench_nama [--csv path/ke/base.csv]
+"""
+
+import argparse
+import re
+import time
+
+import pandas as pd
+
+import wilayah
+from benchmarks.data_sintetis import muat_base_csv_df
+
+KASUS_TEPI = [
+    "KAB. KEPULAUAN SERIBU", "KOTA ADM. JAKARTA PUSAT", "KEC. X, Y", "KEL. PASAR-BARU",
+    "DESA 2MEKAR JAYA", "DESA  SPASI", "O'AKI", "ÇANDI ÜBER", "KOTA", "KAB. , LAIN", ", KOSONG",
+]
+
+
+def clean_name_lama(nama):
+    """Implementasi lama di load_data_wilayah, dipertahankan sebagai acuan."""
+    def clean_name(name):
+        return re.sub(r'^(KAB\. |KOTA |KEC\. |DESA |KEL\. )', '', name).title()
+
+    return nama.apply(lambda x: clean_name(x.split(',')[0]))
+
+
+def _ukur(fungsi, ulang):
+    mulai = time.perf_counter()
+    for _ in range(ulang):
+        hasil = fungsi()
+    return (time.perf_counter() - mulai) / ulang, hasil
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv", help="path base.csv asli (default: data sintetis)")
+    parser.add_argument("--ulang", type=int, default=5)
+    args = parser.parse_args()
+
+    nama = muat_base_csv_df(args.csv)['nama']
+    nama = pd.concat([nama, pd.Series(KASUS_TEPI, dtype=nama.dtype)], ignore_index=True)
+
+    t_lama, _ = _ukur(lambda: clean_name_lama(nama), args.ulang)
+    t_baru, _ = _ukur(lambda: wilayah.bersihkan_nama(nama), args.ulang)
+
+    print(f"{len(nama)} nama")
+    print(f"apply per baris : {t_lama * 1e3:8.1f} ms")
+    print(f"vektor          : {t_baru * 1e3:8.1f} ms ({t_lama / t_baru:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
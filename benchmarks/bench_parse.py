@@ -0,0 +1,93 @@
+"""
+Parsing respons BMKG: list of dict + pd.DataFrame (lama) vs isi kolom langsung.
+
+Payload multi-hari dibaca dari direktori rekaman (<adm4>.json) jika diberikan,
+selain itu dibuat dengan format yang sama. Hasil kedua parser harus bernilai
+sama sebelum waktu diukur; dekode JSON (json vs orjson) diukur terpisah.
+
+Jalankan dari root repo:
+    python -m benchmarks.bench_parse [--hari 3] [--rekaman path/rekaman]
+"""
+
+import argparse
+import glob
+import json
+import os
+import time
+
+import pandas as pd
+
+import bmkg
+from benchmarks.data_sintetis import buat_payload_bmkg
+
+
+def parse_prakiraan_lama(j):
+    """Implementasi lama di get_bmkg_data, dipertahankan sebagai acuan."""
+    data_list = j.get("data", [])
+    if not data_list:
+        return "Error: Tidak ada data cuaca yang dikembalikan oleh BMKG untuk wilayah ini."
+
+    cuaca_nested = data_list[0].get("cuaca", [])
+    records = []
+    for grup in cuaca_nested:
+        for entry in grup:
+            records.append({
+                "utc": entry.get("utc_datetime"),
+                "local": entry.get("local_datetime"),
+                "suhu": entry.get("t"),
+                "kelembaban": entry.get("hu"),
+                "cuaca": entry.get("weather_desc"),
+            })
+
+    df = pd.DataFrame(records)
+    if not df.empty:
+        df['local'] = pd.to_datetime(df['local'], errors='coerce')
+        df['utc'] = pd.to_datetime(df['utc'], errors='coerce')
+        df = df.sort_values('local').reset_index(drop=True)
+    return df
+
+
+def _ukur(fungsi, data, ulang):
+    mulai = time.perf_counter()
+    for _ in range(ulang):
+        hasil = [fungsi(x) for x in data]
+    return (time.perf_counter() - mulai) / ulang / len(data), hasil
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hari", type=int, default=3)
+    parser.add_argument("--n", type=int, default=50, help="jumlah payload sintetis")
+    parser.add_argument("--ulang", type=int, default=5)
+    parser.add_argument("--rekaman", help="direktori berisi <adm4>.json hasil rekaman")
+    args = parser.parse_args()
+
+    if args.rekaman:
+        mentah = [open(p, "rb").read() for p in sorted(glob.glob(os.path.join(args.rekaman, "*.json")))]
+    else:
+        mentah = [json.dumps(buat_payload_bmkg(f"31.71.03.{1000 + i}", hari=args.hari)).encode() for i in range(args.n)]
+    payloads = [json.loads(m) for m in mentah]
+
+    t_lama, hasil_lama = _ukur(parse_prakiraan_lama, payloads, args.ulang)
+    t_baru, hasil_baru = _ukur(bmkg.parse_prakiraan, payloads, args.ulang)
+    for lama, baru in zip(hasil_lama, hasil_baru):
+        # Parser baru menambah indeks waktu sadar zona dan memakai dtype ringkas;
+        # nilainya harus identik setelah disamakan ke dtype lama
+        pd.testing.assert_frame_equal(lama, baru.astype(lama.dtypes.to_dict()).reset_index(drop=True))
+    print(f"paritas OK untuk {len(payloads)} payload ({len(hasil_baru[0])} baris/payload)")
+    print(f"parse lama  : {t_lama * 1e3:7.2f} ms/payload")
+    print(f"parse kolom : {t_baru * 1e3:7.2f} ms/payload ({t_lama / t_baru:.1f}x)")
+
+    t_json, _ = _ukur(json.loads, mentah, args.ulang)
+    print(f"json.loads  : {t_json * 1e3:7.3f} ms/payload")
+    try:
+        import orjson
+    except ImportError:
+        print("orjson      : tidak terpasang")
+    else:
+        t_orjson, _ = _ukur(orjson.loads, mentah, args.ulang)
+        print(f"orjson.loads: {t_orjson * 1e3:7.3f} ms/payload ({t_json / t_orjson:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Pemanas cache dengan jam palsu terhadap server BMKG tiruan.
+
+Mensimulasikan beberapa jam lalu lintas per menit: setiap menit sejumlah
+permintaan pengguna memilih desa menurut distribusi Zipf (beberapa desa
+sangat populer), lalu pemanas menjalankan satu tick. Jam cache, pemanas, dan
+batas laju memakai jam palsu sehingga simulasi berjam-jam selesai dalam
+hitungan detik; request ke server tiruan tetap HTTP sungguhan.
+
+Yang dibandingkan (tanpa / dengan pemanas):
+- permintaan pengguna yang harus menunggu BMKG (prakiraan belum ada atau
+  sudah kedaluwarsa) dan yang harus menunggu pelatihan model;
+- jumlah request ke BMKG, dan request pemanas per menit (harus <= batas).
+
+Server tiruan menerbitkan prakiraan baru setiap --terbit jam, sehingga
+prakiraan yang dimuat ulang setelahnya memerlukan model baru.
+
+Cache memakai stale_ttl=0 agar setiap kedaluwarsa langsung terasa oleh pengguna.
+
+Jalankan dari root repo:
+    python -m benchmarks.bench_pemanas [--jam 6] [--desa 200] [--per-menit 20] [--top-n 20] [--rate 10]
+"""
+
+import argparse
+import tempfile
+
+import numpy as np
+
+import bmkg
+import cache
+import model_cuaca
+from benchmarks.stub_bmkg import StubBMKG
+
+
+class JamPalsu:
+    def __init__(self, mulai=0.0):
+        self.sekarang = mulai
+
+    def __call__(self):
+        return self.sekarang
+
+    def maju(self, detik):
+        self.sekarang += detik
+
+
+def simulasi(stub, args, pakai_pemanas):
+    jam = JamPalsu(1_000_000.0)
+    prakiraan = bmkg.create_forecast_cache(ttl=args.ttl, stale_ttl=0, clock=jam)
+    kode_list = [f"31.71.{i // 50 + 1:02d}.{1001 + i % 50}" for i in range(args.desa)]
+    rng = np.random.default_rng(0)
+    bobot = 1.0 / np.arange(1, args.desa + 1) ** args.zipf
+    bobot /= bobot.sum()
+    n_menit = int(args.jam * 60)
+    permintaan = rng.choice(len(kode_list), size=(n_menit, args.per_menit), p=bobot)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        registry = model_cuaca.ModelRegistry(tmp)
+
+        def latih(kode, df):
+            return registry.get_or_train(model_cuaca.fingerprint(kode, df),
+                                         lambda: model_cuaca.train_model(df, n_jobs=1, n_estimators=10))
+
+        pemanas = None
+        if pakai_pemanas:
+            # Tick tiap menit, jadi bucket harus bisa menampung kuota satu menit
+            limiter = bmkg.RateLimiter(args.rate, burst=max(1, int(args.rate)), clock=jam, sleep=lambda detik: None)
+            pemanas = cache.CacheWarmer(prakiraan, top_n=args.top_n, lead=args.lead, limiter=limiter,
+                                        on_refresh=latih, clock=jam)
+
+        # Penghitung [semua, desa populer]; desa populer = top-N menurut bobot Zipf sebenarnya
+        tunggu_bmkg, tunggu_model, jumlah = np.zeros(2, int), np.zeros(2, int), np.zeros(2, int)
+        request_awal = stub.jumlah_request
+        maks_pemanas = 0
+        for menit in range(n_menit):
+            if menit and menit % int(args.terbit * 60) == 0:
+                stub.terbitkan()
+            for i in permintaan[menit]:
+                kode = kode_list[i]
+                grup = [0, 1] if i < args.top_n else [0]
+                jumlah[grup] += 1
+                entri = prakiraan.peek(kode)
+                if entri is None or entri[0] >= prakiraan.ttl:
+                    tunggu_bmkg[grup] += 1
+                df = prakiraan.get(kode)
+                if registry.get(model_cuaca.fingerprint(kode, df)) is None:
+                    tunggu_model[grup] += 1
+                    latih(kode, df)
+                if pemanas is not None:
+                    pemanas.catat(kode)
+                jam.maju(60.0 / args.per_menit)
+            if pemanas is not None:
+                sebelum = stub.jumlah_request
+                pemanas.tick()
+                maks_pemanas = max(maks_pemanas, stub.jumlah_request - sebelum)
+
+    label = "dengan pemanas" if pakai_pemanas else "tanpa pemanas"
+    print(f"{label}: request BMKG {stub.jumlah_request - request_awal}"
+          + (f", pemanas maks {maks_pemanas}/menit, {pemanas.stats()}" if pakai_pemanas else ""))
+    for g, nama in enumerate(["semua desa", f"top-{args.top_n}"]):
+        print(f"  {nama:<11}: {jumlah[g]:5d} permintaan, menunggu BMKG {tunggu_bmkg[g]:4d} "
+              f"({tunggu_bmkg[g] / jumlah[g]:6.1%}), menunggu model {tunggu_model[g]:4d} ({tunggu_model[g] / jumlah[g]:6.1%})")
+    if pemanas is not None:
+        assert maks_pemanas <= max(1, int(args.rate)), "pemanas melebihi batas request per menit"
+    return tunggu_bmkg[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jam", type=float, default=6, help="lama simulasi (jam)")
+    parser.add_argument("--desa", type=int, default=200)
+    parser.add_argument("--per-menit", type=int, default=20, help="permintaan pengguna per menit")
+    parser.add_argument("--zipf", type=float, default=1.1, help="eksponen popularitas desa")
+    parser.add_argument("--ttl", type=int, default=bmkg.PRAKIRAAN_TTL)
+    parser.add_argument("--terbit", type=float, default=3, help="BMKG menerbitkan prakiraan baru setiap N jam")
+    parser.add_argument("--top-n", type=int, default=bmkg.PEMANAS_TOP_N)
+    parser.add_argument("--lead", type=int, default=bmkg.PEMANAS_LEAD)
+    parser.add_argument("--rate", type=float, default=bmkg.PEMANAS_RATE_PER_MIN, help="batas request pemanas per menit")
+    args = parser.parse_args()
+
+    with StubBMKG() as stub:
+        bmkg.BMKG_API_URL = stub.url
+        print(f"{args.jam:g} jam x {args.per_menit} permintaan/menit, {args.desa} desa (Zipf {args.zipf}), "
+              f"TTL {args.ttl} s, top-{args.top_n}, lead {args.lead} s, batas {args.rate:g}/menit")
+        tanpa = simulasi(stub, args, pakai_pemanas=False)
+        dengan = simulasi(stub, args, pakai_pemanas=True)
+        assert dengan < tanpa
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Overhead predict per panggilan vs batch untuk prediksi manual.
+
+Membandingkan: satu DataFrame + predict per titik slider (cara lama),
+satu predict_batch untuk seluruh grid slider, dan lookup ke grid yang
+sudah dihitung.
+
+Jalankan dari root repo:
+    python -m benchmarks.bench_predict [--titik 200]
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+import bmkg
+import model_cuaca
+from benchmarks.data_sintetis import buat_payload_bmkg
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--titik", type=int, default=200, help="jumlah titik untuk predict per panggilan")
+    args = parser.parse_args()
+
+    model = model_cuaca.train_model(bmkg.parse_prakiraan(buat_payload_bmkg()))
+    rng = np.random.default_rng(0)
+    suhu = rng.integers(10, 41, args.titik)
+    kelembaban = rng.integers(20, 101, args.titik)
+
+    mulai = time.perf_counter()
+    satuan = [model.predict(pd.DataFrame([{"suhu": s, "kelembaban": k}]))[0] for s, k in zip(suhu, kelembaban)]
+    t_satuan = (time.perf_counter() - mulai) / args.titik
+
+    mulai = time.perf_counter()
+    grid = model_cuaca.prediction_grid(model)
+    t_grid = time.perf_counter() - mulai
+
+    mulai = time.perf_counter()
+    lookup = [model_cuaca.lookup_grid(grid, s, k) for s, k in zip(suhu, kelembaban)]
+    t_lookup = (time.perf_counter() - mulai) / args.titik
+
+    assert list(satuan) == list(lookup), "lookup grid berbeda dengan predict langsung"
+    print(f"predict per panggilan : {t_satuan * 1e3:8.2f} ms/titik")
+    print(f"grid {grid.size} titik      : {t_grid * 1e3:8.2f} ms total ({t_grid / grid.size * 1e6:.1f} us/titik)")
+    print(f"lookup grid           : {t_lookup * 1e6:8.2f} us/titik")
+
+
+if __name__ == "__main__":
+    main()
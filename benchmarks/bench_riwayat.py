@@ -0,0 +1,76 @@
+"""
+Penyimpanan riwayat prakiraan: laju penambahan, deduplikasi, dan baca rentang.
+
+Mengisi ForecastStore dengan prakiraan sintetis untuk banyak desa dan
+banyak hari (default ~1,2 juta baris), lalu mengukur penambahan ulang
+(semua baris sudah ada), baca satu desa, baca satu kecamatan, dan
+iterasi seluruh tabel per potongan.
+
+Jalankan dari root repo:
+    python -m benchmarks.bench_riwayat [--desa 5000] [--hari 30]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from riwayat import ForecastStore
+
+
+def _frame_desa(kode_list, mulai, hari, rng):
+    utc = pd.date_range(mulai, periods=hari * 8, freq="3h")
+    n = len(utc)
+    return pd.DataFrame({
+        "adm4": np.repeat(kode_list, n),
+        "utc": np.tile(utc.to_numpy(), len(kode_list)),
+        "local": np.tile((utc + pd.Timedelta(hours=7)).to_numpy(), len(kode_list)),
+        "suhu": rng.integers(22, 34, n * len(kode_list)),
+        "kelembaban": rng.integers(55, 98, n * len(kode_list)),
+        "cuaca": pd.Categorical(rng.choice(["Cerah", "Berawan", "Hujan Ringan"], n * len(kode_list))),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--desa", type=int, default=5000)
+    parser.add_argument("--hari", type=int, default=30)
+    parser.add_argument("--batch", type=int, default=500, help="desa per append")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    kode = [f"31.71.{i // 100:02d}.{1000 + i % 100}" for i in range(args.desa)]
+    mulai = pd.Timestamp("2025-01-01")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ForecastStore(os.path.join(tmp, "riwayat.sqlite"))
+        t0 = time.perf_counter()
+        for i in range(0, len(kode), args.batch):
+            store.append(_frame_desa(kode[i:i + args.batch], mulai, args.hari, rng))
+        t_isi = time.perf_counter() - t0
+        total = store.count()
+        print(f"isi      : {total} baris dalam {t_isi:.1f} s ({total / t_isi:,.0f} baris/s)")
+
+        t0 = time.perf_counter()
+        baru = store.append(_frame_desa(kode[:args.batch], mulai, args.hari, rng))
+        print(f"ulang    : {baru} baris baru dari {args.batch * args.hari * 8} dalam {time.perf_counter() - t0:.2f} s")
+
+        t0 = time.perf_counter()
+        df = store.read(kode[1234 % len(kode)], mulai=mulai + pd.Timedelta(days=10), sampai=mulai + pd.Timedelta(days=13))
+        print(f"1 desa   : {len(df)} baris dalam {(time.perf_counter() - t0) * 1e3:.1f} ms")
+
+        t0 = time.perf_counter()
+        df = store.read(prefix="31.71.05", mulai=mulai, sampai=mulai + pd.Timedelta(days=1))
+        print(f"1 kec    : {len(df)} baris ({df['adm4'].nunique()} desa) dalam {(time.perf_counter() - t0) * 1e3:.1f} ms")
+
+        t0 = time.perf_counter()
+        n = sum(len(potong) for potong in store.iter_read(chunksize=200_000))
+        print(f"iterasi  : {n} baris per 200k dalam {time.perf_counter() - t0:.1f} s")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
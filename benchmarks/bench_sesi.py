@@ -0,0 +1,90 @@
+"""
+Pertumbuhan RSS per N sesi: frame + model di session_state vs hanya kunci.
+
+Mensimulasikan N sesi yang masing-masing membuka desa berbeda. Cache
+prakiraan dan registry model bersama ada di kedua mode dengan batas yang
+sama (lebih kecil dari N agar eviction terjadi):
+
+- lama: tiap sesi juga memegang df_cuaca dan model-nya sendiri, sehingga
+  objek yang sudah dibuang cache tetap hidup selama sesinya ada.
+- baru: sesi hanya memegang adm4, versi prakiraan (fingerprint frame, seperti
+  app3.py), dan kunci model.
+
+Setiap mode dijalankan di proses terpisah agar RSS-nya tidak tercampur.
+
+Jalankan dari root repo:
+    python -m benchmarks.bench_sesi [--sesi 100] [--cache 32] [--model-mb 8]
+"""
+
+import argparse
+import gc
+import os
+import pickle
+import resource
+import subprocess
+import sys
+import tempfile
+
+import bmkg
+import model_cuaca
+from benchmarks.data_sintetis import buat_payload_bmkg
+
+
+def _rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        # Bukan Linux: pakai puncak RSS (kB di Linux, byte di macOS)
+        maks = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maks / 2**20 if sys.platform == "darwin" else maks / 1024
+
+
+def jalankan(mode, n_sesi, ukuran_cache, model_mb):
+    kode_list = [f"31.71.{i // 100 + 1:02d}.{1000 + i % 100}" for i in range(n_sesi)]
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = bmkg.create_forecast_cache(
+            loader=lambda kode: bmkg.parse_prakiraan(buat_payload_bmkg(kode)), maxsize=ukuran_cache)
+        registry = model_cuaca.ModelRegistry(tmp, max_bytes=model_mb * 2**20)
+        # Pemanasan: impor sklearn dan satu model agar tidak terhitung sebagai pertumbuhan
+        registry.put("pemanasan_0", model_cuaca.train_model(cache.get("00.00.00.0000"), n_jobs=1))
+        gc.collect()
+        awal = _rss_mb()
+
+        sesi = []
+        for kode in kode_list:
+            df = cache.get(kode)
+            kunci = model_cuaca.fingerprint(kode, df)
+            model = registry.get_or_train(kunci, lambda: model_cuaca.train_model(df, n_jobs=1))
+            if mode == "lama":
+                sesi.append({"desa_id": kode, "df_cuaca": df, "model": model})
+            else:
+                sesi.append({"desa_id": kode, "adm4_cuaca": kode, "versi_cuaca": kunci, "model_kunci": kunci})
+            del df, model
+        gc.collect()
+        tumbuh = _rss_mb() - awal
+        state = sum(len(pickle.dumps(s)) for s in sesi) / len(sesi)
+        print(f"{mode:<4}: RSS +{tumbuh:6.1f} MB untuk {n_sesi} sesi ({tumbuh / n_sesi * 1024:6.0f} kB/sesi), "
+              f"session_state ~{state / 1024:7.1f} kB/sesi (pickle), cache {len(cache)} prakiraan, "
+              f"registry {registry.stats()['size']} model")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sesi", type=int, default=100)
+    parser.add_argument("--cache", type=int, default=32, help="maxsize cache prakiraan bersama")
+    parser.add_argument("--model-mb", type=int, default=8, help="batas memori registry model (MB)")
+    parser.add_argument("--mode", choices=["lama", "baru"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        jalankan(args.mode, args.sesi, args.cache, args.model_mb)
+        return
+    print(f"{args.sesi} sesi, cache prakiraan {args.cache}, registry model {args.model_mb} MB")
+    for mode in ("lama", "baru"):
+        subprocess.run([sys.executable, "-m", "benchmarks.bench_sesi", "--mode", mode, "--sesi", str(args.sesi),
+                        "--cache", str(args.cache), "--model-mb", str(args.model_mb)], check=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Latensi fit model cuaca terhadap jumlah baris dan jumlah core (n_jobs),
+serta pembaruan warm_start (+20 pohon) dibandingkan latih ulang penuh.
+
+Jalankan dari root repo:
+    python -m benchmarks.bench_train [--baris 24,72,500,5000] [--jobs 1,2,4,-1]
+"""
+
+import argparse
+import os
+import time
+
+import bmkg
+import model_cuaca
+from benchmarks.data_sintetis import buat_payload_bmkg
+
+
+def _data(n_baris, seed=0):
+    hari = max(1, -(-n_baris // 8))
+    df = bmkg.parse_prakiraan(buat_payload_bmkg(hari=hari, seed=seed))
+    return df.head(n_baris)
+
+
+def _ukur(fungsi, ulang=3):
+    terbaik = float("inf")
+    for _ in range(ulang):
+        mulai = time.perf_counter()
+        hasil = fungsi()
+        terbaik = min(terbaik, time.perf_counter() - mulai)
+    return terbaik, hasil
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--baris", default="24,72,500,5000")
+    parser.add_argument("--jobs", default="1,2,4,-1")
+    args = parser.parse_args()
+
+    daftar_baris = [int(b) for b in args.baris.split(",")]
+    daftar_jobs = [int(j) for j in args.jobs.split(",")]
+    print(f"{os.cpu_count()} core tersedia; waktu fit terbaik dari 3 (ms)")
+    print(f"{'baris':>6} " + " ".join(f"{'n_jobs=' + str(j):>10}" for j in daftar_jobs))
+    for n in daftar_baris:
+        df = _data(n)
+        hasil = [_ukur(lambda: model_cuaca.train_model(df, n_jobs=j))[0] for j in daftar_jobs]
+        print(f"{n:>6} " + " ".join(f"{t * 1e3:>10.1f}" for t in hasil))
+
+    print("\nwarm_start vs latih ulang (n_jobs=-1)")
+    for n in daftar_baris:
+        lama, baru = _data(n, seed=1), _data(n, seed=2)
+        # Pastikan kelas sama agar jalur warm_start yang diukur
+        baru = baru[baru['cuaca'].isin(lama['cuaca'].unique())]
+        lama = lama[lama['cuaca'].isin(baru['cuaca'].unique())]
+        model = model_cuaca.train_model(lama)
+        t_penuh, _ = _ukur(lambda: model_cuaca.train_model(baru))
+        t_warm, hasil = _ukur(lambda: model_cuaca.update_model(model, baru))
+        print(f"{n:>6} baris: penuh {t_penuh * 1e3:7.1f} ms, warm_start {t_warm * 1e3:7.1f} ms "
+              f"({hasil.n_estimators} pohon)")
+
+
+if __name__ == "__main__":
+    main()
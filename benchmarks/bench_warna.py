@@ -0,0 +1,85 @@
+"""
+Warna dominan latar halaman: KMeans scikit-learn per rerun vs k-means
+berbobot NumPy yang di-memo per multiset kategori cuaca.
+
+Untuk sejumlah tampilan kartu acak, palet baru dibandingkan dengan palet
+KMeans lama (jarak RGB tiap warna lama ke warna baru terdekat) sebelum
+waktu diukur: panggilan pertama (memo kosong) dan rerun (memo terisi).
+
+Jalankan dari root repo:
+    python -m benchmarks.bench_warna [--sampel 200] [--kartu 8]
+"""
+
+import argparse
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+from sklearn.cluster import KMeans
+
+import gaya_cuaca
+from benchmarks.data_sintetis import CUACA_BMKG
+
+
+# Implementasi lama dari app3.py, dipertahankan sebagai acuan
+def get_dominant_colors_lama(df_display, num_colors=3):
+    all_colors_hex = []
+    for kategori in gaya_cuaca.klasifikasi_kolom(df_display['cuaca']):
+        all_colors_hex.extend(gaya_cuaca.GRADIEN[kategori])
+    if not all_colors_hex:
+        return ["#6dd5ed", "#2193b0", "#B0BEC5"]
+    all_colors_rgb = [gaya_cuaca.hex_to_rgb(c) for c in all_colors_hex]
+    kmeans = KMeans(n_clusters=num_colors, random_state=42, n_init='auto')
+    kmeans.fit(all_colors_rgb)
+    dominant_rgb = kmeans.cluster_centers_.astype(int)
+    return [f"#{r:02x}{g:02x}{b:02x}" for r, g, b in dominant_rgb]
+
+
+def _selisih(lama, baru):
+    """Jarak RGB terbesar dari tiap warna lama ke warna baru terdekat."""
+    a = np.array([gaya_cuaca.hex_to_rgb(w) for w in lama], dtype=float)
+    b = np.array([gaya_cuaca.hex_to_rgb(w) for w in baru], dtype=float)
+    return np.sqrt(((a[:, None] - b[None]) ** 2).sum(axis=2)).min(axis=1).max()
+
+
+def _ukur(fn, tampilan):
+    mulai = time.perf_counter()
+    for df in tampilan:
+        fn(df)
+    return (time.perf_counter() - mulai) / len(tampilan) * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sampel", type=int, default=200, help="jumlah tampilan kartu acak")
+    parser.add_argument("--kartu", type=int, default=8, help="kartu per tampilan")
+    args = parser.parse_args()
+    # KMeans lama memperingatkan saat warna unik < num_colors; hasilnya tetap dipakai
+    warnings.filterwarnings("ignore", category=UserWarning)
+
+    rng = np.random.default_rng(0)
+    deskripsi = [desc for _, desc, _ in CUACA_BMKG]
+    # Cuaca per desa cenderung seragam: 1-3 jenis per tampilan
+    tampilan = []
+    for _ in range(args.sampel):
+        pilihan = rng.choice(deskripsi, size=rng.integers(1, 4), replace=False)
+        tampilan.append(pd.DataFrame({"cuaca": rng.choice(pilihan, size=args.kartu)}))
+
+    selisih = [_selisih(get_dominant_colors_lama(df), gaya_cuaca.get_dominant_colors(df)) for df in tampilan]
+    print(f"selisih RGB ke palet KMeans: median {np.median(selisih):.1f}, p95 {np.percentile(selisih, 95):.1f}, "
+          f"maks {max(selisih):.1f} (dari 441)")
+    assert np.median(selisih) < 20, "palet baru terlalu jauh dari palet KMeans"
+
+    t_lama = _ukur(get_dominant_colors_lama, tampilan)
+    gaya_cuaca._warna_dominan.cache_clear()
+    t_dingin = _ukur(gaya_cuaca.get_dominant_colors, tampilan)
+    t_hangat = _ukur(gaya_cuaca.get_dominant_colors, tampilan)
+    print(f"KMeans lama       : {t_lama:7.3f} ms/rerun")
+    print(f"NumPy, memo kosong: {t_dingin:7.3f} ms/rerun ({t_lama / t_dingin:.0f}x)")
+    print(f"NumPy, memo terisi: {t_hangat:7.3f} ms/rerun ({t_lama / t_hangat:.0f}x)")
+    print(f"memo: {gaya_cuaca._warna_dominan.cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Micro-benchmark: filter `str.startswith` lama vs indeks induk -> anak.
+
+Untuk setiap provinsi, ketiga selectbox (Kab/Kota, Kecamatan, Desa) diisi
+seperti di sidebar app3.py, memakai kab/kec pertama sebagai pilihan.
+
+Jalankan dari root repo:
+    python -m benchmarks.bench_wilayah [--csv path/ke/base.csv]
+"""
+
+import argparse
+import time
+
+import wilayah
+from benchmarks.data_sintetis import muat_base_csv_df
+
+
+def _anak_dengan_mask(df, kode_induk, level):
+    return sorted(df[(df['level'] == level) & (df.index.str.startswith(kode_induk + '.'))].index)
+
+
+def _ukur(fungsi, ulang):
+    mulai = time.perf_counter()
+    for _ in range(ulang):
+        hasil = fungsi()
+    return (time.perf_counter() - mulai) / ulang, hasil
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv", help="path base.csv asli (default: data sintetis)")
+    parser.add_argument("--ulang", type=int, default=5)
+    args = parser.parse_args()
+
+    df = muat_base_csv_df(args.csv).set_index('id')
+    df['level'] = df.index.str.count(r'\.')
+
+    mulai = time.perf_counter()
+    indeks = wilayah.build_children_index(df)
+    waktu_bangun = time.perf_counter() - mulai
+    print(f"{len(df)} wilayah, indeks dibangun dalam {waktu_bangun * 1000:.1f} ms")
+    print(f"{'provinsi':<8} {'mask (ms)':>10} {'indeks (us)':>12} {'speedup':>9}")
+
+    total_mask = total_indeks = 0.0
+    for prov in wilayah.get_children(indeks):
+        kab = wilayah.get_children(indeks, prov)[0]
+        kec = wilayah.get_children(indeks, kab)[0]
+
+        def lama():
+            return (_anak_dengan_mask(df, prov, 1), _anak_dengan_mask(df, kab, 2), _anak_dengan_mask(df, kec, 3))
+
+        def baru():
+            return (wilayah.get_children(indeks, prov), wilayah.get_children(indeks, kab), wilayah.get_children(indeks, kec))
+
+        t_lama, hasil_lama = _ukur(lama, args.ulang)
+        t_baru, hasil_baru = _ukur(baru, args.ulang * 100)
+        assert hasil_lama == hasil_baru, f"hasil berbeda untuk provinsi {prov}"
+        total_mask += t_lama
+        total_indeks += t_baru
+        print(f"{prov:<8} {t_lama * 1e3:>10.2f} {t_baru * 1e6:>12.2f} {t_lama / t_baru:>8.0f}x")
+
+    print(f"{'total':<8} {total_mask * 1e3:>10.2f} {total_indeks * 1e6:>12.2f} {total_mask / total_indeks:>8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Pembangkit data sintetis untuk benchmark.
+
+Struktur dan ukuran tabel wilayah meniru base.csv Permendagri 72/2019
+(~38 provinsi, ~80 ribu desa/kelurahan) sehingga benchmark tetap bisa
+dijalankan tanpa akses internet. Jika base.csv asli tersedia, berikan
+path-nya lewat argumen --csv pada masing-masing skrip benchmark.
+"""
+
+import random
+
+import pandas as pd
+
+SUKU_KATA = ["ba", "ka", "ma", "ra", "sa", "ta", "ja", "lu", "ngi", "pa", "wa", "ro", "si", "te", "du", "gu"]
+
+
+def _nama_acak(rng, n_suku=3):
+    return "".join(rng.choice(SUKU_KATA) for _ in range(rng.randint(2, n_suku))).upper()
+
+
+def buat_base_csv_df(seed=42, n_prov=38):
+    """Membuat DataFrame mentah (kolom id, nama) berformat sama dengan base.csv."""
+    rng = random.Random(seed)
+    rows = []
+    for p in range(11, 11 + n_prov):
+        kode_prov = f"{p:02d}"
+        rows.append((kode_prov, _nama_acak(rng, 4)))
+        for k in range(1, rng.randint(8, 20) + 1):
+            kode_kab = f"{kode_prov}.{k:02d}"
+            awalan = "KAB. " if k < 70 and rng.random() < 0.8 else "KOTA "
+            rows.append((kode_kab, awalan + _nama_acak(rng)))
+            for c in range(1, rng.randint(8, 20) + 1):
+                kode_kec = f"{kode_kab}.{c:02d}"
+                nama_kec = _nama_acak(rng)
+                if rng.random() < 0.3:
+                    nama_kec = "KEC. " + nama_kec
+                rows.append((kode_kec, nama_kec))
+                for d in range(1, rng.randint(6, 16) + 1):
+                    kode_desa = f"{kode_kec}.{(1000 if rng.random() < 0.2 else 2000) + d}"
+                    awalan = rng.choice(["DESA ", "KEL. ", ""])
+                    nama_desa = awalan + _nama_acak(rng)
+                    if rng.random() < 0.05:
+                        nama_desa += ", " + _nama_acak(rng)
+                    rows.append((kode_desa, nama_desa))
+    return pd.DataFrame(rows, columns=["id", "nama"], dtype=str)
+
+
+def muat_base_csv_df(path=None, seed=42):
+    """Membaca base.csv asli jika path diberikan, selain itu data sintetis."""
+    if path:
+        return pd.read_csv(path, header=None, names=["id", "nama"], dtype=str)
+    return buat_base_csv_df(seed=seed)
+
+
+# Deskripsi cuaca BMKG beserta kode `weather` dan padanan bahasa Inggrisnya
+CUACA_BMKG = [
+    (0, "Cerah", "Clear Skies"),
+    (1, "Cerah Berawan", "Partly Cloudy"),
+    (3, "Berawan", "Mostly Cloudy"),
+    (4, "Berawan Tebal", "Overcast"),
+    (5, "Udara Kabur", "Haze"),
+    (10, "Asap", "Smoke"),
+    (45, "Kabut", "Fog"),
+    (60, "Hujan Ringan", "Light Rain"),
+    (61, "Hujan Sedang", "Rain"),
+    (63, "Hujan Lebat", "Heavy Rain"),
+    (80, "Hujan Lokal", "Isolated Shower"),
+    (95, "Hujan Petir", "Severe Thunderstorm"),
+]
+
+
+def buat_payload_bmkg(kode_adm4="31.71.03.1001", mulai=None, hari=3, seed=None, utc_offset=7):
+    """
+    Membuat payload JSON berformat sama dengan respons
+    https://api.bmkg.go.id/publik/prakiraan-cuaca (data 3-jaman per hari).
+    """
+    rng = random.Random(seed if seed is not None else kode_adm4)
+    if mulai is None:
+        mulai = pd.Timestamp.now(tz="UTC").floor("D")
+    mulai = pd.Timestamp(mulai).tz_localize(None)
+    bagian = kode_adm4.split(".")
+    lokasi = {
+        "adm1": bagian[0], "adm2": ".".join(bagian[:2]), "adm3": ".".join(bagian[:3]), "adm4": kode_adm4,
+        "provinsi": "Provinsi", "kotkab": "Kota", "kecamatan": "Kecamatan", "desa": "Desa",
+        "lon": 106.8, "lat": -6.2, "timezone": {7: "Asia/Jakarta", 8: "Asia/Makassar", 9: "Asia/Jayapura"}[utc_offset],
+    }
+    cuaca = []
+    for h in range(hari):
+        grup = []
+        for jam in range(0, 24, 3):
+            utc = mulai + pd.Timedelta(days=h, hours=jam)
+            lokal = utc + pd.Timedelta(hours=utc_offset)
+            kode, desc, desc_en = rng.choice(CUACA_BMKG)
+            grup.append({
+                "datetime": utc.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "t": rng.randint(22, 34),
+                "tcc": rng.randint(0, 100),
+                "tp": round(rng.random() * 5, 1),
+                "weather": kode,
+                "weather_desc": desc,
+                "weather_desc_en": desc_en,
+                "wd_deg": rng.randint(0, 359),
+                "wd": "S",
+                "wd_to": "N",
+                "ws": round(rng.random() * 15, 1),
+                "hu": rng.randint(55, 98),
+                "vs": 10000,
+                "vs_text": "> 10 km",
+                "time_index": f"{h * 8 + jam // 3}-{h * 8 + jam // 3 + 1}",
+                "analysis_date": mulai.strftime("%Y-%m-%dT%H:%M:%S"),
+                "image": "https://api-apps.bmkg.go.id/storage/icon/cuaca/cerah-berawan-am.svg",
+                "utc_datetime": utc.strftime("%Y-%m-%d %H:%M:%S"),
+                "local_datetime": lokal.strftime("%Y-%m-%d %H:%M:%S"),
+            })
+        cuaca.append(grup)
+    return {"lokasi": lokasi, "data": [{"lokasi": {**lokasi, "type": "adm4"}, "cuaca": cuaca}]}
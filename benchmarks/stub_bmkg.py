@@ -0,0 +1,146 @@
+"""
+Server HTTP tiruan API prakiraan BMKG untuk benchmark dan uji lokal.
+
+Payload diputar ulang dari direktori rekaman (<adm4>.json) jika ada, selain
+itu dibuat dengan `buat_payload_bmkg`. Latensi per koneksi baru (meniru
+handshake TCP/TLS), latensi per request, dan error 503 berkala bisa diatur.
+
+Pemakaian mandiri:
+    python -m benchmarks.stub_bmkg --port 8765 --rekaman path/rekaman
+lalu jalankan app dengan BMKG_API_URL=http://127.0.0.1:8765/publik/prakiraan-cuaca
+"""
+
+import argparse
+import itertools
+import json
+import os
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.data_sintetis import buat_payload_bmkg
+
+PATH_API = "/publik/prakiraan-cuaca"
+
+
+class StubBMKG:
+    """Menjalankan server tiruan di thread latar; dipakai sebagai context manager."""
+
+    def __init__(self, port=0, rekaman=None, latensi_koneksi=0.0, latensi=0.0, gagal_setiap=0, hari=3):
+        self.rekaman = rekaman
+        self.latensi_koneksi = latensi_koneksi
+        self.latensi = latensi
+        self.gagal_setiap = gagal_setiap
+        self.hari = hari
+        self.jumlah_request = 0
+        self.jumlah_koneksi = 0
+        self.versi = 0
+        self._counter = itertools.count(1)
+        self._cache = {}
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), self._buat_handler())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}{PATH_API}"
+
+    def payload(self, kode):
+        """Payload JSON (bytes) untuk kode adm4, dari rekaman atau dibuat sekali lalu disimpan."""
+        with self._lock:
+            if kode not in self._cache:
+                path = os.path.join(self.rekaman, f"{kode}.json") if self.rekaman else None
+                if path and os.path.exists(path):
+                    with open(path, "rb") as f:
+                        self._cache[kode] = f.read()
+                else:
+                    seed = kode if self.versi == 0 else f"{kode}#{self.versi}"
+                    self._cache[kode] = json.dumps(buat_payload_bmkg(kode, hari=self.hari, seed=seed)).encode()
+            return self._cache[kode]
+
+    def terbitkan(self):
+        """Mensimulasikan BMKG menerbitkan prakiraan baru: payload sintetis berikutnya dibuat dengan isi lain."""
+        with self._lock:
+            self.versi += 1
+            self._cache = {k: v for k, v in self._cache.items() if self.rekaman and
+                           os.path.exists(os.path.join(self.rekaman, f"{k}.json"))}
+
+    def _buat_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                # Hindari jeda Nagle/delayed-ACK ~40 ms antara header dan body di koneksi keep-alive
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                with stub._lock:
+                    stub.jumlah_koneksi += 1
+                if stub.latensi_koneksi:
+                    time.sleep(stub.latensi_koneksi)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                n = next(stub._counter)
+                with stub._lock:
+                    stub.jumlah_request += 1
+                if stub.latensi:
+                    time.sleep(stub.latensi)
+                kode = parse_qs(url.query).get("adm4", [""])[0]
+                if url.path != PATH_API or not kode:
+                    return self._kirim(404, b'{"message": "not found"}')
+                if stub.gagal_setiap and n % stub.gagal_setiap == 0:
+                    return self._kirim(503, b'{"message": "service unavailable"}')
+                self._kirim(200, stub.payload(kode))
+
+            def _kirim(self, status, body):
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--rekaman", help="direktori berisi <adm4>.json hasil rekaman")
+    parser.add_argument("--latensi-koneksi", type=float, default=0.0)
+    parser.add_argument("--latensi", type=float, default=0.0)
+    parser.add_argument("--gagal-setiap", type=int, default=0)
+    args = parser.parse_args()
+
+    stub = StubBMKG(args.port, args.rekaman, args.latensi_koneksi, args.latensi, args.gagal_setiap)
+    print(f"Stub BMKG berjalan di {stub.url}")
+    try:
+        stub.server.serve_forever()
+    except KeyboardInterrupt:
+        stub.stop()
+
+
+if __name__ == "__main__":
+    main()
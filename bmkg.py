@@ -0,0 +1,418 @@
+"""Akses API prakiraan cuaca publik BMKG.
+
+Tidak bergantung pada Streamlit; instance cache prakiraan dibuat oleh
+pemanggil lewat create_forecast_cache (di app3.py sekali per proses).
+Alamat API bisa diarahkan ke server tiruan lewat variabel lingkungan
+BMKG_API_URL (dipakai oleh benchmark).
+"""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from cache import TTLCache
+
+try:
+    # Dekoder JSON cepat (opsional); jatuh ke modul json bawaan jika tidak terpasang
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+BMKG_API_URL = os.environ.get("BMKG_API_URL", "https://api.bmkg.go.id/publik/prakiraan-cuaca")
+
+# Format utc_datetime dan local_datetime pada respons BMKG
+WAKTU_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Offset UTC (jam) -> zona waktu wilayah, dipakai bila respons tidak menyebut timezone
+ZONA_WAKTU = {7: "Asia/Jakarta", 8: "Asia/Makassar", 9: "Asia/Jayapura"}
+
+# (connect, read) dalam detik
+TIMEOUT = (3.05, 10)
+# Percobaan ulang untuk error sementara; jeda = backoff_factor * 2^(n-1) + jitter acak
+RETRY = Retry(
+    total=3,
+    connect=3,
+    read=2,
+    status=3,
+    backoff_factor=0.5,
+    backoff_jitter=0.5,
+    backoff_max=8,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset({"GET"}),
+    respect_retry_after_header=True,
+    raise_on_status=False,
+)
+POOL_MAXSIZE = 16
+
+# Prakiraan BMKG berinterval 3 jam dan diperbarui beberapa kali sehari, jadi
+# data dianggap segar 1 jam dan masih boleh ditampilkan (sambil di-refresh) 3 jam
+PRAKIRAAN_TTL = int(os.environ.get("BMKG_CACHE_TTL", 3600))
+PRAKIRAAN_STALE_TTL = int(os.environ.get("BMKG_CACHE_STALE_TTL", 3 * 3600))
+PRAKIRAAN_CACHE_SIZE = int(os.environ.get("BMKG_CACHE_SIZE", 512))
+
+# Ambil massal: jumlah request paralel
+BULK_MAX_WORKERS = int(os.environ.get("BMKG_BULK_WORKERS", 8))
+# Batas laju ke BMKG (60 request/menit per IP), dibagi semua sesi, ambil massal,
+# dan pemanas cache dalam satu proses (lihat get_rate_limiter)
+RATE_PER_MIN = float(os.environ.get("BMKG_RATE_PER_MIN", 60))
+
+# Pemanas cache: jumlah desa terpopuler yang dijaga tetap segar, seberapa awal
+# sebelum TTL habis dimuat ulang (detik), bagian kuota RATE_PER_MIN yang boleh dipakai, dan jeda antar putaran
+PEMANAS_TOP_N = int(os.environ.get("BMKG_WARM_TOP_N", 20))
+PEMANAS_LEAD = int(os.environ.get("BMKG_WARM_LEAD", 300))
+PEMANAS_RATE_PER_MIN = float(os.environ.get("BMKG_WARM_RATE_PER_MIN", 10))
+PEMANAS_INTERVAL = float(os.environ.get("BMKG_WARM_INTERVAL", 30))
+
+_session = None
+_session_lock = threading.Lock()
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+
+
+def create_session(retry=RETRY, pool_maxsize=POOL_MAXSIZE):
+    """Membuat requests.Session dengan connection pool dan kebijakan retry."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"Connection": "keep-alive", "Accept": "application/json"})
+    return session
+
+
+def get_session():
+    """Session bersama untuk seluruh proses, sehingga koneksi TCP/TLS dipakai ulang."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session()
+    return _session
+
+
+def fetch_prakiraan(kode_wilayah_desa, session=None, timeout=TIMEOUT):
+    """Mengambil JSON prakiraan mentah untuk satu kode adm4. Melempar RequestException jika gagal."""
+    session = session or get_session()
+    resp = session.get(BMKG_API_URL, params={"adm4": kode_wilayah_desa}, timeout=timeout)
+    resp.raise_for_status()
+    return _json_loads(resp.content)
+
+
+def _kolom_waktu(nilai):
+    # Jalur cepat: numpy langsung mem-parsing "YYYY-MM-DD HH:MM:SS"; nilai rusak ditangani pandas
+    try:
+        return np.array(nilai, dtype="datetime64[us]")
+    except ValueError:
+        return pd.to_datetime(nilai, format=WAKTU_FORMAT, errors='coerce').to_numpy()
+
+
+def _kolom_angka(nilai):
+    # Suhu dan kelembaban BMKG berupa bilangan bulat kecil: int16 jika muat
+    # dan lengkap, selain itu float32 (nilai kosong menjadi NaN)
+    arr = np.asarray(nilai)
+    if arr.dtype.kind not in "iuf":
+        arr = pd.to_numeric(pd.Series(nilai), errors='coerce').to_numpy()
+    if arr.dtype.kind in "iu" and (arr.size == 0 or (arr.min() >= -2**15 and arr.max() < 2**15)):
+        return arr.astype(np.int16)
+    return arr.astype(np.float32)
+
+
+def _kolom_kategori(nilai):
+    kategori = sorted(set(nilai) - {None})
+    kode = {k: i for i, k in enumerate(kategori)}
+    return pd.Categorical.from_codes([kode.get(v, -1) for v in nilai], categories=kategori)
+
+
+def _zona_waktu(j, df):
+    """Zona waktu wilayah: field lokasi.timezone bila valid, jika tidak dari selisih local - utc."""
+    lokasi = j.get("lokasi") or (j.get("data") or [{}])[0].get("lokasi") or {}
+    zona = lokasi.get("timezone")
+    if isinstance(zona, str):
+        try:
+            pd.Timestamp(0, tz=zona)
+            return zona
+        except (ValueError, KeyError):
+            pass
+    selisih = (df['local'] - df['utc']).dropna()
+    if selisih.empty:
+        return "UTC"
+    jam = int(round(selisih.median() / pd.Timedelta(hours=1)))
+    # Tanda zona Etc/GMT terbalik: UTC+7 adalah Etc/GMT-7
+    return ZONA_WAKTU.get(jam) or f"Etc/GMT{-jam:+d}"
+
+
+def parse_prakiraan(j):
+    """
+    Mengubah JSON BMKG menjadi DataFrame terurut waktu, atau pesan error (str).
+
+    Kolom diisi langsung sebagai list per kolom (tanpa dict per baris);
+    suhu/kelembaban bertipe int16 (float32 bila ada nilai kosong/pecahan),
+    cuaca kategorikal, dan waktu diparsing dengan format eksplisit. Baris
+    diurutkan menurut utc dengan indeks DatetimeIndex "waktu" dalam zona
+    waktu wilayah (lihat jendela).
+    """
+    data_list = j.get("data", [])
+    if not data_list:
+        return "Error: Tidak ada data cuaca yang dikembalikan oleh BMKG untuk wilayah ini."
+
+    cuaca_nested = data_list[0].get("cuaca", [])
+    utc, local, suhu, kelembaban, cuaca = [], [], [], [], []
+    for grup in cuaca_nested:
+        for entry in grup:
+            utc.append(entry.get("utc_datetime"))
+            local.append(entry.get("local_datetime"))
+            suhu.append(entry.get("t"))
+            kelembaban.append(entry.get("hu"))
+            cuaca.append(entry.get("weather_desc"))
+
+    if not utc:
+        return pd.DataFrame(columns=["utc", "local", "suhu", "kelembaban", "cuaca"])
+
+    df = pd.DataFrame({
+        "utc": _kolom_waktu(utc),
+        "local": _kolom_waktu(local),
+        "suhu": _kolom_angka(suhu),
+        "kelembaban": _kolom_angka(kelembaban),
+        "cuaca": _kolom_kategori(cuaca),
+    }, copy=False)
+    if df['utc'].hasnans:
+        df = df[df['utc'].notna()]
+    if not df['utc'].is_monotonic_increasing:
+        df = df.sort_values('utc', kind='stable')
+    # Indeks waktu sadar zona (WIB/WITA/WIT) diturunkan dari utc, bukan dari jam server
+    zona = _zona_waktu(j, df)
+    df.index = pd.DatetimeIndex(df['utc'], name="waktu").tz_localize("UTC").tz_convert(zona)
+    df.attrs["timezone"] = zona
+    # Waktu terbit prakiraan, dipakai sebagai bagian kunci model (lihat model_cuaca.fingerprint)
+    df.attrs["analysis_date"] = next((g[0].get("analysis_date") for g in cuaca_nested if g), None) or ""
+    return df
+
+
+def get_bmkg_data(kode_wilayah_desa, session=None):
+    """Mengambil data prakiraan cuaca dari API BMKG menggunakan kode DESA/KELURAHAN."""
+    try:
+        j = fetch_prakiraan(kode_wilayah_desa, session=session)
+    except (requests.exceptions.RequestException, ValueError) as e:
+        # Mengembalikan error agar bisa ditampilkan di UI
+        return f"Error: Gagal menghubungi server BMKG atau data tidak ditemukan. Pesan: {e}"
+    return parse_prakiraan(j)
+
+
+def create_forecast_cache(loader=get_bmkg_data, ttl=PRAKIRAAN_TTL, stale_ttl=PRAKIRAAN_STALE_TTL,
+                          maxsize=PRAKIRAAN_CACHE_SIZE, **kwargs):
+    """
+    Cache prakiraan per kode adm4. Hanya DataFrame yang disimpan; pesan error
+    dikembalikan ke pemanggil tanpa di-cache sehingga request berikutnya mencoba lagi.
+    """
+    return TTLCache(loader, ttl=ttl, stale_ttl=stale_ttl, maxsize=maxsize,
+                    is_valid=lambda hasil: isinstance(hasil, pd.DataFrame), **kwargs)
+
+
+class RateLimiter:
+    """
+    Token bucket thread-safe: rata-rata paling banyak `rate` request per `per`
+    detik, dengan lonjakan hingga `burst` request sekaligus.
+
+    Jika `induk` (RateLimiter lain) diberikan, setiap token juga memakai satu
+    token induk, sehingga limiter ini hanya membagi kuota induk, tidak menambahnya.
+    """
+
+    def __init__(self, rate, per=60.0, burst=1, clock=time.monotonic, sleep=time.sleep, induk=None):
+        self.interval = per / rate
+        self.burst = burst
+        self.clock = clock
+        self.sleep = sleep
+        self.induk = induk
+        self._token = float(burst)
+        self._terakhir = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Menunggu sampai satu token tersedia lalu memakainya."""
+        while True:
+            with self._lock:
+                tunggu = self._ambil()
+            if tunggu == 0:
+                break
+            self.sleep(tunggu)
+        if self.induk is not None:
+            self.induk.acquire()
+
+    def try_acquire(self):
+        """Memakai satu token jika tersedia tanpa menunggu; False jika kuota sedang habis."""
+        with self._lock:
+            if self._ambil() != 0:
+                return False
+            if self.induk is not None and not self.induk.try_acquire():
+                # Kuota induk habis: token sendiri dikembalikan
+                self._token += 1
+                return False
+            return True
+
+    def _ambil(self):
+        # Dipanggil dengan lock dipegang; 0 jika token terpakai, selain itu detik yang perlu ditunggu
+        sekarang = self.clock()
+        self._token = min(self.burst, self._token + (sekarang - self._terakhir) / self.interval)
+        self._terakhir = sekarang
+        if self._token >= 1:
+            self._token -= 1
+            return 0
+        return (1 - self._token) * self.interval
+
+
+def get_rate_limiter():
+    """Limiter bersama untuk seluruh proses, sehingga batas per IP BMKG tidak dilipatgandakan per pemanggil."""
+    global _rate_limiter
+    if _rate_limiter is None:
+        with _rate_limiter_lock:
+            if _rate_limiter is None:
+                _rate_limiter = RateLimiter(RATE_PER_MIN, burst=BULK_MAX_WORKERS)
+    return _rate_limiter
+
+
+def iter_bulk_bmkg(kode_list, fetch=get_bmkg_data, max_workers=BULK_MAX_WORKERS, rate_limiter=None,
+                   perlu_dibatasi=None):
+    """
+    Mengambil prakiraan banyak kode adm4 secara paralel dengan thread pool terbatas.
+    Menghasilkan (kode, hasil) sesuai urutan selesai; hasil berupa DataFrame atau pesan error.
+
+    Jika `fetch` dilayani cache, `perlu_dibatasi(kode)` mengembalikan False untuk
+    kode yang tidak akan memanggil BMKG sehingga tidak menunggu token rate limiter.
+    """
+    def tugas(kode):
+        if rate_limiter is not None and (perlu_dibatasi is None or perlu_dibatasi(kode)):
+            rate_limiter.acquire()
+        return fetch(kode)
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bmkg-bulk") as executor:
+        futures = {executor.submit(tugas, kode): kode for kode in kode_list}
+        try:
+            for future in as_completed(futures):
+                try:
+                    hasil = future.result()
+                except Exception as e:
+                    hasil = f"Error: {e}"
+                yield futures[future], hasil
+        finally:
+            # Jika pemanggil berhenti lebih awal, jangan lanjutkan request yang belum jalan
+            for future in futures:
+                future.cancel()
+
+
+def get_bulk_bmkg_data(kode_list, fetch=get_bmkg_data, max_workers=BULK_MAX_WORKERS, rate_per_min=None,
+                       on_result=None, perlu_dibatasi=None):
+    """
+    Mengambil prakiraan untuk banyak desa dan menggabungkannya menjadi satu
+    DataFrame long-format (kolom adm4 + kolom prakiraan).
+
+    Secara default request dibatasi limiter bersama proses (get_rate_limiter);
+    `rate_per_min` > 0 memakai limiter sendiri dan 0 mematikan batas (benchmark).
+    `on_result(kode, hasil, selesai, total)` dipanggil setiap kali satu desa
+    selesai, misalnya untuk memperbarui progress bar. `perlu_dibatasi` diteruskan
+    ke iter_bulk_bmkg. Mengembalikan (DataFrame, dict kode -> pesan error).
+    """
+    if rate_per_min is None:
+        rate_limiter = get_rate_limiter()
+    else:
+        rate_limiter = RateLimiter(rate_per_min, burst=max_workers) if rate_per_min else None
+    frames, errors = [], {}
+    hasil_iter = iter_bulk_bmkg(kode_list, fetch, max_workers, rate_limiter, perlu_dibatasi)
+    for selesai, (kode, hasil) in enumerate(hasil_iter, start=1):
+        if isinstance(hasil, pd.DataFrame):
+            if not hasil.empty:
+                frames.append(hasil.assign(adm4=kode))
+        else:
+            errors[kode] = hasil
+        if on_result is not None:
+            on_result(kode, hasil, selesai, len(kode_list))
+
+    if not frames:
+        return pd.DataFrame(columns=["adm4", "utc", "local", "suhu", "kelembaban", "cuaca"]), errors
+    df = pd.concat(frames, ignore_index=True)
+    df = df[["adm4"] + [c for c in df.columns if c != "adm4"]]
+    # Kode desa dan deskripsi cuaca berulang di setiap baris: simpan sebagai kategori
+    # (concat kategori dengan himpunan berbeda menghasilkan string biasa)
+    df = df.astype({"adm4": "category", "cuaca": "category"})
+    return df.sort_values(["adm4", "utc"], ignore_index=True), errors
+
+
+def jendela(df, jam=24, mulai=None):
+    """
+    Baris prakiraan dengan waktu dalam [mulai, mulai + jam] (default mulai =
+    sekarang). Waktu dibandingkan sebagai instan UTC, jadi benar untuk WIB,
+    WITA, maupun WIT tanpa bergantung zona waktu server.
+
+    Frame satu wilayah (keluaran parse_prakiraan, terurut utc) dipotong dengan
+    searchsorted pada indeks waktunya menjadi irisan tanpa salinan. Frame
+    long-format dengan kolom adm4 (keluaran get_bulk_bmkg_data) disaring
+    sekaligus untuk semua wilayah, urutannya dipertahankan.
+    """
+    if df.empty:
+        return df
+    mulai = pd.Timestamp.now(tz="UTC") if mulai is None else pd.Timestamp(mulai)
+    # Timestamp naif dianggap UTC, sama seperti kolom utc
+    mulai = mulai.tz_convert("UTC") if mulai.tzinfo is not None else mulai.tz_localize("UTC")
+    akhir = mulai + pd.Timedelta(hours=jam)
+
+    if "adm4" not in df.columns:
+        waktu = df.index
+        if not (isinstance(waktu, pd.DatetimeIndex) and waktu.tz is not None):
+            waktu = pd.DatetimeIndex(df['utc']).tz_localize("UTC")
+        return df.iloc[waktu.searchsorted(mulai, side="left"):waktu.searchsorted(akhir, side="right")]
+
+    # Banyak wilayah: jendelanya instan UTC yang sama untuk semua zona, jadi
+    # cukup satu mask numpy atas kolom utc (tanpa groupby per adm4)
+    utc = df['utc'].to_numpy()
+    mask = (utc >= mulai.tz_localize(None).to_datetime64()) & (utc <= akhir.tz_localize(None).to_datetime64())
+    return df[mask]
+
+
+def ringkas_wilayah(df, panjang_kode=None, bucket="1D"):
+    """
+    Ringkasan prakiraan per wilayah dan per rentang waktu dari frame
+    long-format (keluaran get_bulk_bmkg_data): suhu_min, suhu_max,
+    kelembaban_max, cuaca_dominan, dan jumlah baris.
+
+    `panjang_kode` memotong kode adm4 (8 = kecamatan, 5 = kab/kota; None =
+    per desa). `bucket` adalah frekuensi pandas untuk waktu lokal (mis. "1D",
+    "6h"); None = seluruh periode. Kode dipotong pada kategori adm4 (bukan per
+    baris), dan frame panjang hanya dilewati satu kali groupby
+    (wilayah, waktu, cuaca); cuaca dominan dan nilai ekstrem lalu diturunkan
+    dari hasil groupby yang jauh lebih kecil itu, tanpa loop per wilayah.
+    Mengembalikan DataFrame ber-index (wilayah[, waktu]) terurut.
+    """
+    kode = df['adm4'].astype('category')
+    if panjang_kode is not None:
+        awalan, posisi = np.unique(kode.cat.categories.str.slice(0, panjang_kode).to_numpy(dtype=str),
+                                   return_inverse=True)
+        kode = pd.Series(pd.Categorical.from_codes(np.where(kode.cat.codes < 0, -1, posisi[kode.cat.codes]),
+                                                   categories=awalan), index=df.index)
+    kunci = [kode.rename("wilayah")]
+    if bucket is not None:
+        kunci.append(df['local'].dt.floor(bucket).rename("waktu"))
+    cuaca = df['cuaca'].astype('category')
+
+    per_cuaca = df.groupby(kunci + [cuaca], observed=True, dropna=False).agg(
+        suhu_min=('suhu', 'min'), suhu_max=('suhu', 'max'), kelembaban_max=('kelembaban', 'max'),
+        jumlah=('suhu', 'size'),
+    ).reset_index()
+    grup = [k.name for k in kunci]
+    hasil = per_cuaca.groupby(grup, observed=True, sort=True).agg(
+        suhu_min=('suhu_min', 'min'), suhu_max=('suhu_max', 'max'), kelembaban_max=('kelembaban_max', 'max'),
+        jumlah=('jumlah', 'sum'),
+    )
+    # Cuaca dominan: kategori dengan baris terbanyak per grup (seri -> urutan kategori pertama)
+    dominan = (per_cuaca[per_cuaca['cuaca'].notna()]
+               .sort_values('jumlah', ascending=False, kind='stable')
+               .drop_duplicates(grup)
+               .set_index(grup)['cuaca'])
+    hasil.insert(3, 'cuaca_dominan', dominan.reindex(hasil.index))
+    return hasil
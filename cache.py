@@ -0,0 +1,446 @@
+"""Cache in-memory dengan TTL, batas ukuran LRU, dan stale-while-revalidate.
+
+Tidak bergantung pada Streamlit. Instance cache dibuat sekali per proses
+(di app3.py lewat st.cache_resource) dan dibagi ke semua sesi. SharedCache
+menambahkan lapisan di disk (SQLite) yang dibagi beberapa proses/replika di
+satu host, dengan single-flight antarproses per kunci. CacheWarmer memuat
+ulang key yang paling sering diminta sebelum TTL-nya habis.
+"""
+
+import contextlib
+import heapq
+import logging
+import math
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# File SQLite SharedCache yang dibagi semua proses di host ini ("" = tanpa cache bersama)
+SHARED_CACHE_PATH = os.environ.get(
+    "SHARED_CACHE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "cache_bersama.sqlite"))
+
+logger = logging.getLogger(__name__)
+
+# Executor bersama untuk refresh latar belakang
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="cache-refresh")
+
+
+class TTLCache:
+    """
+    Cache kunci -> nilai yang dimuat oleh `loader(key)`.
+
+    - Entri berumur < ttl dianggap segar dan langsung dikembalikan.
+    - Entri berumur < ttl + stale_ttl dikembalikan apa adanya sambil dimuat
+      ulang di latar belakang (stale-while-revalidate).
+    - Entri yang lebih tua dimuat ulang secara sinkron.
+    - Hasil yang ditolak `is_valid` (mis. pesan error) tidak pernah disimpan.
+    - Jika jumlah entri melebihi maxsize, entri yang paling lama tidak dipakai dibuang.
+
+    Jika `backend` (SharedCache) diberikan, miss dan refresh lebih dulu melihat
+    backend: nilai yang baru dimuat proses lain dipakai ulang (umurnya ikut
+    dihitung), dan hanya satu proses yang memanggil loader untuk key yang sama.
+
+    `clock` bisa diganti dengan jam palsu untuk pengujian.
+    """
+
+    def __init__(self, loader, ttl, stale_ttl=0, maxsize=256, is_valid=None, clock=time.monotonic, executor=None,
+                 backend=None):
+        self.loader = loader
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.maxsize = maxsize
+        self.is_valid = is_valid or (lambda value: True)
+        self.clock = clock
+        self.executor = executor or _executor
+        self.backend = backend
+        self._data = OrderedDict()  # key -> (waktu_simpan, nilai)
+        self._refreshing = set()
+        self._lock = threading.RLock()
+        self._stats = dict(hits=0, stale_hits=0, misses=0, evictions=0, refreshes=0, failures=0)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key):
+        """Mengambil nilai untuk key, memuatnya jika belum ada atau sudah kedaluwarsa."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                umur = self.clock() - entry[0]
+                if umur < self.ttl:
+                    self._data.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return entry[1]
+                if umur < self.ttl + self.stale_ttl:
+                    self._data.move_to_end(key)
+                    self._stats["stale_hits"] += 1
+                    self._refresh_async(key)
+                    return entry[1]
+            self._stats["misses"] += 1
+        return self._load(key)
+
+    def peek(self, key):
+        """Mengembalikan (umur_detik, nilai) tanpa memuat dan tanpa mengubah statistik, atau None."""
+        with self._lock:
+            entry = self._data.get(key)
+            return None if entry is None else (self.clock() - entry[0], entry[1])
+
+    def put(self, key, value):
+        """Menyimpan nilai yang dimuat pemanggil sendiri (mis. dengan progres) seolah hasil loader."""
+        with self._lock:
+            self._simpan(key, value)
+
+    def refresh(self, key, maks_umur=0):
+        """
+        Memuat ulang key secara sinkron dan menyimpannya jika valid. Dengan
+        backend, nilai yang dimuat proses lain dalam `maks_umur` detik terakhir
+        dipakai tanpa memanggil loader.
+        """
+        with self._lock:
+            self._stats["refreshes"] += 1
+        return self._load(key, maks_umur)
+
+    def refresh_async(self, key):
+        """Memuat ulang key di latar belakang (paling banyak satu per key) tanpa menunggu hasilnya."""
+        with self._lock:
+            self._refresh_async(key)
+
+    def invalidate(self, key=None):
+        """Menghapus satu key, atau seluruh isi cache jika key None."""
+        with self._lock:
+            if key is None:
+                self._data.clear()
+            else:
+                self._data.pop(key, None)
+
+    def stats(self):
+        """Salinan penghitung hit/miss/eviction beserta ukuran cache saat ini."""
+        with self._lock:
+            return dict(self._stats, size=len(self._data), maxsize=self.maxsize)
+
+    def _load(self, key, maks_umur=None):
+        if self.backend is None:
+            umur, value = 0.0, self.loader(key)
+        else:
+            maks_umur = self.ttl if maks_umur is None else maks_umur
+            umur, value = self.backend.get_or_load(key, self.loader, maks_umur=maks_umur, is_valid=self.is_valid)
+        with self._lock:
+            self._simpan(key, value, umur)
+        return value
+
+    def _simpan(self, key, value, umur=0.0):
+        # Dipanggil dengan lock dipegang
+        if self.is_valid(value):
+            self._data[key] = (self.clock() - umur, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self._stats["evictions"] += 1
+        else:
+            self._stats["failures"] += 1
+
+    def _refresh_async(self, key):
+        # Dipanggil dengan lock dipegang; satu refresh latar per key
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+        self._stats["refreshes"] += 1
+
+        def tugas():
+            try:
+                self._load(key)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        self.executor.submit(tugas)
+
+
+_SCHEMA_BERSAMA = """
+CREATE TABLE IF NOT EXISTS nilai (
+    ns       TEXT NOT NULL,
+    key      TEXT NOT NULL,
+    disimpan REAL NOT NULL,  -- detik epoch (jam dinding, sama untuk semua proses)
+    data     BLOB NOT NULL,  -- pickle
+    PRIMARY KEY (ns, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS nilai_disimpan ON nilai (ns, disimpan);
+CREATE TABLE IF NOT EXISTS kunci (
+    ns          TEXT NOT NULL,
+    key         TEXT NOT NULL,
+    pemilik     TEXT NOT NULL,
+    kedaluwarsa REAL NOT NULL,
+    PRIMARY KEY (ns, key)
+) WITHOUT ROWID;
+"""
+
+
+class SharedCache:
+    """
+    Penyimpanan kunci -> nilai (pickle) di file SQLite yang dibagi semua proses
+    di satu host, dikelompokkan per `namespace`.
+
+    - get(key, maks_umur) mengembalikan (umur_detik, nilai) atau None.
+    - kunci(key) adalah lease antarproses: hanya satu pemegang per key; yang
+      lain menunggu (polling) sampai lease dilepas atau kedaluwarsa
+      (`lease_ttl`, agar proses yang mati tidak mengunci selamanya).
+    - get_or_load memakai keduanya sehingga miss bersamaan untuk key yang sama
+      di banyak proses hanya memanggil loader sekali. Hasil yang ditolak
+      `is_valid` tidak disimpan; penunggu berikutnya mencoba sendiri.
+
+    Entri lebih tua dari `umur_simpan` dan entri di atas `maxsize` (yang paling
+    lama disimpan) dibuang saat penulisan. `clock`/`sleep` bisa diganti untuk pengujian.
+    """
+
+    def __init__(self, path, namespace="default", maxsize=1024, umur_simpan=None, lease_ttl=120, poll=0.05,
+                 clock=time.time, sleep=time.sleep):
+        self.path = path
+        self.namespace = namespace
+        self.maxsize = maxsize
+        self.umur_simpan = umur_simpan
+        self.lease_ttl = lease_ttl
+        self.poll = poll
+        self.clock = clock
+        self.sleep = sleep
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA_BERSAMA)
+        self._lock = threading.Lock()
+        self._stats = dict(hits=0, misses=0, loads=0, waits=0)
+
+    def close(self):
+        self._conn.close()
+
+    def get(self, key, maks_umur=None):
+        """(umur_detik, nilai) jika key ada dan umurnya < maks_umur, selain itu None."""
+        with self._lock:
+            baris = self._conn.execute("SELECT disimpan, data FROM nilai WHERE ns = ? AND key = ?",
+                                       (self.namespace, key)).fetchone()
+        if baris is not None:
+            umur = max(0.0, self.clock() - baris[0])
+            if maks_umur is None or umur < maks_umur:
+                with self._lock:
+                    self._stats["hits"] += 1
+                return umur, pickle.loads(baris[1])
+        with self._lock:
+            self._stats["misses"] += 1
+        return None
+
+    def put(self, key, value):
+        """Menyimpan nilai (menimpa yang lama) lalu memangkas entri kedaluwarsa/berlebih."""
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        sekarang = self.clock()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute("INSERT OR REPLACE INTO nilai (ns, key, disimpan, data) VALUES (?, ?, ?, ?)",
+                                   (self.namespace, key, sekarang, data))
+                if self.umur_simpan is not None:
+                    self._conn.execute("DELETE FROM nilai WHERE ns = ? AND disimpan < ?",
+                                       (self.namespace, sekarang - self.umur_simpan))
+                self._conn.execute(
+                    "DELETE FROM nilai WHERE ns = ? AND key IN (SELECT key FROM nilai WHERE ns = ? "
+                    "ORDER BY disimpan DESC LIMIT -1 OFFSET ?)", (self.namespace, self.namespace, self.maxsize))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def invalidate(self, key=None):
+        """Menghapus satu key, atau seluruh isi namespace jika key None."""
+        with self._lock:
+            if key is None:
+                self._conn.execute("DELETE FROM nilai WHERE ns = ?", (self.namespace,))
+            else:
+                self._conn.execute("DELETE FROM nilai WHERE ns = ? AND key = ?", (self.namespace, key))
+
+    @contextlib.contextmanager
+    def kunci(self, key):
+        """Menahan lease antarproses untuk key selama blok with berjalan."""
+        pemilik = uuid.uuid4().hex
+        menunggu = False
+        while not self._ambil_lease(key, pemilik):
+            if not menunggu:
+                menunggu = True
+                with self._lock:
+                    self._stats["waits"] += 1
+            self.sleep(self.poll)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._conn.execute("DELETE FROM kunci WHERE ns = ? AND key = ? AND pemilik = ?",
+                                   (self.namespace, key, pemilik))
+
+    def get_or_load(self, key, loader, maks_umur=None, is_valid=None):
+        """
+        (umur_detik, nilai) untuk key: dari penyimpanan bila cukup segar, selain
+        itu dimuat dengan loader(key) oleh satu proses saja sementara yang lain menunggu.
+        """
+        hasil = self.get(key, maks_umur)
+        if hasil is not None:
+            return hasil
+        with self.kunci(key):
+            # Pemegang lease sebelumnya mungkin sudah memuat key ini
+            hasil = self.get(key, maks_umur)
+            if hasil is not None:
+                return hasil
+            value = loader(key)
+            with self._lock:
+                self._stats["loads"] += 1
+            if is_valid is None or is_valid(value):
+                self.put(key, value)
+            return 0.0, value
+
+    def stats(self):
+        with self._lock:
+            jumlah = self._conn.execute("SELECT COUNT(*) FROM nilai WHERE ns = ?", (self.namespace,)).fetchone()[0]
+            return dict(self._stats, size=jumlah, maxsize=self.maxsize)
+
+    def _ambil_lease(self, key, pemilik):
+        sekarang = self.clock()
+        with self._lock:
+            # Lease milik proses lain hanya bisa diambil alih setelah kedaluwarsa
+            cur = self._conn.execute(
+                "INSERT INTO kunci (ns, key, pemilik, kedaluwarsa) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (ns, key) DO UPDATE SET pemilik = excluded.pemilik, kedaluwarsa = excluded.kedaluwarsa "
+                "WHERE kunci.kedaluwarsa < ?",
+                (self.namespace, key, pemilik, sekarang + self.lease_ttl, sekarang))
+            return cur.rowcount == 1
+
+
+class CacheWarmer:
+    """
+    Menjaga key TTLCache yang paling sering diminta tetap segar.
+
+    - catat(key) dipanggil setiap kali pengguna meminta key. Skornya meluruh
+      setengah setiap `paruh_waktu` detik sehingga popularitas lama memudar.
+    - tick() memeriksa `top_n` key dengan skor tertinggi. Key yang belum ada di
+      cache atau umurnya sudah >= ttl - `lead` dimuat ulang lewat cache.refresh,
+      lalu `on_refresh(key, nilai)` dipanggil (mis. untuk melatih model).
+    - Setiap muat ulang memakai satu token dari `limiter` (punya try_acquire(),
+      mis. bmkg.RateLimiter); jika kuota habis, sisanya menunggu tick berikutnya.
+    - Key yang gagal dimuat tidak dicoba lagi selama `lead` detik.
+
+    start() menjalankan tick() di thread latar setiap `interval` detik. Untuk
+    pengujian, panggil tick() langsung dengan `clock` (dan clock cache) palsu.
+    """
+
+    def __init__(self, cache, top_n=20, lead=300, limiter=None, on_refresh=None, paruh_waktu=6 * 3600,
+                 maks_key=10_000, clock=time.monotonic):
+        self.cache = cache
+        self.top_n = top_n
+        self.lead = lead
+        self.limiter = limiter
+        self.on_refresh = on_refresh
+        self.paruh_waktu = paruh_waktu
+        self.maks_key = maks_key
+        self.clock = clock
+        self._skor = {}  # key -> (skor, waktu_catat)
+        self._gagal = {}  # key -> waktu gagal terakhir
+        self._lock = threading.Lock()
+        self._berhenti = threading.Event()
+        self._thread = None
+        self._stats = dict(ticks=0, refreshes=0, failures=0, budget_habis=0)
+
+    def catat(self, key):
+        """Mencatat satu permintaan pengguna untuk key."""
+        sekarang = self.clock()
+        with self._lock:
+            skor, waktu = self._skor.get(key, (0.0, sekarang))
+            self._skor[key] = (self._luruh(skor, sekarang - waktu) + 1.0, sekarang)
+            if len(self._skor) > 2 * self.maks_key:
+                # Buang key paling tidak populer agar memori tetap terbatas
+                for k in self._teratas(len(self._skor) - self.maks_key, sekarang, terbawah=True):
+                    del self._skor[k]
+
+    def populer(self, n=None):
+        """Daftar (key, skor_saat_ini) dengan skor tertinggi, terurut menurun."""
+        sekarang = self.clock()
+        with self._lock:
+            keys = self._teratas(self.top_n if n is None else n, sekarang)
+            return [(k, self._luruh(*self._skor_pada(k, sekarang))) for k in keys]
+
+    def tick(self):
+        """Satu putaran: memuat ulang key populer yang hampir/sudah kedaluwarsa. Mengembalikan daftar key-nya."""
+        sekarang = self.clock()
+        with self._lock:
+            self._stats["ticks"] += 1
+            kandidat = self._teratas(self.top_n, sekarang)
+        dimuat = []
+        for key in kandidat:
+            entri = self.cache.peek(key)
+            if entri is not None and entri[0] < self.cache.ttl - self.lead:
+                continue
+            with self._lock:
+                gagal = self._gagal.get(key)
+            if gagal is not None and sekarang - gagal < self.lead:
+                continue
+            if self.limiter is not None and not self.limiter.try_acquire():
+                with self._lock:
+                    self._stats["budget_habis"] += 1
+                break
+            nilai = self.cache.refresh(key, maks_umur=self.cache.ttl - self.lead)
+            if not self.cache.is_valid(nilai):
+                with self._lock:
+                    self._gagal[key] = sekarang
+                    self._stats["failures"] += 1
+                continue
+            with self._lock:
+                self._gagal.pop(key, None)
+                self._stats["refreshes"] += 1
+            dimuat.append(key)
+            if self.on_refresh is not None:
+                self.on_refresh(key, nilai)
+        return dimuat
+
+    def start(self, interval=30):
+        """Menjalankan tick() di thread daemon setiap `interval` detik sampai stop()."""
+        if self._thread is not None:
+            return self
+        self._berhenti.clear()
+
+        def putaran():
+            while not self._berhenti.wait(interval):
+                try:
+                    self.tick()
+                except Exception:
+                    # Pemanas tidak boleh mati karena satu putaran gagal
+                    logger.exception("Putaran pemanas cache gagal")
+
+        self._thread = threading.Thread(target=putaran, name="cache-warmer", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._berhenti.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, dilacak=len(self._skor), top_n=self.top_n)
+
+    def _luruh(self, skor, selang):
+        return skor * math.exp2(-selang / self.paruh_waktu)
+
+    def _skor_pada(self, key, sekarang):
+        skor, waktu = self._skor[key]
+        return skor, sekarang - waktu
+
+    def _teratas(self, n, sekarang, terbawah=False):
+        # Dipanggil dengan lock dipegang
+        pilih = heapq.nsmallest if terbawah else heapq.nlargest
+        return pilih(n, self._skor, key=lambda k: self._luruh(*self._skor_pada(k, sekarang)))
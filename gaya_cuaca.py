@@ -0,0 +1,353 @@
+"""Pemetaan deskripsi cuaca BMKG ke kategori, emoji, dan warna tampilan.
+
+Deskripsi cuaca BMKG berasal dari himpunan kecil yang tertutup, jadi setiap
+deskripsi cukup diklasifikasikan sekali ke KategoriCuaca; emoji, gradien
+kartu, dan warna teks lalu diambil dari tabel per kategori.
+"""
+
+import enum
+import functools
+import html
+
+import numpy as np
+import pandas as pd
+
+
+class KategoriCuaca(enum.Enum):
+    CERAH = "cerah"
+    CERAH_BERAWAN = "cerah berawan"
+    BERAWAN = "berawan"
+    KABUT = "kabut"
+    HUJAN_LEBAT = "hujan lebat"
+    PETIR = "petir"
+    HUJAN_RINGAN = "hujan ringan"
+    HUJAN = "hujan"
+    MENDUNG = "mendung"
+    LAINNYA = "lainnya"
+    TIDAK_DIKETAHUI = "tidak diketahui"
+
+
+# Aturan klasifikasi, diperiksa berurutan: kategori pertama yang salah satu
+# kata kuncinya muncul di deskripsi (huruf kecil) yang dipakai
+ATURAN_KATEGORI = [
+    (("cerah berawan",), KategoriCuaca.CERAH_BERAWAN),
+    (("cerah",), KategoriCuaca.CERAH),
+    (("berawan",), KategoriCuaca.BERAWAN),
+    (("kabut", "asap", "udara kabur"), KategoriCuaca.KABUT),
+    (("hujan lebat",), KategoriCuaca.HUJAN_LEBAT),
+    (("hujan petir", "badai", "petir"), KategoriCuaca.PETIR),
+    (("hujan ringan",), KategoriCuaca.HUJAN_RINGAN),
+    (("hujan",), KategoriCuaca.HUJAN),
+    (("mendung",), KategoriCuaca.MENDUNG),
+]
+
+EMOJI = {
+    KategoriCuaca.CERAH: "☀️",
+    KategoriCuaca.CERAH_BERAWAN: "🌤️",
+    KategoriCuaca.BERAWAN: "☁️",
+    KategoriCuaca.KABUT: "🌫️",
+    KategoriCuaca.HUJAN_LEBAT: "🌧️",
+    KategoriCuaca.PETIR: "⛈️",
+    KategoriCuaca.HUJAN_RINGAN: "🌦️",
+    KategoriCuaca.HUJAN: "🌧️",
+    KategoriCuaca.MENDUNG: "🌏",
+    KategoriCuaca.LAINNYA: "🌏",
+    KategoriCuaca.TIDAK_DIKETAHUI: "❓",
+}
+
+# (warna atas, warna bawah) gradien kartu
+GRADIEN = {
+    KategoriCuaca.CERAH: ("#fff176", "#fbc02d"),
+    KategoriCuaca.CERAH_BERAWAN: ("#d0ecff", "#90caf9"),
+    KategoriCuaca.BERAWAN: ("#e0e0e0", "#9e9e9e"),
+    KategoriCuaca.KABUT: ("#d7ccc8", "#a1887f"),
+    KategoriCuaca.HUJAN_LEBAT: ("#a9a9a9", "#404040"),
+    KategoriCuaca.PETIR: ("#888888", "#2c3e50"),
+    KategoriCuaca.HUJAN_RINGAN: ("#d0d0d0", "#888888"),
+    KategoriCuaca.HUJAN: ("#cfd8dc", "#78909c"),
+    KategoriCuaca.MENDUNG: ("#b0b0b0", "#707070"),
+    KategoriCuaca.LAINNYA: ("#e7f4ff", "#cceeff"),
+    KategoriCuaca.TIDAK_DIKETAHUI: ("#eeeeee", "#cccccc"),
+}
+
+_GAYA_TEKS_DEFAULT = {
+    "cuaca": "color: #37474f;",
+    "kelembaban": "color: #90a4ae;",
+    "suhu": "color: #ef9a9a;",
+    "tanggal": "color: #eceff1;",
+    "jam": "color: #cfd8dc;"
+}
+
+GAYA_TEKS = {
+    KategoriCuaca.CERAH: {
+        "cuaca": "color: #f57f17;",
+        "kelembaban": "color: #4e342e;",
+        "suhu": "color: #bf360c;",
+        "tanggal": "color: #6d4c41;",
+        "jam": "color: #ff8f00;"
+    },
+    KategoriCuaca.CERAH_BERAWAN: {
+        "cuaca": "color: #01579b;",
+        "kelembaban": "color: #0277bd;",
+        "suhu": "color: #0288d1;",
+        "tanggal": "color: #0288d1;",
+        "jam": "color: #039be5;"
+    },
+    KategoriCuaca.BERAWAN: {
+        "cuaca": "color: #eeeeee;",
+        "kelembaban": "color: #cce7ff;",
+        "suhu": "color: #ffcdd2;",
+        "tanggal": "color: #e0f7fa;",
+        "jam": "color: #b3e5fc;"
+    },
+    KategoriCuaca.KABUT: {
+        "cuaca":      "color: #3E2723;",
+        "kelembaban": "color: #00695C;",
+        "suhu":       "color: #E65100;",
+        "tanggal":    "color: #795548;",
+        "jam":        "color: #A1887F;"
+    },
+    KategoriCuaca.HUJAN_LEBAT: {
+        "cuaca": "color: #e0f2f1;",
+        "kelembaban": "color: #b2dfdb;",
+        "suhu": "color: #ef9a9a;",
+        "tanggal": "color: #f5f5f5;",
+        "jam": "color: #b2ebf2;"
+    },
+    KategoriCuaca.PETIR: {
+        "cuaca": "color: #bbdefb;",
+        "kelembaban": "color: #ffcc80;",
+        "suhu": "color: #ef9a9a;",
+        "tanggal": "color: #e0e0e0;",
+        "jam": "color: #fff176;"
+    },
+    KategoriCuaca.HUJAN_RINGAN: {
+        "cuaca": "color: #455a64;",
+        "kelembaban": "color: #bbdefb;",
+        "suhu": "color: #ef9a9a;",
+        "tanggal": "color: #eceff1;",
+        "jam": "color: #666;"
+    },
+    KategoriCuaca.HUJAN: {
+        "cuaca": "color: #546e7a;",
+        "kelembaban": "color: #78909c;",
+        "suhu": "color: #ff8a80;",
+        "tanggal": "color: #eceff1;",
+        "jam": "color: #b0bec5;"
+    },
+    KategoriCuaca.MENDUNG: {
+        "cuaca": "color: #757575;",
+        "kelembaban": "color: #9e9e9e;",
+        "suhu": "color: #e57373;",
+        "tanggal": "color: #cfd8dc;",
+        "jam": "color: #bdbdbd;"
+    },
+    KategoriCuaca.LAINNYA: _GAYA_TEKS_DEFAULT,
+    KategoriCuaca.TIDAK_DIKETAHUI: _GAYA_TEKS_DEFAULT,
+}
+
+
+# Deskripsi -> kategori yang sudah pernah diklasifikasikan (himpunannya kecil)
+_cache_kategori = {}
+
+
+def _klasifikasi(cuaca_desc):
+    if not isinstance(cuaca_desc, str):
+        return KategoriCuaca.TIDAK_DIKETAHUI
+    cuaca_lower = cuaca_desc.lower()
+    for kata_kunci, kategori in ATURAN_KATEGORI:
+        if any(k in cuaca_lower for k in kata_kunci):
+            return kategori
+    return KategoriCuaca.LAINNYA
+
+
+def klasifikasi_cuaca(cuaca_desc):
+    """Memetakan satu deskripsi cuaca ke KategoriCuaca (hasil di-cache per deskripsi)."""
+    kategori = _cache_kategori.get(cuaca_desc)
+    if kategori is None:
+        kategori = _klasifikasi(cuaca_desc)
+        if len(_cache_kategori) < 1024:
+            _cache_kategori[cuaca_desc] = kategori
+    return kategori
+
+
+def klasifikasi_kolom(cuaca):
+    """
+    Mengklasifikasikan satu kolom deskripsi cuaca sekaligus. Hanya kategori
+    unik kolom (categorical) yang diklasifikasikan, lalu disebar lewat kode.
+    Mengembalikan Series kategorikal berisi nilai KategoriCuaca.
+    """
+    cuaca = cuaca.astype("category")
+    kategori = [klasifikasi_cuaca(c) for c in cuaca.cat.categories] + [KategoriCuaca.TIDAK_DIKETAHUI]
+    # Kode -1 (nilai kosong) menunjuk ke elemen terakhir: TIDAK_DIKETAHUI
+    hasil = pd.Series(kategori, dtype=object).to_numpy()[cuaca.cat.codes.to_numpy()]
+    return pd.Series(pd.Categorical(hasil, categories=list(KategoriCuaca)), index=cuaca.index)
+
+
+GRADIEN_CSS = {
+    kategori: f"background: linear-gradient(to bottom, {atas}, {bawah});"
+    for kategori, (atas, bawah) in GRADIEN.items()
+}
+
+
+# ========== Dominant Colors ==========
+WARNA_DEFAULT = ("#6dd5ed", "#2193b0", "#B0BEC5")
+
+
+def hex_to_rgb(hex_color):
+    """Konversi warna hex (#RRGGBB) ke tuple RGB."""
+    hex_color = hex_color.lstrip('#')
+    return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
+
+
+@functools.lru_cache(maxsize=256)
+def _warna_dominan(jumlah_kategori, num_colors):
+    """
+    K-means berbobot atas warna gradien unik. Setiap kategori menyumbang dua
+    warna (atas dan bawah) dengan bobot sebanyak kartunya, jadi hasilnya sama
+    dengan clustering semua warna kartu, tetapi hanya pada <= 22 titik.
+    Inisialisasi farthest-point dari warna terberat sehingga deterministik.
+    """
+    bobot_warna = {}
+    for kategori, jumlah in jumlah_kategori:
+        for warna in GRADIEN[kategori]:
+            bobot_warna[warna] = bobot_warna.get(warna, 0) + jumlah
+    # Urutan tetap (bobot turun, lalu hex) agar hasil tidak bergantung urutan kartu
+    urut = sorted(bobot_warna.items(), key=lambda item: (-item[1], item[0]))
+    titik = np.array([hex_to_rgb(w) for w, _ in urut], dtype=float)
+    bobot = np.array([b for _, b in urut], dtype=float)
+
+    k = min(num_colors, len(titik))
+    pusat = [titik[0]]
+    jarak = ((titik - titik[0]) ** 2).sum(axis=1)
+    for _ in range(1, k):
+        pusat.append(titik[np.argmax(bobot * jarak)])
+        jarak = np.minimum(jarak, ((titik - pusat[-1]) ** 2).sum(axis=1))
+    pusat = np.array(pusat)
+
+    for _ in range(20):
+        label = ((titik[:, None, :] - pusat[None, :, :]) ** 2).sum(axis=2).argmin(axis=1)
+        baru = pusat.copy()
+        for j in range(k):
+            anggota = label == j
+            if anggota.any():
+                baru[j] = np.average(titik[anggota], axis=0, weights=bobot[anggota])
+        if np.allclose(baru, pusat):
+            break
+        pusat = baru
+
+    # Cluster terberat lebih dulu; kurang dari num_colors warna unik -> ulangi
+    massa = np.bincount(label, weights=bobot, minlength=k)
+    pusat = pusat[np.argsort(-massa, kind="stable")].astype(int)
+    warna = [f"#{r:02x}{g:02x}{b:02x}" for r, g, b in pusat]
+    return tuple(warna[i % k] for i in range(num_colors))
+
+
+def get_dominant_colors(df_display, num_colors=3):
+    """
+    Menganalisis warna dari kartu-kartu yang ditampilkan dan menemukan N warna dominan.
+    Hasil di-memo per multiset kategori cuaca, jadi rerun dengan kartu yang sama
+    (atau kategori yang sama dalam urutan berbeda) tidak menghitung ulang.
+    """
+    jumlah = {}
+    for cuaca_desc, n in df_display['cuaca'].value_counts(sort=False, dropna=False).items():
+        kategori = klasifikasi_cuaca(None if pd.isna(cuaca_desc) else cuaca_desc)
+        jumlah[kategori] = jumlah.get(kategori, 0) + int(n)
+    # Kunci memo dalam urutan enum agar tidak bergantung urutan kartu
+    jumlah_kategori = tuple((kategori, jumlah[kategori]) for kategori in KategoriCuaca if jumlah.get(kategori))
+    if not jumlah_kategori:
+        return list(WARNA_DEFAULT)  # Fallback default
+    return list(_warna_dominan(jumlah_kategori, num_colors))
+
+
+# ========== Weather Icon Mapping ==========
+def get_weather_emoji(cuaca_desc):
+    """Memetakan deskripsi cuaca ke emoji."""
+    return EMOJI[klasifikasi_cuaca(cuaca_desc)]
+
+
+# ========== Weather Color Mapping ==========
+def get_gradient_color(cuaca_desc):
+    return GRADIEN_CSS[klasifikasi_cuaca(cuaca_desc)]
+
+
+# ========== Timeline Text Mapping ==========
+def get_text_styles(cuaca_desc):
+    return GAYA_TEKS[klasifikasi_cuaca(cuaca_desc)]
+
+
+# ========== Forecast Cards ==========
+CSS_KARTU = """<style>
+.grid-cuaca {
+    display: grid;
+    grid-template-columns: repeat(var(--kolom-cuaca, 4), minmax(0, 1fr));
+    gap: 10px;
+    margin-bottom: 1rem;
+}
+@media (max-width: 640px) {
+    .grid-cuaca { grid-template-columns: repeat(2, minmax(0, 1fr)); }
+}
+.card-cuaca {
+    border: 1px solid #ddd;
+    border-radius: 10px;
+    padding: 15px;
+    text-align: center;
+    background-color: #f8f9fa;
+    transition: transform 0.3s ease-in-out, box-shadow 0.3s ease-in-out, background-color 0.3s ease-in-out;
+    cursor: pointer;
+}
+.card-cuaca:hover {
+    transform: scale(1.05);
+    box-shadow: 0 8px 16px rgba(0, 0, 0, 0.2);
+    filter: brightness(1.05);
+}
+.ikon-cuaca {
+    display: inline-flex;
+    justify-content: center;
+    align-items: center;
+    background: rgba(255,255,255,0.6);
+    border-radius: 50%;
+    aspect-ratio: 1 / 1;
+    width: 3rem;
+}
+</style>"""
+
+# Satu kartu per baris teks: markdown memutus blok HTML pada baris kosong
+# dan memperlakukan baris berindentasi sebagai blok kode
+_TEMPLATE_KARTU = (
+    '<div class="card-cuaca" style="{latar}">'
+    '<div class="ikon-cuaca"><span style="font-size: 2rem;">{emoji}</span></div>'
+    '<p style="font-weight: bold; color: #666;{gaya[jam]}">{jam}</p>'
+    '<p style="margin: 2px 0; font-size: 12px; color: #888;{gaya[tanggal]}">{tanggal}</p>'
+    '<p style="font-weight: bold; color: #e74c3c; margin-top: 5px;{gaya[suhu]}">{suhu}°C</p>'
+    '<p style="margin: 2px 0; font-size: 12px; color: #3498db;{gaya[kelembaban]}">{kelembaban}%</p>'
+    '<p style="font-size: 0.8em; color: #555; height: 30px;{gaya[cuaca]}">{cuaca}</p>'
+    '</div>'
+)
+
+
+def render_kartu(df, kolom_per_baris=4):
+    """
+    Membangun HTML seluruh grid kartu prakiraan (beserta CSS-nya) sebagai satu
+    string, untuk dikirim dengan satu st.markdown. Kolom waktu diformat sekali
+    per kolom (dt.strftime) dan gaya diambil per kategori, bukan per kartu.
+    """
+    kategori = klasifikasi_kolom(df['cuaca'])
+    cuaca = df['cuaca'].astype(object).where(df['cuaca'].notna(), None)
+    kartu = [
+        _TEMPLATE_KARTU.format(latar=GRADIEN_CSS[k], emoji=EMOJI[k], gaya=GAYA_TEKS[k],
+                               jam=j, tanggal=t, suhu=s, kelembaban=h, cuaca=html.escape(str(c)))
+        for k, j, t, s, h, c in zip(
+            kategori,
+            df['local'].dt.strftime('%H:%M'),
+            df['local'].dt.strftime('%d %b %Y'),
+            df['suhu'].astype(str),
+            df['kelembaban'].astype(str),
+            cuaca,
+        )
+    ]
+    return (
+        f'{CSS_KARTU}\n<div class="grid-cuaca" style="--kolom-cuaca: {kolom_per_baris};">\n'
+        + "\n".join(kartu)
+        + "\n</div>"
+    )
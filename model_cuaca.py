@@ -0,0 +1,385 @@
+"""Model klasifikasi cuaca (suhu, kelembaban -> deskripsi cuaca).
+
+Model yang sudah dilatih disimpan di ModelRegistry: LRU di memori yang
+dibatasi jumlah byte, ditambah salinan joblib di disk sehingga kunjungan
+ulang dan restart proses tidak perlu melatih ulang. Pelatihan memakai semua
+core, bisa menumbuhkan forest lama (warm_start) saat prakiraan baru datang,
+dan bisa dijalankan di executor latar belakang.
+
+scikit-learn dan joblib baru diimpor saat model pertama kali dilatih atau
+dimuat, sehingga halaman yang belum menampilkan prakiraan tidak ikut
+menanggung waktu impornya.
+"""
+
+import contextlib
+import copy
+import glob
+import hashlib
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+MODEL_DIR = os.environ.get(
+    "MODEL_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "model"))
+MODEL_CACHE_BYTES = int(os.environ.get("MODEL_CACHE_MB", 256)) * 1024 * 1024
+MODEL_DISK_BYTES = int(os.environ.get("MODEL_DISK_MB", 1024)) * 1024 * 1024
+
+# Jumlah core untuk fit/predict (-1 = semua core)
+N_JOBS = int(os.environ.get("MODEL_N_JOBS", -1))
+N_ESTIMATORS = 100
+# Pohon yang ditambahkan per pembaruan warm_start, dan batas ukuran forest
+N_TAMBAH = 20
+MAX_ESTIMATORS = 300
+
+_executor = ThreadPoolExecutor(max_workers=int(os.environ.get("MODEL_TRAIN_WORKERS", 2)),
+                               thread_name_prefix="model-train")
+
+FITUR = ["suhu", "kelembaban"]
+TARGET = "cuaca"
+
+# Rentang slider prediksi manual; grid prediksi dihitung sekali per model
+SUHU_GRID = np.arange(10, 41)
+KELEMBABAN_GRID = np.arange(20, 101)
+_grid_cache = weakref.WeakKeyDictionary()
+_grid_lock = threading.Lock()
+
+# Model global (opsional) yang dilatih offline dari riwayat prakiraan semua desa
+GLOBAL_MODEL_PATH = os.environ.get(
+    "GLOBAL_MODEL_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "model_global.joblib"))
+FITUR_GLOBAL = ["prov", "kab", "jam", "suhu", "kelembaban"]
+GLOBAL_MAX_BARIS = int(os.environ.get("GLOBAL_MAX_BARIS", 2_000_000))
+
+
+def train_model(df, n_jobs=N_JOBS, n_estimators=N_ESTIMATORS):
+    from sklearn.ensemble import RandomForestClassifier
+
+    df_model = df[FITUR + [TARGET]].dropna()
+    if df_model.empty:
+        return None
+    X = df_model[FITUR]
+    y = df_model[TARGET]
+    model = RandomForestClassifier(n_estimators=n_estimators, random_state=42, n_jobs=n_jobs)
+    model.fit(X, y)
+    return model
+
+
+def update_model(model, df, n_tambah=N_TAMBAH, n_jobs=N_JOBS):
+    """
+    Menumbuhkan salinan forest lama dengan `n_tambah` pohon baru (warm_start)
+    yang dilatih pada data terbaru. Jika kelas cuaca berubah atau forest sudah
+    mencapai MAX_ESTIMATORS, model dilatih ulang dari awal.
+    """
+    df_model = df[FITUR + [TARGET]].dropna()
+    if model is None or df_model.empty:
+        return train_model(df, n_jobs=n_jobs)
+    kelas_baru = np.unique(df_model[TARGET].astype(str))
+    if (not np.array_equal(kelas_baru, np.asarray(model.classes_, dtype=str))
+            or model.n_estimators + n_tambah > MAX_ESTIMATORS):
+        return train_model(df, n_jobs=n_jobs)
+
+    # Model lama mungkin sedang dipakai sesi lain, jadi yang ditumbuhkan adalah salinannya
+    model = copy.deepcopy(model)
+    model.set_params(warm_start=True, n_estimators=model.n_estimators + n_tambah, n_jobs=n_jobs)
+    model.fit(df_model[FITUR], df_model[TARGET])
+    return model
+
+
+def submit(fn, *args, **kwargs):
+    """Menjalankan pelatihan di executor latar belakang; UI cukup memeriksa Future.done()."""
+    return _executor.submit(fn, *args, **kwargs)
+
+
+def predict_batch(model, suhu, kelembaban, jam=None):
+    """
+    Prediksi banyak titik (suhu, kelembaban[, jam]) sekaligus dari array NumPy
+    dalam satu panggilan predict. Mengembalikan array label cuaca.
+    """
+    X = pd.DataFrame({"suhu": np.asarray(suhu), "kelembaban": np.asarray(kelembaban)})
+    if jam is not None:
+        X["jam"] = np.broadcast_to(jam, len(X))
+    return np.asarray(model.predict(X))
+
+
+def prediction_grid(model, jam=None):
+    """
+    Kelas prediksi untuk seluruh grid slider (SUHU_GRID x KELEMBABAN_GRID),
+    dihitung sekali per model (dan per jam untuk model global), lalu disimpan
+    selama model masih dipakai.
+    """
+    if jam is None and isinstance(model, ModelGlobal):
+        # Grid tanpa jam untuk model global memakai jam saat ini, jadi tidak di-cache di bawah None
+        jam = model.jam_sekarang()
+    with _grid_lock:
+        per_model = _grid_cache.setdefault(model, {})
+        if jam not in per_model:
+            suhu, kelembaban = np.meshgrid(SUHU_GRID, KELEMBABAN_GRID, indexing="ij")
+            per_model[jam] = predict_batch(model, suhu.ravel(), kelembaban.ravel(), jam).reshape(suhu.shape)
+        return per_model[jam]
+
+
+def lookup_grid(grid, suhu, kelembaban):
+    """Prediksi satu titik slider dari grid hasil prediction_grid (tanpa memanggil model)."""
+    return grid[suhu - SUHU_GRID[0], kelembaban - KELEMBABAN_GRID[0]]
+
+
+def fitur_global(df):
+    """
+    Fitur model global dari frame long-format (adm4, suhu, kelembaban, dan
+    `local` atau `jam`): kode provinsi & kab/kota sebagai angka, jam lokal,
+    suhu, kelembaban.
+    """
+    kode = df['adm4'].astype(str)
+    jam = df['jam'] if 'jam' in df else df['local'].dt.hour
+    return pd.DataFrame({
+        "prov": kode.str[:2].astype('int16').to_numpy(),
+        "kab": kode.str[:5].str.replace('.', '', regex=False).astype('int16').to_numpy(),
+        "jam": np.asarray(jam, dtype='int8'),
+        "suhu": np.asarray(df['suhu'], dtype='float32'),
+        "kelembaban": np.asarray(df['kelembaban'], dtype='float32'),
+    })
+
+
+def train_global_model(store, mulai=None, sampai=None, max_baris=GLOBAL_MAX_BARIS, n_jobs=N_JOBS, seed=42):
+    """
+    Melatih satu classifier untuk semua desa dari riwayat di ForecastStore.
+    Riwayat dibaca per potongan; jika lebih dari max_baris, tiap potongan
+    disampel acak agar memori tetap terbatas. Mengembalikan bundle dict
+    (model + metadata) atau None jika riwayat kosong.
+    """
+    from sklearn.ensemble import RandomForestClassifier
+
+    total = store.count()
+    if total == 0:
+        return None
+    frac = min(1.0, max_baris / total)
+    rng = np.random.default_rng(seed)
+    X_list, y_list = [], []
+    for potong in store.iter_read(mulai=mulai, sampai=sampai):
+        potong = potong.dropna(subset=FITUR + [TARGET, "local"])
+        if frac < 1.0:
+            potong = potong[rng.random(len(potong)) < frac]
+        X_list.append(fitur_global(potong))
+        y_list.append(potong[TARGET].astype(str).to_numpy())
+    X = pd.concat(X_list, ignore_index=True)
+    y = np.concatenate(y_list)
+    if len(X) == 0:
+        return None
+
+    model = RandomForestClassifier(n_estimators=N_ESTIMATORS, min_samples_leaf=5, random_state=seed, n_jobs=n_jobs)
+    model.fit(X, y)
+    return {
+        "model": model,
+        "fitur": FITUR_GLOBAL,
+        "jumlah_baris": len(X),
+        "dilatih": pd.Timestamp.now(tz="UTC").isoformat(timespec="seconds"),
+    }
+
+
+def save_global_model(bundle, path=GLOBAL_MODEL_PATH):
+    import joblib
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + ".tmp"
+    joblib.dump(bundle, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def load_global_model(path=GLOBAL_MODEL_PATH):
+    """Memuat bundle model global, atau None jika belum pernah dilatih."""
+    if not os.path.exists(path):
+        return None
+    import joblib
+
+    try:
+        return joblib.load(path)
+    except FileNotFoundError:
+        return None
+
+
+class ModelGlobal:
+    """
+    Tampilan model global untuk satu desa dengan antarmuka predict() yang sama
+    seperti model per desa: cukup kolom suhu dan kelembaban, ditambah kolom
+    jam opsional (default: jam saat prediksi di zona waktu desa, `zona`).
+    """
+
+    def __init__(self, bundle, kode_wilayah_desa, zona="Asia/Jakarta"):
+        self.bundle = bundle
+        self.kode_wilayah_desa = kode_wilayah_desa
+        self.zona = zona
+        self.classes_ = bundle["model"].classes_
+
+    def jam_sekarang(self):
+        # Dihitung setiap kali: objek ini bisa di-cache sepanjang umur proses
+        return pd.Timestamp.now(tz=self.zona).hour
+
+    def predict(self, df):
+        df = df.assign(adm4=self.kode_wilayah_desa)
+        if 'jam' not in df:
+            df['jam'] = self.jam_sekarang()
+        return self.bundle["model"].predict(fitur_global(df))
+
+
+def fingerprint(kode_wilayah_desa, df):
+    """
+    Kunci murah untuk data latih: kode adm4, waktu terbit prakiraan (jika
+    diketahui), dan hash isi kolom yang dipakai untuk melatih.
+    """
+    terbit = df.attrs.get("analysis_date", "")
+    hash_baris = pd.util.hash_pandas_object(df[FITUR + [TARGET]], index=False).to_numpy()
+    ringkas = hashlib.blake2b(hash_baris.tobytes(), digest_size=8).hexdigest()
+    return f"{kode_wilayah_desa}_{terbit}_{ringkas}".replace(":", "").replace(" ", "T")
+
+
+class ModelRegistry:
+    """
+    Registry model per fingerprint. Di memori dibatasi `max_bytes` (ukuran
+    model ditaksir dari ukuran file joblib-nya) dengan pembuangan LRU; di disk
+    dibatasi `max_disk_bytes` dengan membuang file yang paling lama tidak dipakai.
+
+    Beberapa proses yang memakai `path` yang sama berbagi file model. Jika
+    `backend` (cache.SharedCache) diberikan, lease-nya memastikan satu key
+    hanya dilatih oleh satu proses; proses lain menunggu lalu memuat filenya.
+    """
+
+    def __init__(self, path=MODEL_DIR, max_bytes=MODEL_CACHE_BYTES, max_disk_bytes=MODEL_DISK_BYTES, backend=None):
+        self.path = path
+        self.backend = backend
+        self.max_bytes = max_bytes
+        self.max_disk_bytes = max_disk_bytes
+        os.makedirs(path, exist_ok=True)
+        self._data = OrderedDict()  # key -> (model, ukuran_byte)
+        self._terbaru = {}  # kode adm4 -> key model terakhir
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = dict(hits=0, disk_hits=0, misses=0, evictions=0)
+
+    def _file(self, key):
+        return os.path.join(self.path, f"{key}.joblib")
+
+    def get(self, key):
+        """Model untuk key dari memori atau disk, atau None jika belum pernah dilatih."""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self._stats["hits"] += 1
+                return self._data[key][0]
+        path = self._file(key)
+        if not os.path.exists(path):
+            return None
+        import joblib
+
+        try:
+            model = joblib.load(path)
+        except (FileNotFoundError, EOFError, ValueError):
+            return None
+        os.utime(path)
+        with self._lock:
+            self._stats["disk_hits"] += 1
+        self._simpan_memori(key, model, os.path.getsize(path))
+        return model
+
+    def put(self, key, model):
+        """Menyimpan model ke disk (atomik) dan ke LRU memori."""
+        import joblib
+
+        path = self._file(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        joblib.dump(model, tmp_path)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._terbaru[key.split("_", 1)[0]] = key
+        self._simpan_memori(key, model, os.path.getsize(path))
+        self._pangkas_disk()
+
+    def latest(self, kode_wilayah_desa):
+        """Model terakhir yang disimpan untuk suatu desa (bisa dari data lama), atau None."""
+        with self._lock:
+            key = self._terbaru.get(kode_wilayah_desa)
+        if key is None:
+            # Setelah restart: cari file model desa ini yang paling baru di disk
+            files = glob.glob(os.path.join(glob.escape(self.path), f"{glob.escape(kode_wilayah_desa)}_*.joblib"))
+            if not files:
+                return None
+            key = os.path.basename(max(files, key=os.path.getmtime))[:-len(".joblib")]
+        return self.get(key)
+
+    def get_or_train(self, key, train_fn):
+        """Mengembalikan model untuk key, melatihnya dengan train_fn() jika belum ada."""
+        model = self.get(key)
+        if model is not None:
+            return model
+        with self.backend.kunci(key) if self.backend is not None else contextlib.nullcontext():
+            # Proses lain mungkin sudah selesai melatih key ini selama kita menunggu lease
+            model = self.get(key)
+            if model is not None:
+                return model
+            with self._lock:
+                self._stats["misses"] += 1
+            model = train_fn()
+            if model is not None:
+                self.put(key, model)
+            return model
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, size=len(self._data), bytes=self._bytes, max_bytes=self.max_bytes)
+
+    def _simpan_memori(self, key, model, ukuran):
+        with self._lock:
+            if key in self._data:
+                self._bytes -= self._data.pop(key)[1]
+            self._data[key] = (model, ukuran)
+            self._bytes += ukuran
+            # Selalu sisakan model terbaru meskipun melebihi batas
+            while self._bytes > self.max_bytes and len(self._data) > 1:
+                _, (_, lama) = self._data.popitem(last=False)
+                self._bytes -= lama
+                self._stats["evictions"] += 1
+
+    def _pangkas_disk(self):
+        entri = []
+        with os.scandir(self.path) as it:
+            for e in it:
+                if e.name.endswith(".joblib"):
+                    st = e.stat()
+                    entri.append((st.st_mtime, st.st_size, e.path))
+        total = sum(ukuran for _, ukuran, _ in entri)
+        for _, ukuran, path in sorted(entri):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= ukuran
+
+
+def main():
+    import argparse
+
+    from riwayat import STORE_PATH, ForecastStore
+
+    parser = argparse.ArgumentParser(description="Utilitas model cuaca")
+    sub = parser.add_subparsers(dest="perintah", required=True)
+    latih = sub.add_parser("train-global", help="latih model global dari riwayat prakiraan")
+    latih.add_argument("--riwayat", default=STORE_PATH, help="path database riwayat")
+    latih.add_argument("--output", default=GLOBAL_MODEL_PATH, help="path file model global")
+    latih.add_argument("--max-baris", type=int, default=GLOBAL_MAX_BARIS)
+    args = parser.parse_args()
+
+    if args.perintah == "train-global":
+        bundle = train_global_model(ForecastStore(args.riwayat), max_baris=args.max_baris)
+        if bundle is None:
+            parser.exit(1, "Riwayat prakiraan kosong, tidak ada yang dilatih.\n")
+        save_global_model(bundle, args.output)
+        print(f"Model global ({bundle['jumlah_baris']} baris) ditulis ke {args.output}")
+
+
+if __name__ == "__main__":
+    main()
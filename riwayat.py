@@ -0,0 +1,149 @@
+"""Penyimpanan riwayat prakiraan BMKG di disk (SQLite).
+
+Setiap baris prakiraan disimpan dengan kunci (adm4, utc). Penambahan hanya
+memasukkan baris yang belum pernah dilihat (INSERT OR IGNORE), tanpa menulis
+ulang file, dan pembacaan rentang waktu memakai indeks primary key sehingga
+tabel berisi jutaan baris tidak perlu dimuat seluruhnya ke memori.
+"""
+
+import os
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+
+STORE_PATH = os.environ.get(
+    "RIWAYAT_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "riwayat_prakiraan.sqlite"))
+
+KOLOM = ["adm4", "utc", "local", "suhu", "kelembaban", "cuaca"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS prakiraan (
+    adm4       TEXT    NOT NULL,
+    utc        INTEGER NOT NULL,  -- detik epoch UTC
+    local      INTEGER,           -- waktu lokal (wall clock) dalam detik epoch
+    suhu       REAL,
+    kelembaban REAL,
+    cuaca      TEXT,
+    diambil    INTEGER NOT NULL,  -- detik epoch saat baris pertama kali disimpan
+    PRIMARY KEY (adm4, utc)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS prakiraan_utc ON prakiraan (utc);
+"""
+
+
+def _ke_detik(waktu):
+    """Series datetime (naif, dianggap UTC/wall clock) -> array int detik epoch."""
+    return waktu.to_numpy().astype("datetime64[s]").astype("int64")
+
+
+def _dari_detik(detik):
+    return pd.to_datetime(detik, unit="s")
+
+
+class ForecastStore:
+    """Penyimpanan prakiraan (adm4, utc) berbasis SQLite yang aman dipakai banyak thread."""
+
+    def __init__(self, path=STORE_PATH):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self):
+        self._conn.close()
+
+    def append(self, df, adm4=None):
+        """
+        Menyimpan baris prakiraan yang belum ada. `df` berformat keluaran
+        get_bmkg_data (dengan adm4 diberikan terpisah) atau long-format
+        dengan kolom adm4. Mengembalikan jumlah baris baru.
+        """
+        if df is None or df.empty:
+            return 0
+        if adm4 is not None:
+            df = df.assign(adm4=adm4)
+        df = df[df['utc'].notna()]
+        local = df['local']
+        baris = zip(
+            df['adm4'].astype(str).tolist(),
+            _ke_detik(df['utc']).tolist(),
+            np.where(local.notna(), _ke_detik(local.fillna(pd.Timestamp(0))), None).tolist(),
+            df['suhu'].astype(float).tolist(),
+            df['kelembaban'].astype(float).tolist(),
+            df['cuaca'].astype(object).where(df['cuaca'].notna(), None).tolist(),
+        )
+        sekarang = int(pd.Timestamp.now(tz="UTC").timestamp())
+        with self._lock:
+            sebelum = self._conn.total_changes
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO prakiraan (adm4, utc, local, suhu, kelembaban, cuaca, diambil) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (b + (sekarang,) for b in baris),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            return self._conn.total_changes - sebelum
+
+    def _query(self, adm4=None, prefix=None, mulai=None, sampai=None):
+        syarat, params = [], []
+        if adm4 is not None:
+            kode = [adm4] if isinstance(adm4, str) else list(adm4)
+            syarat.append(f"adm4 IN ({', '.join('?' * len(kode))})")
+            params.extend(kode)
+        if prefix is not None:
+            # Rentang [prefix., prefix/) memakai primary key, tidak seperti LIKE
+            syarat.append("adm4 >= ? AND adm4 < ?")
+            params.extend([prefix + ".", prefix + "/"])
+        if mulai is not None:
+            syarat.append("utc >= ?")
+            params.append(int(pd.Timestamp(mulai).timestamp()))
+        if sampai is not None:
+            syarat.append("utc < ?")
+            params.append(int(pd.Timestamp(sampai).timestamp()))
+        where = f" WHERE {' AND '.join(syarat)}" if syarat else ""
+        return f"SELECT {', '.join(KOLOM)} FROM prakiraan{where} ORDER BY adm4, utc", params
+
+    @staticmethod
+    def _ke_frame(df):
+        df['utc'] = _dari_detik(df['utc'])
+        df['local'] = _dari_detik(df['local'])
+        df['cuaca'] = df['cuaca'].astype('category')
+        df['adm4'] = df['adm4'].astype('category')
+        df['suhu'] = df['suhu'].astype('float32')
+        df['kelembaban'] = df['kelembaban'].astype('float32')
+        return df
+
+    def read(self, adm4=None, prefix=None, mulai=None, sampai=None):
+        """
+        Membaca prakiraan untuk satu kode/daftar kode adm4 dan/atau semua desa di
+        bawah kode induk `prefix`, dalam rentang UTC [mulai, sampai).
+        """
+        sql, params = self._query(adm4, prefix, mulai, sampai)
+        with self._lock:
+            df = pd.read_sql_query(sql, self._conn, params=params)
+        return self._ke_frame(df)
+
+    def iter_read(self, adm4=None, prefix=None, mulai=None, sampai=None, chunksize=100_000):
+        """Seperti read, tetapi menghasilkan DataFrame per potongan agar memori tetap kecil."""
+        sql, params = self._query(adm4, prefix, mulai, sampai)
+        # Koneksi terpisah agar pembacaan panjang tidak menahan lock penulisan
+        conn = sqlite3.connect(self.path)
+        try:
+            for df in pd.read_sql_query(sql, conn, params=params, chunksize=chunksize):
+                yield self._ke_frame(df)
+        finally:
+            conn.close()
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM prakiraan").fetchone()[0]
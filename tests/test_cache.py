@@ -0,0 +1,293 @@
+"""Perilaku cache.py dengan jam dan loader palsu (tanpa jaringan dan tanpa menunggu)."""
+
+import pandas as pd
+
+import bmkg
+import cache
+
+
+class JamPalsu:
+    def __init__(self, mulai=1000.0):
+        self.sekarang = mulai
+
+    def __call__(self):
+        return self.sekarang
+
+    def maju(self, detik):
+        self.sekarang += detik
+
+
+class ExecutorTertunda:
+    """Menampung tugas refresh latar; dijalankan saat jalankan() dipanggil."""
+
+    def __init__(self):
+        self.tugas = []
+
+    def submit(self, fn, *args):
+        self.tugas.append((fn, args))
+
+    def jalankan(self):
+        tugas, self.tugas = self.tugas, []
+        for fn, args in tugas:
+            fn(*args)
+
+
+class LoaderPalsu:
+    """Mengembalikan "<key>#<n>" (n = panggilan ke-berapa untuk key itu), atau hasil dari `hasil`."""
+
+    def __init__(self, hasil=None):
+        self.panggilan = []
+        self.hasil = hasil
+
+    def __call__(self, key):
+        self.panggilan.append(key)
+        if self.hasil is not None:
+            return self.hasil
+        return f"{key}#{self.panggilan.count(key)}"
+
+
+def buat_ttl(loader, jam, executor=None, ttl=60, stale_ttl=120, maxsize=8, is_valid=None):
+    return cache.TTLCache(loader, ttl=ttl, stale_ttl=stale_ttl, maxsize=maxsize, is_valid=is_valid, clock=jam,
+                          executor=executor or ExecutorTertunda())
+
+
+# ========== TTLCache ==========
+def test_entri_segar_tidak_dimuat_ulang():
+    jam, loader = JamPalsu(), LoaderPalsu()
+    c = buat_ttl(loader, jam)
+    assert c.get("a") == "a#1"
+    jam.maju(59)
+    assert c.get("a") == "a#1"
+    assert loader.panggilan == ["a"]
+    stats = c.stats()
+    assert (stats["misses"], stats["hits"], stats["stale_hits"]) == (1, 1, 0)
+
+
+def test_entri_basi_dikembalikan_sambil_dimuat_ulang_di_latar():
+    jam, loader, executor = JamPalsu(), LoaderPalsu(), ExecutorTertunda()
+    c = buat_ttl(loader, jam, executor)
+    c.get("a")
+    jam.maju(61)
+    assert c.get("a") == "a#1"
+    # Satu refresh latar per key, walau diminta berkali-kali
+    assert c.get("a") == "a#1"
+    assert len(executor.tugas) == 1 and loader.panggilan == ["a"]
+    executor.jalankan()
+    assert c.get("a") == "a#2"
+    stats = c.stats()
+    assert (stats["stale_hits"], stats["refreshes"], stats["hits"]) == (2, 1, 1)
+
+
+def test_entri_kedaluwarsa_dimuat_ulang_sinkron():
+    jam, loader, executor = JamPalsu(), LoaderPalsu(), ExecutorTertunda()
+    c = buat_ttl(loader, jam, executor)
+    c.get("a")
+    jam.maju(60 + 120)
+    assert c.get("a") == "a#2"
+    assert executor.tugas == []
+    assert c.stats()["misses"] == 2
+
+
+def test_peek_tidak_memuat_dan_tidak_menghitung():
+    jam, loader = JamPalsu(), LoaderPalsu()
+    c = buat_ttl(loader, jam)
+    assert c.peek("a") is None
+    c.get("a")
+    jam.maju(30)
+    assert c.peek("a") == (30.0, "a#1")
+    assert loader.panggilan == ["a"]
+    stats = c.stats()
+    assert (stats["hits"], stats["misses"]) == (0, 1)
+
+
+def test_hasil_error_tidak_pernah_disimpan():
+    jam = JamPalsu()
+    loader = LoaderPalsu(hasil="Error: Gagal menghubungi server BMKG")
+    c = bmkg.create_forecast_cache(loader=loader, ttl=60, stale_ttl=120, clock=jam, executor=ExecutorTertunda())
+    assert c.get("a").startswith("Error:")
+    assert c.get("a").startswith("Error:")
+    assert loader.panggilan == ["a", "a"]
+    assert "a" not in c and len(c) == 0
+    assert c.stats()["failures"] == 2
+
+
+def test_refresh_gagal_mempertahankan_nilai_lama():
+    jam, executor = JamPalsu(), ExecutorTertunda()
+    df = pd.DataFrame({"suhu": [28]})
+    loader = LoaderPalsu(hasil=df)
+    c = bmkg.create_forecast_cache(loader=loader, ttl=60, stale_ttl=120, clock=jam, executor=executor)
+    assert c.get("a") is df
+    loader.hasil = "Error: timeout"
+    jam.maju(61)
+    assert c.get("a") is df
+    executor.jalankan()
+    assert c.peek("a")[1] is df
+    assert c.stats()["failures"] == 1
+
+
+def test_lru_membuang_entri_paling_lama_tidak_dipakai():
+    jam, loader = JamPalsu(), LoaderPalsu()
+    c = buat_ttl(loader, jam, maxsize=2)
+    c.get("a")
+    c.get("b")
+    c.get("a")
+    c.get("c")
+    assert "a" in c and "c" in c and "b" not in c
+    stats = c.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"], stats["size"]) == (1, 3, 1, 2)
+    # Key yang terbuang dimuat ulang saat diminta lagi
+    assert c.get("b") == "b#2"
+    assert c.stats()["evictions"] == 2
+
+
+def test_put_dan_invalidate():
+    jam, loader = JamPalsu(), LoaderPalsu()
+    c = buat_ttl(loader, jam)
+    c.put("a", "manual")
+    assert c.get("a") == "manual" and loader.panggilan == []
+    c.invalidate("a")
+    assert c.get("a") == "a#1"
+    c.invalidate()
+    assert len(c) == 0
+
+
+# ========== RateLimiter ==========
+def test_try_acquire_memakai_burst_lalu_mengisi_ulang():
+    jam = JamPalsu()
+    limiter = bmkg.RateLimiter(6, per=60, burst=3, clock=jam)
+    assert [limiter.try_acquire() for _ in range(4)] == [True, True, True, False]
+    jam.maju(10)
+    assert limiter.try_acquire() and not limiter.try_acquire()
+    # Jeda panjang tidak menumpuk token melebihi burst
+    jam.maju(3600)
+    assert [limiter.try_acquire() for _ in range(4)] == [True, True, True, False]
+
+
+def test_acquire_menunggu_sesuai_interval():
+    jam = JamPalsu()
+    tidur = []
+
+    def sleep(detik):
+        tidur.append(detik)
+        jam.maju(detik)
+
+    limiter = bmkg.RateLimiter(60, per=60, burst=1, clock=jam, sleep=sleep)
+    limiter.acquire()
+    limiter.acquire()
+    assert tidur == [1.0]
+
+
+def test_limiter_anak_tidak_melebihi_kuota_induk():
+    jam = JamPalsu()
+    induk = bmkg.RateLimiter(60, per=60, burst=2, clock=jam)
+    anak = bmkg.RateLimiter(600, per=60, burst=5, clock=jam, induk=induk)
+    assert [anak.try_acquire() for _ in range(3)] == [True, True, False]
+    # Token anak yang tidak terpakai karena induk habis dikembalikan
+    jam.maju(1)
+    assert anak.try_acquire()
+    assert not induk.try_acquire()
+
+
+# ========== CacheWarmer ==========
+def buat_pemanas(jam, loader, limiter=None, ttl=3600, lead=300, **kwargs):
+    prakiraan = cache.TTLCache(loader, ttl=ttl, stale_ttl=0, clock=jam, executor=ExecutorTertunda(),
+                               is_valid=lambda nilai: not nilai.startswith("Error"))
+    return prakiraan, cache.CacheWarmer(prakiraan, top_n=10, lead=lead, limiter=limiter, clock=jam, **kwargs)
+
+
+def test_pemanas_hanya_memuat_ulang_key_yang_hampir_kedaluwarsa():
+    jam, loader, disegarkan = JamPalsu(), LoaderPalsu(), []
+    prakiraan, pemanas = buat_pemanas(jam, loader, on_refresh=lambda key, nilai: disegarkan.append((key, nilai)))
+    pemanas.catat("a")
+    assert pemanas.tick() == ["a"]
+    assert disegarkan == [("a", "a#1")]
+    jam.maju(3600 - 300 - 1)
+    assert pemanas.tick() == []
+    jam.maju(1)
+    assert pemanas.tick() == ["a"]
+    assert prakiraan.get("a") == "a#2"
+
+
+def test_pemanas_berhenti_saat_kuota_habis():
+    jam, loader = JamPalsu(), LoaderPalsu()
+    limiter = bmkg.RateLimiter(2, per=60, burst=2, clock=jam)
+    _, pemanas = buat_pemanas(jam, loader, limiter=limiter)
+    for key in "abcde":
+        pemanas.catat(key)
+    assert len(pemanas.tick()) == 2
+    assert len(loader.panggilan) == 2 and pemanas.stats()["budget_habis"] == 1
+    jam.maju(30)
+    assert len(pemanas.tick()) == 1
+    assert len(set(loader.panggilan)) == 3
+
+
+def test_pemanas_melewati_key_gagal_selama_lead():
+    jam = JamPalsu()
+    loader = LoaderPalsu(hasil="Error: 503")
+    prakiraan, pemanas = buat_pemanas(jam, loader, lead=300)
+    pemanas.catat("a")
+    assert pemanas.tick() == []
+    jam.maju(299)
+    assert pemanas.tick() == []
+    assert loader.panggilan == ["a"] and pemanas.stats()["failures"] == 1
+    loader.hasil = None
+    jam.maju(1)
+    assert pemanas.tick() == ["a"]
+    assert "a" in prakiraan
+
+
+def test_popularitas_meluruh_per_paruh_waktu():
+    jam = JamPalsu()
+    _, pemanas = buat_pemanas(jam, LoaderPalsu(), paruh_waktu=3600)
+    for _ in range(4):
+        pemanas.catat("lama")
+    jam.maju(2 * 3600)
+    pemanas.catat("baru")
+    pemanas.catat("baru")
+    populer = pemanas.populer()
+    assert [key for key, _ in populer] == ["baru", "lama"]
+    assert abs(dict(populer)["lama"] - 1.0) < 1e-9 and abs(dict(populer)["baru"] - 2.0) < 1e-9
+
+
+# ========== SharedCache ==========
+def test_shared_cache_lease_single_flight(tmp_path):
+    path = str(tmp_path / "bersama.sqlite")
+    jam = JamPalsu()
+    a = cache.SharedCache(path, "uji", lease_ttl=60, clock=jam)
+    pemegang = a.kunci("k")
+    pemegang.__enter__()
+
+    def sleep(detik):
+        # Selama b menunggu lease, a selesai memuat lalu melepasnya
+        a.put("k", "dari a")
+        pemegang.__exit__(None, None, None)
+
+    b = cache.SharedCache(path, "uji", lease_ttl=60, clock=jam, sleep=sleep)
+    loader = LoaderPalsu()
+    assert b.get_or_load("k", loader) == (0.0, "dari a")
+    assert loader.panggilan == []
+    assert b.stats()["waits"] == 1 and b.stats()["loads"] == 0
+    a.close()
+    b.close()
+
+
+def test_shared_cache_lease_diambil_alih_setelah_kedaluwarsa(tmp_path):
+    path = str(tmp_path / "bersama.sqlite")
+    jam = JamPalsu()
+    mati = cache.SharedCache(path, "uji", lease_ttl=60, clock=jam)
+    # Proses pemegang lease mati tanpa pernah melepasnya
+    assert mati._ambil_lease("k", "proses-mati")
+    b = cache.SharedCache(path, "uji", lease_ttl=60, clock=jam, sleep=lambda detik: jam.maju(10))
+    loader = LoaderPalsu()
+    assert b.get_or_load("k", loader) == (0.0, "k#1")
+    assert loader.panggilan == ["k"] and jam() > 1000 + 60
+    mati.close()
+    b.close()
+
+
+def test_shared_cache_is_valid_tidak_menyimpan_error(tmp_path):
+    c = cache.SharedCache(str(tmp_path / "bersama.sqlite"), "uji")
+    loader = LoaderPalsu(hasil="Error: 500")
+    assert c.get_or_load("k", loader, is_valid=lambda nilai: not nilai.startswith("Error")) == (0.0, "Error: 500")
+    assert c.get("k") is None
+    c.close()
@@ -0,0 +1,28 @@
+"""Paritas gaya_cuaca (klasifikasi + tabel lookup) dengan rantai if lama dari app3.py."""
+
+import pytest
+
+import bmkg
+import gaya_cuaca
+from benchmarks.bench_gaya import (DESKRIPSI_BMKG, KASUS_TEPI, get_gradient_color_lama, get_text_styles_lama,
+                                   get_weather_emoji_lama)
+from benchmarks.data_sintetis import buat_payload_bmkg
+
+DESKRIPSI = DESKRIPSI_BMKG + [d.upper() for d in DESKRIPSI_BMKG] + [d.lower() for d in DESKRIPSI_BMKG]
+
+
+@pytest.mark.parametrize("desc", DESKRIPSI + KASUS_TEPI)
+def test_emoji_dan_gradien(desc):
+    assert gaya_cuaca.get_weather_emoji(desc) == get_weather_emoji_lama(desc)
+    assert gaya_cuaca.get_gradient_color(desc) == get_gradient_color_lama(desc)
+
+
+# Versi lama gagal untuk NaN pada get_text_styles
+@pytest.mark.parametrize("desc", [d for d in DESKRIPSI + KASUS_TEPI if isinstance(d, str) or d is None])
+def test_gaya_teks(desc):
+    assert gaya_cuaca.get_text_styles(desc) == get_text_styles_lama(desc)
+
+
+def test_klasifikasi_kolom_sama_dengan_per_nilai():
+    cuaca = bmkg.parse_prakiraan(buat_payload_bmkg(hari=3))["cuaca"]
+    assert gaya_cuaca.klasifikasi_kolom(cuaca).tolist() == [gaya_cuaca.klasifikasi_cuaca(c) for c in cuaca]
@@ -0,0 +1,22 @@
+"""Paritas wilayah.bersihkan_nama dengan implementasi lama (apply per baris)."""
+
+import pandas as pd
+import pytest
+
+import wilayah
+from benchmarks.bench_nama import KASUS_TEPI, clean_name_lama
+from benchmarks.data_sintetis import buat_base_csv_df
+
+
+@pytest.mark.parametrize("nama", KASUS_TEPI)
+def test_kasus_tepi_sama_dengan_apply(nama):
+    seri = pd.Series([nama])
+    assert wilayah.bersihkan_nama(seri).tolist() == clean_name_lama(seri).tolist()
+
+
+@pytest.mark.parametrize("dtype", [object, "string[pyarrow]"])
+def test_tabel_penuh_sama_dengan_apply(dtype):
+    nama = pd.concat([buat_base_csv_df(n_prov=5)['nama'], pd.Series(KASUS_TEPI)], ignore_index=True).astype(dtype)
+    baru, lama = wilayah.bersihkan_nama(nama), clean_name_lama(nama)
+    beda = baru.astype(object) != lama.astype(object)
+    assert not beda.any(), nama[beda].head().tolist()
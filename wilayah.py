@@ -0,0 +1,303 @@
+"""Utilitas tabel wilayah administrasi (Permendagri 72/2019).
+
+Modul ini sengaja tidak bergantung pada Streamlit agar bisa dipakai
+ulang oleh skrip benchmark maupun proses lain.
+
+Snapshot lokal dibangun dengan:
+    python wilayah.py build [--sumber path/atau/url/base.csv]
+"""
+
+import argparse
+import json
+import os
+import re
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+BASE_CSV_URL = "https://raw.githubusercontent.com/kodewilayah/permendagri-72-2019/main/dist/base.csv"
+
+# Naikkan versi ini setiap kali skema/pemrosesan snapshot berubah
+SNAPSHOT_VERSION = 1
+SNAPSHOT_PATH = os.environ.get(
+    "WILAYAH_SNAPSHOT",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", f"wilayah_v{SNAPSHOT_VERSION}.feather"))
+_META_KEY = b"wilayah"
+
+# Awalan jenis wilayah dibuang dan hanya bagian sebelum koma pertama yang dipakai.
+# Sengaja berupa string (bukan re.compile) agar pandas bisa menjalankannya
+# di kernel regex pyarrow, bukan fallback `re` per baris.
+_NAMA_PATTERN = r'(?s)^(?:KAB\. |KOTA |KEC\. |DESA |KEL\. )?([^,]*).*$'
+
+# Kunci akar pada indeks anak: daftar provinsi tidak punya kode induk
+KODE_AKAR = ""
+
+
+def _string_pyarrow(df):
+    """
+    Kolom dan index string berupa objek Python diubah ke string berbasis pyarrow
+    (satu buffer per kolom, bukan satu objek str per baris). pandas >= 3 sudah
+    memakai string pyarrow secara default sehingga tidak ada yang diubah.
+    """
+    for kolom in df.columns[df.dtypes == object]:
+        df[kolom] = df[kolom].astype("string[pyarrow]")
+    if df.index.dtype == object:
+        df.index = df.index.astype("string[pyarrow]")
+    return df
+
+
+def read_base_csv(sumber=BASE_CSV_URL):
+    """Membaca base.csv (path lokal atau URL) menjadi DataFrame mentah id, nama."""
+    return pd.read_csv(sumber, header=None, names=["id", "nama"], dtype=str)
+
+
+def bersihkan_nama(nama):
+    """
+    Membersihkan kolom nama wilayah secara vektor: ambil bagian sebelum koma,
+    buang awalan (KAB./KOTA/KEC./DESA/KEL.), lalu ubah ke Title Case.
+    """
+    return nama.str.replace(_NAMA_PATTERN, r'\1', regex=True).str.title()
+
+
+def proses_tabel_wilayah(df):
+    """
+    Menghitung level administrasi (int8) dan membersihkan nama untuk tampilan.
+    Mengembalikan DataFrame ber-index 'id' dengan kolom string berbasis pyarrow.
+    """
+    df = _string_pyarrow(df.copy())
+    # 0: Provinsi, 1: Kab/Kota, 2: Kecamatan, 3: Kelurahan/Desa
+    df['level'] = df['id'].str.count(r'\.').astype('int8')
+    df['nama_bersih'] = bersihkan_nama(df['nama'])
+    return df.set_index('id')
+
+
+def build_snapshot(sumber=BASE_CSV_URL, path=SNAPSHOT_PATH):
+    """
+    Mengubah base.csv menjadi snapshot Feather tanpa kompresi (bisa di-memory-map)
+    dengan kolom level dan nama_bersih yang sudah dihitung.
+    """
+    df = proses_tabel_wilayah(read_base_csv(sumber))
+    return _tulis_snapshot(df, sumber, path)
+
+
+def _tulis_snapshot(df, sumber, path):
+    import pyarrow as pa
+    import pyarrow.feather as feather
+
+    table = pa.Table.from_pandas(df.reset_index(), preserve_index=False)
+    meta = {
+        "versi": SNAPSHOT_VERSION,
+        "sumber": str(sumber),
+        "dibuat": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "jumlah": len(df),
+    }
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), _META_KEY: json.dumps(meta).encode()})
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    # Nama sementara per proses: beberapa replika bisa membangun snapshot bersamaan
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    feather.write_feather(table, tmp_path, compression="uncompressed")
+    os.replace(tmp_path, path)
+    return meta
+
+
+def load_snapshot(path=SNAPSHOT_PATH):
+    """Memuat snapshot lewat memory-map. Gagal jika file tidak ada atau versinya berbeda."""
+    import pyarrow.feather as feather
+
+    table = feather.read_table(path, memory_map=True)
+    meta = json.loads((table.schema.metadata or {}).get(_META_KEY, b"{}"))
+    if meta.get("versi") != SNAPSHOT_VERSION:
+        raise ValueError(f"Versi snapshot {path} ({meta.get('versi')}) tidak cocok dengan versi {SNAPSHOT_VERSION}.")
+    return _string_pyarrow(table.to_pandas().set_index('id'))
+
+
+def load_data_wilayah(path=SNAPSHOT_PATH, bangun_otomatis=True, sumber=BASE_CSV_URL):
+    """
+    Memuat tabel wilayah dari snapshot lokal. Jika snapshot belum ada (checkout
+    baru, atau deploy yang tidak menjalankan `python wilayah.py build`) atau
+    versinya lama, base.csv dibaca sekali dan snapshot ditulis untuk start
+    berikutnya. Jika snapshot tidak bisa ditulis, tabel dari CSV dipakai langsung.
+    """
+    try:
+        return load_snapshot(path)
+    except (FileNotFoundError, ValueError):
+        if not bangun_otomatis:
+            raise
+    df = proses_tabel_wilayah(read_base_csv(sumber))
+    try:
+        _tulis_snapshot(df, sumber, path)
+    except OSError:
+        return df
+    return load_snapshot(path)
+
+
+def build_children_index(df):
+    """
+    Membangun indeks induk -> daftar kode anak (terurut) dari tabel wilayah.
+
+    Kode induk diturunkan dari kode wilayah itu sendiri (bagian sebelum titik
+    terakhir), sehingga cukup satu kali pengurutan (induk, kode) untuk seluruh
+    tabel lalu dipotong per induk. Provinsi disimpan di bawah kunci KODE_AKAR.
+    Tidak memakai Index.groupby karena sangat lambat untuk index pyarrow
+    yang terdiri dari beberapa chunk (snapshot yang di-memory-map).
+    """
+    kode = df.index.to_numpy(dtype=str)
+    induk = np.where(df['level'].to_numpy() == 0, KODE_AKAR,
+                     df.index.str.rsplit('.', n=1).str[0].to_numpy(dtype=str))
+    urut = np.lexsort((kode, induk))
+    induk, kode = induk[urut], kode[urut]
+    awal = np.flatnonzero(np.r_[True, induk[1:] != induk[:-1]])
+    return dict(zip(induk[awal].tolist(), (v.tolist() for v in np.split(kode, awal[1:]))))
+
+
+def get_children(indeks_anak, kode_induk=KODE_AKAR):
+    """Mengembalikan daftar kode anak langsung dari suatu wilayah (O(jumlah anak))."""
+    return indeks_anak.get(kode_induk, [])
+
+
+def get_desa(indeks_anak, kode_induk):
+    """
+    Mengembalikan semua kode desa/kelurahan (daun hierarki) di bawah suatu
+    wilayah, terurut. Kode desa sendiri dikembalikan apa adanya.
+    """
+    hasil, antrean = [], [kode_induk]
+    while antrean:
+        kode = antrean.pop()
+        anak = indeks_anak.get(kode)
+        if anak:
+            antrean.extend(reversed(anak))
+        else:
+            hasil.append(kode)
+    return hasil
+
+
+_NON_ALNUM = r'[^a-z0-9]+'
+
+
+def _normalisasi(teks):
+    """Series teks -> huruf kecil, selain huruf/angka ASCII menjadi spasi tunggal."""
+    return teks.str.lower().str.replace(_NON_ALNUM, ' ', regex=True).str.strip()
+
+
+def _kode_trigram(buf):
+    """Array byte -> kode trigram (b0 << 16 | b1 << 8 | b2) untuk setiap posisi awal."""
+    b = buf.astype(np.int64)
+    return (b[:-2] << 16) | (b[1:-1] << 8) | b[2:]
+
+
+class IndeksNama:
+    """
+    Indeks trigram atas label lengkap desa/kelurahan ("desa kec kab prov")
+    untuk pencarian ketik-langsung.
+
+    Semua label digabung menjadi satu buffer byte; trigram dan posting list
+    (baris yang memuat trigram itu) dibangun dengan numpy dalam satu kali
+    jalan. Kueri menghitung berapa trigram kueri yang dimiliki tiap baris
+    (bincount atas posting list), sehingga salah ketik kecil tetap cocok.
+    Kueri 1-2 huruf memakai pencarian awalan pada nama desa yang terurut.
+    """
+
+    def __init__(self, df):
+        desa = df[df['level'].to_numpy() == 3].sort_index()
+        self.kode = desa.index.to_numpy(dtype=object)
+        # Kode berformat tetap pp.kk.cc.dddd: induk cukup diambil dengan slicing
+        nama = df['nama_bersih']
+        bagian = [desa['nama_bersih']] + [
+            pd.Series(nama.reindex(desa.index.str.slice(0, n)).to_numpy(), index=desa.index).fillna("")
+            for n in (8, 5, 2)
+        ]
+        self.label = (bagian[0] + ", Kec. " + bagian[1] + ", Kab. " + bagian[2] + ", Prov. " + bagian[3]).to_numpy(dtype=object)
+
+        # Satu buffer " label " per baris, dipisah spasi agar trigram tepi kata ikut terindeks;
+        # setelah normalisasi teks hanya berisi ASCII
+        teks = " " + _normalisasi(bagian[0] + " " + bagian[1] + " " + bagian[2] + " " + bagian[3]) + " "
+        panjang = teks.str.len().to_numpy(dtype=np.int64)
+        buf = np.frombuffer("".join(teks.tolist()).encode("ascii"), dtype=np.uint8)
+        tri = _kode_trigram(buf)
+        baris = np.repeat(np.arange(len(panjang), dtype=np.int64), panjang)[:len(tri)]
+        # Buang trigram yang melintasi batas dua label (dua posisi terakhir tiap label)
+        akhir = np.cumsum(panjang)
+        lintas = np.concatenate([akhir - 2, akhir - 1])
+        sah = np.ones(len(tri), dtype=bool)
+        sah[lintas[lintas < len(tri)]] = False
+        # Pasangan unik (trigram, baris) dalam satu int64 (trigram < 2^24, baris < 2^20),
+        # diurutkan lalu dibuang duplikatnya: posting list tiap trigram jadi bersebelahan
+        pasangan = np.sort((tri[sah] << 20) | baris[sah])
+        pasangan = pasangan[np.r_[True, pasangan[1:] != pasangan[:-1]]]
+        tri = pasangan >> 20
+        awal = np.flatnonzero(np.r_[True, tri[1:] != tri[:-1]])
+        self._tri = tri[awal]
+        self._awal = np.append(awal, len(pasangan))
+        self._baris = (pasangan & ((1 << 20) - 1)).astype(np.int32)
+        self._panjang_label = panjang.astype(np.int32)
+
+        # Nama desa terurut untuk kueri pendek (awalan) dan pemeringkatan
+        self._nama_desa = _normalisasi(bagian[0]).to_numpy(dtype=object).astype(str)
+        self._urut = np.argsort(self._nama_desa, kind="stable")
+        self._nama_urut = self._nama_desa[self._urut]
+
+    def __len__(self):
+        return len(self.kode)
+
+    def cari(self, kueri, k=10):
+        """Mengembalikan hingga k kode desa paling cocok dengan kueri, terurut dari yang terbaik."""
+        kueri = re.sub(_NON_ALNUM, ' ', kueri.lower()).strip()
+        if not kueri:
+            return []
+        if len(kueri) < 3:
+            kiri = np.searchsorted(self._nama_urut, kueri, side="left")
+            kanan = np.searchsorted(self._nama_urut, kueri + "\U0010ffff", side="left")
+            return self.kode[self._urut[kiri:min(kanan, kiri + k)]].tolist()
+
+        kode_kueri = np.unique(_kode_trigram(np.frombuffer(f" {kueri} ".encode("ascii", errors="replace"), dtype=np.uint8)))
+        pos = np.searchsorted(self._tri, kode_kueri)
+        ada = (pos < len(self._tri)) & (self._tri[np.minimum(pos, len(self._tri) - 1)] == kode_kueri)
+        pos = pos[ada]
+        if not len(pos):
+            return []
+        posting = np.concatenate([self._baris[self._awal[p]:self._awal[p + 1]] for p in pos])
+        skor = np.bincount(posting, minlength=len(self.kode))
+        # Toleransi salah ketik: cukup ~60% trigram kueri yang cocok
+        batas = max(1, int(np.ceil(0.6 * len(kode_kueri))))
+        kandidat = np.flatnonzero(skor >= min(batas, skor.max()))
+        awalan = np.char.startswith(self._nama_desa[kandidat], kueri)
+        # Skor tertinggi dulu, lalu nama desa berawalan kueri, lalu label terpendek
+        kandidat = kandidat[np.lexsort((self._panjang_label[kandidat], ~awalan, -skor[kandidat]))[:max(5 * k, 50)]]
+        # Di antara skor yang sama, utamakan yang trigram kuerinya ada di nama desa itu sendiri
+        # (bukan di nama kecamatan/kabupaten)
+        tri_kueri = {f" {kueri} "[i:i + 3] for i in range(len(kueri))}
+        skor_nama = np.array([len(tri_kueri.intersection(f" {n} "[i:i + 3] for i in range(len(n))))
+                              for n in self._nama_desa[kandidat]])
+        urutan = np.lexsort((-skor_nama, -skor[kandidat]))[:k]
+        return self.kode[kandidat[urutan]].tolist()
+
+    def label_dari(self, kode_desa):
+        """Label "Desa, Kec. ..., Kab. ..., Prov. ..." untuk satu kode desa."""
+        i = np.searchsorted(self.kode, kode_desa)
+        if i == len(self.kode) or self.kode[i] != kode_desa:
+            raise KeyError(kode_desa)
+        return self.label[i]
+
+
+def build_search_index(df):
+    """Membangun IndeksNama untuk seluruh desa/kelurahan pada tabel wilayah."""
+    return IndeksNama(df)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Utilitas tabel wilayah Permendagri 72/2019")
+    sub = parser.add_subparsers(dest="perintah", required=True)
+    build = sub.add_parser("build", help="bangun snapshot lokal dari base.csv")
+    build.add_argument("--sumber", default=BASE_CSV_URL, help="path atau URL base.csv")
+    build.add_argument("--output", default=SNAPSHOT_PATH, help="path file snapshot")
+    args = parser.parse_args()
+
+    if args.perintah == "build":
+        meta = build_snapshot(args.sumber, args.output)
+        print(f"Snapshot v{meta['versi']} ({meta['jumlah']} wilayah) ditulis ke {args.output}")
+
+
+if __name__ == "__main__":
+    main()